@@ -0,0 +1,85 @@
+import os
+import random
+import time
+from database.db_manager import DatabaseManager, migrate, bulk_load, to_day
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, ".data")
+
+# name -> (jumlah habit, jumlah baris habit_log)
+SIZES = {
+    "tiny": (10, 10000),
+    "small": (1000, 100000),
+    "medium": (1000, 1000000),
+    "large": (100000, 10000000),
+}
+
+BATCH_SIZE = 50000
+
+# Hari terakhir riwayat sintetis, tetap agar hasil antar-run bisa dibandingkan
+LAST_DATE = "2024-12-31"
+
+
+def db_path(size, seed=0):
+    habits, logs = SIZES[size]
+    return os.path.join(DATA_DIR, f"habits-{size}-{habits}-{logs}-s{seed}.db")
+
+def _log_rows(rng, habits, logs, last_day):
+    """Log deterministik (dari seed), tersebar acak di riwayat ~2x jumlah log per habit"""
+    days = max(30, min(3650, 2 * logs // habits))
+    first_day = last_day - days + 1
+    for i in range(logs):
+        habit_id = i % habits + 1
+        day = first_day + rng.randrange(days)
+        yield habit_id, day, f"{rng.getrandbits(64):016x}/evidence.png"
+
+def generate(size, seed=0, force=False):
+    """Membangun (atau memakai ulang) database sintetis untuk ukuran tertentu"""
+    path = db_path(size, seed)
+    if os.path.exists(path) and not force:
+        # Database lama dari run sebelumnya dimigrasikan ke skema terbaru
+        db = DatabaseManager(path)
+        migrate(db)
+        db.close()
+        return path
+    os.makedirs(DATA_DIR, exist_ok=True)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    habits, logs = SIZES[size]
+    rng = random.Random(seed)
+    db = DatabaseManager(path)
+    migrate(db)
+    with db.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO habits (id, name, remind_time, description) VALUES (?, ?, ?, ?)",
+            ((i + 1, f"habit-{i + 1}", f"{rng.randrange(24):02d}:{rng.randrange(0, 60, 5):02d}", "sintetis")
+             for i in range(habits)))
+
+    rows = _log_rows(rng, habits, logs, to_day(LAST_DATE))
+    with bulk_load(db):
+        while True:
+            batch = [row for _, row in zip(range(BATCH_SIZE), rows)]
+            if not batch:
+                break
+            with db.transaction() as conn:
+                conn.executemany("INSERT INTO habit_log (habit_id, day, evidence) VALUES (?, ?, ?)", batch)
+    db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    db.close()
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Membuat database habtrack sintetis untuk benchmark")
+    parser.add_argument("sizes", nargs="*", default=["tiny", "small"], choices=sorted(SIZES))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        start = time.perf_counter()
+        path = generate(size, args.seed, args.force)
+        print(f"{size}: {path} ({time.perf_counter() - start:.1f} s)")
@@ -0,0 +1,239 @@
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from database import db_manager
+from database.db_manager import (
+    use_db_file, fetch_habits, fetch_due_habits, fetch_completed_dates, log_evidence, flush_writes
+)
+from database.records import to_day
+from utils.scheduler import ReminderScheduler
+from benchmarks.generate import SIZES, LAST_DATE, DATA_DIR, generate
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# name -> (fungsi, butuh QApplication)
+SCENARIOS = {}
+
+def scenario(name, widget=False):
+    def register(fn):
+        SCENARIOS[name] = (fn, widget)
+        return fn
+    return register
+
+
+class Context:
+    """Objek bersama untuk satu ukuran database (jendela dibuat saat dibutuhkan)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._app = None
+        self._window = None
+
+    @property
+    def app(self):
+        if self._app is None:
+            from PyQt6.QtWidgets import QApplication
+            self._app = QApplication.instance() or QApplication([])
+        return self._app
+
+    @property
+    def window(self):
+        if self._window is None:
+            self.app
+            from ui.main_window import HabitTrackerApp
+            self._window = HabitTrackerApp()
+            self.settle()
+        return self._window
+
+    def settle(self, seconds=0.2):
+        """Memproses event Qt sampai job worker awal sempat selesai"""
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            self.app.processEvents()
+            time.sleep(0.005)
+
+    def close(self):
+        if self._window is not None:
+            self._window.db_worker.stop()
+            self._window.deleteLater()
+            self._window = None
+
+
+@scenario("fetch_habits")
+def bench_fetch_habits(ctx):
+    # Cache dikosongkan agar yang terukur query-nya, bukan hit QueryCache
+    db_manager.get_manager().cache.invalidate()
+    fetch_habits()
+
+@scenario("fetch_habits_cached")
+def bench_fetch_habits_cached(ctx):
+    fetch_habits()
+
+@scenario("reminder_query")
+def bench_reminder_query(ctx):
+    db_manager.get_manager().cache.invalidate()
+    fetch_due_habits("08:00")
+
+@scenario("reminder_heap_rebuild")
+def bench_reminder_heap(ctx):
+    scheduler = ReminderScheduler()
+    scheduler.rebuild(fetch_habits())
+
+# Jumlah log per putaran skenario tulis; log dihapus lagi agar database benchmark tetap sama
+WRITE_COUNT = 50
+
+def _log_many(wait):
+    db = db_manager.get_manager()
+    habit_ids = [row[0] for row in db.fetchall("SELECT id FROM habits ORDER BY id LIMIT 10")]
+    day = datetime.date.fromisoformat(LAST_DATE) + datetime.timedelta(days=1)
+    flushes = db.writes.flushes
+    results = [log_evidence(habit_ids[i % len(habit_ids)], day, "bench", wait=wait)
+               for i in range(WRITE_COUNT)]
+    if not wait:
+        flush_writes()
+        results = [future.result() for future in results]
+        # Semua mutasi wait=False masuk ke satu group commit
+        assert db.writes.flushes - flushes == 1, db.writes.flushes - flushes
+    assert len(set(results)) == WRITE_COUNT
+    with db.transaction() as conn:
+        conn.execute("DELETE FROM habit_log WHERE id BETWEEN ? AND ?", (min(results), max(results)))
+        conn.execute("DELETE FROM daily_completion WHERE day = ?", (to_day(day),))
+
+@scenario("log_evidence_each")
+def bench_log_evidence_each(ctx):
+    _log_many(wait=True)
+
+@scenario("log_evidence_batched")
+def bench_log_evidence_batched(ctx):
+    _log_many(wait=False)
+
+@scenario("mark_completed_days", widget=True)
+def bench_mark_completed_days(ctx):
+    from ui.calendar import visible_range
+    last = datetime.date.fromisoformat(LAST_DATE)
+    highlighter = ctx.window.calendar_highlighter
+    start, end = visible_range(last.year, last.month, highlighter.calendar.firstDayOfWeek().value)
+    # Dua halaman bergantian agar setiap putaran benar-benar menerapkan selisih
+    highlighter.apply(frozenset(fetch_completed_dates(start, end)))
+    highlighter.apply(frozenset())
+
+@scenario("load_habits", widget=True)
+def bench_load_habits(ctx):
+    from PyQt6.QtWidgets import QListView
+    from ui.models import HabitListModel
+    model = HabitListModel()
+    view = QListView()
+    view.setModel(model)
+    model.fetchMore()
+    ctx.app.processEvents()
+
+@scenario("load_completed_habits", widget=True)
+def bench_load_completed_habits(ctx):
+    from PyQt6.QtWidgets import QListView
+    from ui.models import CompletedLogModel
+    model = CompletedLogModel()
+    view = QListView()
+    view.setModel(model)
+    model.fetchMore()
+    ctx.app.processEvents()
+
+STARTUP_SCRIPT = """
+import sys
+from database.db_manager import use_db_file
+use_db_file(sys.argv[1])
+from PyQt6.QtWidgets import QApplication
+app = QApplication(sys.argv[:1])
+from ui.main_window import HabitTrackerApp
+window = HabitTrackerApp()
+window.show()
+app.processEvents()
+window.db_worker.stop()
+"""
+
+@scenario("cold_startup")
+def bench_cold_startup(ctx):
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, ctx.path],
+                   cwd=ROOT_DIR, env=env, check=True, capture_output=True)
+
+
+def measure(fn, ctx, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(ctx)
+        timings.append(time.perf_counter() - start)
+    return {
+        "runs": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.fmean(timings),
+        "max": max(timings),
+    }
+
+def run(sizes, scenarios, repeat, include_widgets=True):
+    results = []
+    for size in sizes:
+        path = generate(size)
+        use_db_file(path)
+        ctx = Context(path)
+        try:
+            for name in scenarios:
+                fn, widget = SCENARIOS[name]
+                if widget and not include_widgets:
+                    continue
+                fn(ctx)   # pemanasan (cache halaman, impor modul)
+                stats = measure(fn, ctx, repeat)
+                habits, logs = SIZES[size]
+                results.append(dict(size=size, habits=habits, logs=logs, scenario=name, **stats))
+                print(f"{size:>7} {name:<24} median {stats['median'] * 1000:9.3f} ms")
+        finally:
+            ctx.close()
+            db_manager.close_db()
+    return {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+def compare(current, baseline_path):
+    """Mencetak rasio median terhadap hasil sebelumnya"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["size"], r["scenario"]): r for r in json.load(f)["results"]}
+    for result in current["results"]:
+        old = baseline.get((result["size"], result["scenario"]))
+        if old:
+            ratio = result["median"] / old["median"] if old["median"] else float("inf")
+            print(f"{result['size']:>7} {result['scenario']:<24} x{ratio:6.2f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark jalur database dan UI habtrack")
+    parser.add_argument("--sizes", nargs="+", default=["tiny", "small"], choices=sorted(SIZES))
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-widgets", action="store_true", help="lewati skenario yang butuh Qt")
+    parser.add_argument("--output", default=os.path.join(DATA_DIR, "bench_results.json"))
+    parser.add_argument("--compare", metavar="BASELINE_JSON")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.scenarios, args.repeat, not args.no_widgets)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil ditulis ke {args.output}")
+    if args.compare:
+        compare(report, args.compare)
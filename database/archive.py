@@ -0,0 +1,190 @@
+import datetime
+import gzip
+import os
+import shutil
+import sqlite3
+from database.db_manager import (
+    get_manager, init_db, close_db, use_profile, archive_dir, attached_archive,
+    fetch_archive_partitions, LOG_INDEXES, LOG_ROLLUP_TRIGGERS
+)
+from database.records import to_day, from_day
+
+# Skema habit_log di file arsip (tanpa foreign key: habit bisa dihapus setelah diarsipkan)
+ARCHIVE_SCHEMA = '''CREATE TABLE IF NOT EXISTS {schema}.habit_log (
+                        id INTEGER PRIMARY KEY,
+                        habit_id INTEGER NOT NULL,
+                        day INTEGER NOT NULL,
+                        evidence TEXT,
+                        note TEXT)'''
+
+
+def archive_file(year, compress=False):
+    """Nama file arsip satu tahun"""
+    return f"habit_log-{year}.db" + (".gz" if compress else "")
+
+def year_range(year):
+    """(hari pertama, hari terakhir) satu tahun kalender"""
+    return to_day(datetime.date(year, 1, 1)), to_day(datetime.date(year, 12, 31))
+
+def closed_years(today=None):
+    """Tahun yang sudah lewat, masih punya log aktif dan belum diarsipkan"""
+    today = today or datetime.date.today()
+    db = get_manager()
+    first_day, _ = year_range(today.year)
+    row = db.fetchone("SELECT MIN(day) FROM habit_log WHERE day < ?", (first_day,))
+    if row[0] is None:
+        return []
+    archived = {row[0] for row in db.fetchall("SELECT year FROM archive_partitions")}
+    return [year for year in range(from_day(row[0]).year, today.year) if year not in archived]
+
+def _build(db, year, path):
+    """Menyalin log satu tahun ke file baru yang sudah dipadatkan (VACUUM INTO)"""
+    first_day, last_day = year_range(year)
+    staging = path + ".build"
+    for leftover in (staging, path):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    db.execute("ATTACH DATABASE ? AS build", (staging,))
+    try:
+        with db.transaction() as conn:
+            conn.execute(ARCHIVE_SCHEMA.format(schema="build"))
+            # id dipertahankan: riwayat tetap bisa dipaging per id lintas partisi
+            conn.execute("""
+                INSERT INTO build.habit_log (id, habit_id, day, evidence, note)
+                SELECT id, habit_id, day, evidence, note FROM main.habit_log
+                WHERE day BETWEEN ? AND ?
+                ORDER BY id""", (first_day, last_day))
+            for sql in LOG_INDEXES.values():
+                conn.execute(sql.replace("IF NOT EXISTS ", "IF NOT EXISTS build."))
+            stats = conn.execute(
+                "SELECT COUNT(*), MIN(id), MAX(id) FROM build.habit_log").fetchone()
+    finally:
+        db.execute("DETACH DATABASE build")
+
+    # File arsip hanya dibaca: tanpa WAL, halaman dipadatkan
+    conn = sqlite3.connect(staging, isolation_level=None)
+    try:
+        conn.execute("VACUUM INTO ?", (path,))
+    finally:
+        conn.close()
+    os.remove(staging)
+    return stats
+
+def _compress(path):
+    with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(path)
+    return path + ".gz"
+
+def archive_year(year, compress=False, today=None):
+    """Memindahkan log satu tahun yang sudah lewat ke file arsip, mengembalikan jumlah log
+
+    File arsip dibangun dan dipadatkan lebih dulu; baris aktif baru dihapus
+    (dalam satu transaksi bersama pencatatan partisi) setelah file lengkap,
+    sehingga proses yang terputus cukup diulang.
+    """
+    today = today or datetime.date.today()
+    if year >= today.year:
+        raise ValueError(f"Tahun {year} belum selesai dan tidak bisa diarsipkan")
+    db = get_manager()
+    if db.fetchone("SELECT 1 FROM archive_partitions WHERE year = ?", (year,)):
+        raise ValueError(f"Tahun {year} sudah diarsipkan")
+
+    directory = archive_dir(db)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, archive_file(year))
+    rows, min_id, max_id = _build(db, year, path)
+    if not rows:
+        os.remove(path)
+        return 0
+    if compress:
+        path = _compress(path)
+
+    first_day, last_day = year_range(year)
+    with db.transaction() as conn:
+        # Trigger rollup membaca pasangan habit/hari ini agar log baru di hari arsip tidak dihitung lagi
+        conn.execute("""
+            INSERT OR IGNORE INTO archived_log_days (habit_id, day)
+            SELECT DISTINCT habit_id, day FROM habit_log
+            WHERE day BETWEEN ? AND ? AND id <= ? AND evidence IS NOT NULL""",
+            (first_day, last_day, max_id))
+        # Rollup hari-hari tersebut tetap berlaku: trigger pengurang dilepas selama penghapusan
+        conn.execute("DROP TRIGGER IF EXISTS trg_habit_log_delete_rollup")
+        # Hanya baris yang sudah disalin: log tahun itu yang ditulis setelah _build tetap aktif
+        conn.execute("DELETE FROM habit_log WHERE day BETWEEN ? AND ? AND id <= ?",
+                     (first_day, last_day, max_id))
+        conn.execute(LOG_ROLLUP_TRIGGERS["trg_habit_log_delete_rollup"])
+        conn.execute("""
+            INSERT INTO archive_partitions (year, file, first_day, last_day, min_id, max_id, rows)
+            VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (year, os.path.basename(path), first_day, last_day, min_id, max_id, rows))
+    return rows
+
+def restore_year(year):
+    """Mengembalikan log satu tahun dari arsip ke database utama lalu menghapus file arsipnya"""
+    db = get_manager()
+    partition = db.fetchone(
+        "SELECT file, first_day, last_day FROM archive_partitions WHERE year = ?", (year,))
+    if partition is None:
+        raise ValueError(f"Tahun {year} tidak ada di arsip")
+    file, first_day, last_day = partition
+    with attached_archive(year, file, db) as schema:
+        with db.transaction() as conn:
+            # Rollup hari arsip sudah benar: trigger penambah dilepas selama penyalinan
+            conn.execute("DROP TRIGGER IF EXISTS trg_habit_log_insert_rollup")
+            cursor = conn.execute(f"""
+                INSERT INTO main.habit_log (id, habit_id, day, evidence, note)
+                SELECT id, habit_id, day, evidence, note FROM {schema}.habit_log
+                WHERE habit_id IN (SELECT id FROM main.habits)
+                ORDER BY id""")
+            rows = cursor.rowcount
+            conn.execute(LOG_ROLLUP_TRIGGERS["trg_habit_log_insert_rollup"])
+            conn.execute("DELETE FROM archived_log_days WHERE day BETWEEN ? AND ?", (first_day, last_day))
+            conn.execute("DELETE FROM archive_partitions WHERE year = ?", (year,))
+    directory = archive_dir(db)
+    os.remove(os.path.join(directory, file))
+    extracted = os.path.join(directory, "cache", file[:-3])
+    if file.endswith(".gz") and os.path.exists(extracted):
+        os.remove(extracted)
+    return rows
+
+def compact_main():
+    """Memadatkan database utama setelah log dipindahkan ke arsip"""
+    db = get_manager()
+    db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    db.execute("VACUUM")
+    return os.path.getsize(db.db_file)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Arsip log habtrack per tahun")
+    parser.add_argument("--profile", help="profil (shard database) yang diarsipkan")
+    sub = parser.add_subparsers(dest="command", required=True)
+    archive_cmd = sub.add_parser("archive", help="pindahkan log tahun yang sudah lewat ke arsip")
+    archive_cmd.add_argument("years", nargs="*", type=int,
+                             help="tahun yang diarsipkan (default: semua tahun yang sudah lewat)")
+    archive_cmd.add_argument("--compress", action="store_true", help="simpan arsip sebagai .db.gz")
+    archive_cmd.add_argument("--no-vacuum", action="store_true",
+                             help="jangan padatkan database utama sesudahnya")
+    restore_cmd = sub.add_parser("restore", help="kembalikan log satu tahun dari arsip")
+    restore_cmd.add_argument("year", type=int)
+    sub.add_parser("list", help="tampilkan partisi arsip")
+    args = parser.parse_args()
+
+    if args.profile:
+        use_profile(args.profile)
+    init_db()
+    if args.command == "archive":
+        for year in args.years or closed_years():
+            print(f"{year}: {archive_year(year, args.compress)} log diarsipkan")
+        if not args.no_vacuum:
+            print(f"database utama: {compact_main() / 1024:.0f} KB")
+    elif args.command == "restore":
+        print(f"{args.year}: {restore_year(args.year)} log dikembalikan")
+    else:
+        for year, file, *_, min_id, max_id in fetch_archive_partitions():
+            size = os.path.getsize(os.path.join(archive_dir(), file))
+            print(f"{year}: {file} ({size / 1024:.0f} KB, id {min_id}..{max_id})")
+    close_db()
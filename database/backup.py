@@ -0,0 +1,239 @@
+import datetime
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from database.db_manager import (
+    get_manager, init_db, close_db, use_profile, migrate, ensure_log_objects, SCHEMA_VERSION
+)
+from database.sync import sync_enabled, reset_device
+
+BACKUP_DIRNAME = "backups"
+SNAPSHOT_PREFIX = "habits-"
+TIMESTAMP = "%Y%m%d-%H%M%S-%f"
+
+# Halaman per langkah backup API (1024 x 4 KB = 4 MB) dan jeda antarlangkah,
+# agar penulis lain tidak tertahan lama oleh kunci baca
+PAGES_PER_STEP = 1024
+STEP_SLEEP = 0.005
+CHUNK_SIZE = 1024 * 1024
+
+# Retensi: beberapa snapshot terakhir, lalu satu per hari dan satu per minggu
+KEEP_LAST = 3
+KEEP_DAILY = 7
+KEEP_WEEKLY = 4
+
+
+class BackupCancelled(Exception):
+    """Backup dihentikan lewat event cancel"""
+
+
+def backup_dir(db=None):
+    """Folder snapshot, di samping file database (per profil)"""
+    db = db or get_manager()
+    return os.path.join(os.path.dirname(os.path.abspath(db.db_file)), BACKUP_DIRNAME)
+
+def snapshot_time(path):
+    """Waktu pengambilan snapshot dari nama filenya, atau None jika bukan snapshot"""
+    name = os.path.basename(path)
+    if not name.startswith(SNAPSHOT_PREFIX) or not name.endswith((".db", ".db.gz")):
+        return None
+    stamp = name[len(SNAPSHOT_PREFIX):].split(".", 1)[0]
+    try:
+        return datetime.datetime.strptime(stamp, TIMESTAMP)
+    except ValueError:
+        return None
+
+def list_snapshots(db=None):
+    """(waktu, path) semua snapshot, terbaru dulu"""
+    directory = backup_dir(db)
+    if not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for name in os.listdir(directory):
+        taken = snapshot_time(name)
+        if taken is not None:
+            snapshots.append((taken, os.path.join(directory, name)))
+    return sorted(snapshots, reverse=True)
+
+def _compress(path):
+    # Dikompresi per chunk: memori tetap kecil untuk database berukuran GB
+    with open(path, "rb") as src, gzip.open(path + ".gz.partial", "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    os.remove(path)
+    return path + ".gz.partial"
+
+def create_backup(db=None, compress=False, pages=PAGES_PER_STEP, sleep=STEP_SLEEP,
+                  progress=None, cancel=None, verify=True):
+    """Membuat snapshot lewat online backup API, mengembalikan path-nya
+
+    Salinan diambil bertahap `pages` halaman per langkah dari koneksi
+    tersendiri. Koneksi itu menahan satu transaksi baca sehingga seluruh
+    salinan berasal dari satu snapshot WAL; penulisan aplikasi selama
+    backup tidak memulai ulang salinan dan tidak ikut tersalin.
+    progress(halaman_selesai, total) dipanggil setiap langkah; cancel
+    (threading.Event) menghentikan backup di langkah berikutnya.
+    """
+    db = db or get_manager()
+    db.writes.flush()
+    directory = backup_dir(db)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{SNAPSHOT_PREFIX}{datetime.datetime.now().strftime(TIMESTAMP)}.db")
+    partial = path + ".partial"
+
+    def step(status, remaining, total):
+        if cancel is not None and cancel.is_set():
+            raise BackupCancelled()
+        if progress is not None:
+            progress(total - remaining, total)
+
+    src = sqlite3.connect(db.db_file, isolation_level=None, timeout=db.timeout)
+    dst = sqlite3.connect(partial, isolation_level=None)
+    try:
+        src.execute("BEGIN")
+        src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        src.backup(dst, pages=pages, progress=step, sleep=sleep)
+        src.execute("COMMIT")
+        # Snapshot berdiri sendiri: satu file tanpa -wal/-shm
+        dst.execute("PRAGMA journal_mode = DELETE")
+        if verify and dst.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+            raise sqlite3.DatabaseError("Snapshot gagal diverifikasi (quick_check)")
+    except BaseException:
+        dst.close()
+        os.remove(partial)
+        raise
+    finally:
+        src.close()
+    dst.close()
+
+    if compress:
+        partial = _compress(partial)
+        path += ".gz"
+    os.replace(partial, path)
+    return path
+
+def prune(db=None, keep_last=KEEP_LAST, keep_daily=KEEP_DAILY, keep_weekly=KEEP_WEEKLY, now=None):
+    """Menghapus snapshot di luar kebijakan retensi, mengembalikan path yang dihapus
+
+    Dipertahankan: keep_last snapshot terbaru, snapshot terbaru setiap hari
+    selama keep_daily hari, dan snapshot terbaru setiap minggu selama
+    keep_weekly minggu.
+    """
+    today = (now or datetime.datetime.now()).date()
+    snapshots = list_snapshots(db)
+    keep = {path for _, path in snapshots[:keep_last]}
+    days, weeks = set(), set()
+    for taken, path in snapshots:
+        day = taken.date()
+        age = (today - day).days
+        if age < keep_daily and day not in days:
+            days.add(day)
+            keep.add(path)
+        week = day.isocalendar()[:2]
+        if age < keep_weekly * 7 and week not in weeks:
+            weeks.add(week)
+            keep.add(path)
+    removed = [path for _, path in snapshots if path not in keep]
+    for path in removed:
+        os.remove(path)
+    return removed
+
+@contextmanager
+def opened_snapshot(path):
+    """Path file SQLite snapshot; snapshot .gz diekstrak sementara selama blok with"""
+    if not path.endswith(".gz"):
+        yield path
+        return
+    fd, extracted = tempfile.mkstemp(suffix=".db", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with gzip.open(path, "rb") as src, os.fdopen(fd, "wb") as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        yield extracted
+    finally:
+        os.remove(extracted)
+
+def validate_snapshot(path):
+    """Memastikan file snapshot utuh dan skemanya bisa dipakai; ValueError jika tidak"""
+    try:
+        conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        try:
+            if conn.execute("PRAGMA integrity_check").fetchone()[0] != "ok":
+                raise ValueError("integrity_check gagal")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as exc:
+        raise ValueError(f"Bukan database SQLite yang valid: {exc}") from None
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Skema snapshot (v{version}) lebih baru dari aplikasi (v{SCHEMA_VERSION})")
+    if not {"habits", "habit_log"} <= tables:
+        raise ValueError("Snapshot tidak berisi tabel habits/habit_log")
+    return version
+
+def restore_backup(path, db=None, safety=True):
+    """Memvalidasi snapshot lalu menyalinnya ke database aktif
+
+    Isi database diganti lewat backup API (bukan menimpa file), sehingga
+    koneksi lain yang masih terbuka langsung melihat isi baru dan tidak
+    ada file setengah tertulis. Dengan safety=True database saat ini
+    di-snapshot lebih dulu. Snapshot berskema lama dimigrasikan. Jika sync
+    aktif, database mendapat id perangkat baru (lihat reset_device).
+    """
+    db = db or get_manager()
+    with opened_snapshot(path) as snapshot:
+        validate_snapshot(snapshot)
+        if safety:
+            create_backup(db)
+        db.writes.flush()
+        src = sqlite3.connect(snapshot)
+        dst = sqlite3.connect(db.db_file, isolation_level=None, timeout=db.timeout)
+        try:
+            src.backup(dst, pages=PAGES_PER_STEP)
+            dst.execute("PRAGMA journal_mode = WAL")
+        finally:
+            src.close()
+            dst.close()
+    db.cache.invalidate()
+    migrate(db)
+    ensure_log_objects(db)
+    if sync_enabled(db):
+        reset_device(db)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Backup dan restore database habtrack")
+    parser.add_argument("--profile", help="profil (shard database) yang di-backup/restore")
+    sub = parser.add_subparsers(dest="command", required=True)
+    create_cmd = sub.add_parser("create", help="buat snapshot lalu terapkan retensi")
+    create_cmd.add_argument("--compress", action="store_true", help="simpan sebagai .db.gz")
+    create_cmd.add_argument("--pages", type=int, default=PAGES_PER_STEP, help="halaman per langkah")
+    sub.add_parser("list", help="tampilkan snapshot")
+    sub.add_parser("prune", help="hapus snapshot di luar retensi")
+    restore_cmd = sub.add_parser("restore", help="validasi snapshot lalu pulihkan")
+    restore_cmd.add_argument("snapshot")
+    restore_cmd.add_argument("--no-safety", action="store_true",
+                             help="jangan snapshot database saat ini sebelum restore")
+    args = parser.parse_args()
+
+    if args.profile:
+        use_profile(args.profile)
+    init_db()
+    if args.command == "create":
+        print(create_backup(compress=args.compress, pages=args.pages))
+        for path in prune():
+            print(f"dihapus: {path}")
+    elif args.command == "list":
+        for taken, path in list_snapshots():
+            print(f"{taken:%Y-%m-%d %H:%M:%S}  {os.path.getsize(path) / 1024:10.0f} KB  {path}")
+    elif args.command == "prune":
+        for path in prune():
+            print(f"dihapus: {path}")
+    else:
+        restore_backup(args.snapshot, safety=not args.no_safety)
+        print(f"dipulihkan dari {args.snapshot}")
+    close_db()
@@ -1,43 +1,1229 @@
+import atexit
+import datetime
+import gzip
 import os
+import shutil
 import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from database.records import MIN_DAY, MAX_DAY, to_day, Habit, LogEntry
+from utils import paths
+from utils.recurrence import DAILY, RECURRENCE_COLUMNS, Recurrence, due_sql
+from utils.tracing import tracer, percentile
+
+DB_FILE = paths.db_file()
+
+
+class QueryCache:
+    """Cache LRU hasil query baca, dibatalkan oleh penghitung generasi tulis
+
+    Setiap entri menyimpan generasi saat query dijalankan; entri dari
+    generasi lama dianggap basi. Hasil yang dihitung bersamaan dengan
+    sebuah penulisan otomatis tidak pernah dipakai lagi.
+    """
+
+    def __init__(self, max_entries=256, max_rows=100000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # (sql, params) -> (generation, rows)
+        self._rows = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._rows = 0
+
+    def get(self, key):
+        """Hasil tersimpan (tuple baris) atau None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self.generation:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, generation, rows):
+        if len(rows) > self.max_rows:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._rows -= len(old[1])
+            self._entries[key] = (generation, rows)
+            self._rows += len(rows)
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._rows -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "rows": self._rows,
+                "generation": self.generation,
+            }
+
+
+class WriteBehindQueue:
+    """Antrean write-behind: mutasi digabung menjadi satu transaksi (group commit)
+
+    Mutasi dari submit() ditahan di memori lalu ditulis oleh thread flusher
+    dalam satu BEGIN IMMEDIATE ... COMMIT (satu fsync) setelah `delay` detik,
+    begitu antrean mencapai `max_batch`, atau saat flush()/close() dipanggil.
+    Tiap mutasi berjalan dalam SAVEPOINT sendiri: kegagalannya hanya
+    diteruskan ke Future miliknya. Future baru selesai setelah COMMIT.
+    """
+
+    # Jumlah sampel metrik yang disimpan
+    MAX_SAMPLES = 500
+
+    def __init__(self, db, delay=0.05, max_batch=500):
+        self.db = db
+        self.delay = delay
+        self.max_batch = max_batch
+        self._pending = []      # (sql, params, future, waktu masuk)
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._closing = False
+        self._exit_hook = False
+        self.flushes = 0
+        self.writes = 0
+        self.flush_times = deque(maxlen=self.MAX_SAMPLES)
+        self.wait_times = deque(maxlen=self.MAX_SAMPLES)
+        self.batch_sizes = deque(maxlen=self.MAX_SAMPLES)
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def submit(self, sql, params=()):
+        """Mengantrekan satu mutasi, mengembalikan Future berisi lastrowid-nya"""
+        future = Future()
+        with self._cond:
+            self._pending.append((sql, params, future, time.perf_counter()))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+                if not self._exit_hook:
+                    # Thread flusher adalah daemon: sisa antrean ditulis saat interpreter keluar
+                    atexit.register(self.flush)
+                    self._exit_hook = True
+            self._cond.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+                # Menunggu mutasi lain sampai batas waktu mutasi tertua atau ukuran batch
+                deadline = self._pending[0][3] + self.delay
+                while self._pending and len(self._pending) < self.max_batch and not self._closing:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self.flush()
+
+    def flush(self):
+        """Menulis semua mutasi yang mengantre dalam satu transaksi, mengembalikan jumlahnya"""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            results = self._commit(batch)
+        # Future diselesaikan di luar kunci: callback-nya boleh memakai database lagi
+        for future, rowid, error in results:
+            if error is None:
+                future.set_result(rowid)
+            else:
+                future.set_exception(error)
+        return len(batch)
+
+    def _commit(self, batch):
+        start = time.perf_counter()
+        conn = self.db.connection
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for sql, params, future, _ in batch:
+                    conn.execute("SAVEPOINT write_behind")
+                    try:
+                        results.append((future, conn.execute(sql, params).lastrowid, None))
+                    except sqlite3.Error as error:
+                        conn.execute("ROLLBACK TO write_behind")
+                        results.append((future, None, error))
+                    conn.execute("RELEASE write_behind")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as error:
+            results = [(future, None, error) for _, _, future, _ in batch]
+        self.db.cache.invalidate()
+
+        now = time.perf_counter()
+        with self._cond:
+            self.flushes += 1
+            self.writes += len(batch)
+            self.flush_times.append(now - start)
+            self.batch_sizes.append(len(batch))
+            self.wait_times.extend(now - queued for _, _, _, queued in batch)
+        if tracer.enabled:
+            tracer.record("write", "flush", now - start, batch=len(batch))
+        return results
+
+    def close(self):
+        """Menghentikan thread flusher lalu menulis sisa antrean"""
+        with self._cond:
+            thread, self._thread = self._thread, None
+            self._closing = True
+            self._cond.notify()
+        if thread is not None:
+            thread.join()
+        with self._cond:
+            self._closing = False
+        self.flush()
+
+    def stats(self):
+        """Metrik group commit: ukuran batch, durasi flush dan lama menunggu (ms)"""
+        with self._cond:
+            flush_times = sorted(self.flush_times)
+            wait_times = sorted(self.wait_times)
+            sizes = list(self.batch_sizes)
+            pending = len(self._pending)
+        def ms(value):
+            return None if value is None else value * 1000
+
+        return {
+            "pending": pending,
+            "flushes": self.flushes,
+            "writes": self.writes,
+            "batch_mean": sum(sizes) / len(sizes) if sizes else 0.0,
+            "batch_max": max(sizes, default=0),
+            "flush_p50": ms(percentile(flush_times, 50)),
+            "flush_p95": ms(percentile(flush_times, 95)),
+            "wait_p50": ms(percentile(wait_times, 50)),
+            "wait_p95": ms(percentile(wait_times, 95)),
+        }
+
+
+class DatabaseManager:
+    """Mengelola koneksi SQLite jangka panjang (satu koneksi per thread)"""
+
+    # Pragma yang dijalankan sekali saat koneksi dibuka
+    PRAGMAS = (
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),   # Aman untuk WAL, fsync hanya saat checkpoint
+        ("cache_size", -8000),       # ~8 MB page cache
+        ("mmap_size", 67108864),     # 64 MB memory-mapped I/O
+        ("temp_store", "MEMORY"),
+        ("foreign_keys", "ON"),
+    )
+
+    def __init__(self, db_file=DB_FILE, cached_statements=128, timeout=5.0):
+        self.db_file = db_file
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self.cache = QueryCache()
+        self.writes = WriteBehindQueue(self)
+
+    def _connect(self):
+        """Membuka koneksi baru dan menerapkan pragma"""
+        directory = os.path.dirname(os.path.abspath(self.db_file))
+        os.makedirs(directory, exist_ok=True)
+        # isolation_level=None: autocommit, transaksi diatur lewat transaction()
+        conn = sqlite3.connect(self.db_file, timeout=self.timeout,
+                               isolation_level=None, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        for name, value in self.PRAGMAS:
+            conn.execute(f"PRAGMA {name} = {value}")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    @property
+    def connection(self):
+        """Koneksi milik thread saat ini, dibuat saat pertama kali dipakai"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.depth = 0
+        return conn
+
+    def _sync_writes(self):
+        # Baca-setelah-tulis: mutasi write-behind yang masih mengantre ditulis dulu
+        if self.writes.pending and getattr(self._local, "depth", 0) == 0:
+            self.writes.flush()
+
+    def execute(self, sql, params=()):
+        """Menjalankan satu statement (statement di-cache oleh sqlite3)"""
+        self._sync_writes()
+        if not tracer.enabled:
+            return self.connection.execute(sql, params)
+        start = time.perf_counter()
+        cursor = self.connection.execute(sql, params)
+        tracer.query(sql, time.perf_counter() - start, cursor.rowcount)
+        return cursor
+
+    def executemany(self, sql, seq_of_params):
+        self._sync_writes()
+        if not tracer.enabled:
+            return self.connection.executemany(sql, seq_of_params)
+        start = time.perf_counter()
+        cursor = self.connection.executemany(sql, seq_of_params)
+        tracer.query(sql, time.perf_counter() - start, cursor.rowcount)
+        return cursor
+
+    def fetchall(self, sql, params=()):
+        self._sync_writes()
+        if not tracer.enabled:
+            return self.connection.execute(sql, params).fetchall()
+        start = time.perf_counter()
+        rows = self.connection.execute(sql, params).fetchall()
+        tracer.query(sql, time.perf_counter() - start, len(rows))
+        return rows
+
+    def fetchone(self, sql, params=()):
+        self._sync_writes()
+        if not tracer.enabled:
+            return self.connection.execute(sql, params).fetchone()
+        start = time.perf_counter()
+        row = self.connection.execute(sql, params).fetchone()
+        tracer.query(sql, time.perf_counter() - start, 0 if row is None else 1)
+        return row
+
+    def _check_external_writes(self):
+        # data_version berubah jika koneksi lain (thread/proses lain) melakukan commit
+        version = self.connection.execute("PRAGMA data_version").fetchone()[0]
+        last = getattr(self._local, "data_version", None)
+        self._local.data_version = version
+        if last is not None and last != version:
+            self.cache.invalidate()
+
+    def cached_fetchall(self, sql, params=()):
+        """fetchall lewat QueryCache; hasilnya list baru (aman diubah pemanggil)"""
+        self._sync_writes()
+        self._check_external_writes()
+        key = (sql, params)
+        rows = self.cache.get(key)
+        if rows is None:
+            generation = self.cache.generation
+            rows = tuple(self.fetchall(sql, params))
+            self.cache.put(key, generation, rows)
+        return list(rows)
+
+    def cached_fetchone(self, sql, params=()):
+        rows = self.cached_fetchall(sql, params)
+        return rows[0] if rows else None
+
+    @contextmanager
+    def transaction(self):
+        """Context manager transaksi; blok bersarang memakai SAVEPOINT"""
+        self._sync_writes()
+        conn = self.connection
+        depth = self._local.depth
+        start = time.perf_counter()
+        if depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        else:
+            conn.execute(f"SAVEPOINT sp_{depth}")
+        self._local.depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            if depth == 0:
+                conn.execute("ROLLBACK")
+            else:
+                conn.execute(f"ROLLBACK TO sp_{depth}")
+                conn.execute(f"RELEASE sp_{depth}")
+            raise
+        else:
+            if depth == 0:
+                conn.execute("COMMIT")
+                self.cache.invalidate()
+            else:
+                conn.execute(f"RELEASE sp_{depth}")
+        finally:
+            self._local.depth = depth
+            if depth == 0 and tracer.enabled:
+                # Statement di dalam blok memakai conn langsung; durasinya tercakup di sini
+                tracer.record("transaction", "transaction", time.perf_counter() - start)
+
+    def close(self):
+        """Menulis antrean write-behind lalu menutup semua koneksi yang pernah dibuka"""
+        self.writes.close()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_manager():
+    """Mengembalikan DatabaseManager bersama untuk DB_FILE"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = DatabaseManager(DB_FILE)
+    return _manager
+
+
+def close_db():
+    """Menutup koneksi bersama (dipanggil saat aplikasi keluar)"""
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.close()
+            _manager = None
+
+def use_db_file(path):
+    """Mengganti file database bersama (koneksi lama ditutup)"""
+    global DB_FILE
+    close_db()
+    DB_FILE = path
+
+def use_profile(profile):
+    """Memakai shard database milik profil tersebut, mengembalikan path-nya"""
+    path = paths.db_file(profile)
+    use_db_file(path)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Migrasi skema (versi disimpan di PRAGMA user_version)
+# ---------------------------------------------------------------------------
+
+MIGRATION_BATCH = 50000
+
+# Indeks sekunder habit_log
+LOG_INDEXES = {
+    "idx_habit_log_habit_day": "CREATE INDEX IF NOT EXISTS idx_habit_log_habit_day ON habit_log(habit_id, day)",
+    "idx_habit_log_day_habit": "CREATE INDEX IF NOT EXISTS idx_habit_log_day_habit ON habit_log(day, habit_id)",
+}
+
+# Trigger yang menjaga rollup daily_completion saat habit_log berubah. `done`
+# hanya menghitung habit yang memang wajib pada hari itu (lihat due_sql);
+# setiap hari yang punya log berbukti mendapat baris rollup. Pasangan
+# habit/hari yang lognya sudah diarsipkan tercatat di archived_log_days,
+# sehingga log baru di hari arsip tidak dihitung dua kali.
+LOG_ROLLUP_TRIGGERS = {
+    # Log pertama (dengan bukti) untuk pasangan habit/hari menambah `done`.
+    # `due` (memindai semua habit) hanya dihitung saat baris hari itu belum ada;
+    # setelahnya trigger habits yang menjaganya.
+    "trg_habit_log_insert_rollup": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_habit_log_insert_rollup
+        AFTER INSERT ON habit_log
+        WHEN NEW.evidence IS NOT NULL AND (
+            SELECT COUNT(*) FROM habit_log
+            WHERE habit_id = NEW.habit_id AND day = NEW.day AND evidence IS NOT NULL) = 1
+        AND NOT EXISTS (
+            SELECT 1 FROM archived_log_days WHERE habit_id = NEW.habit_id AND day = NEW.day)
+        BEGIN
+            INSERT OR IGNORE INTO daily_completion (day, done, due)
+            SELECT NEW.day, 0, (SELECT COUNT(*) FROM habits h WHERE {due_sql("h", "NEW.day")})
+            WHERE NOT EXISTS (SELECT 1 FROM daily_completion WHERE day = NEW.day);
+            UPDATE daily_completion SET done = done + 1
+            WHERE day = NEW.day
+              AND EXISTS (SELECT 1 FROM habits h WHERE h.id = NEW.habit_id AND {due_sql("h", "NEW.day")});
+        END""",
+    # Log terakhir untuk pasangan habit/hari mengurangi `done`. Saat habit
+    # dihapus (cascade) baris habits sudah tidak ada; trigger habits yang menanganinya.
+    "trg_habit_log_delete_rollup": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_habit_log_delete_rollup
+        AFTER DELETE ON habit_log
+        WHEN OLD.evidence IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM habit_log
+            WHERE habit_id = OLD.habit_id AND day = OLD.day AND evidence IS NOT NULL)
+        AND NOT EXISTS (
+            SELECT 1 FROM archived_log_days WHERE habit_id = OLD.habit_id AND day = OLD.day)
+        BEGIN
+            UPDATE daily_completion SET done = done - 1
+            WHERE day = OLD.day
+              AND EXISTS (SELECT 1 FROM habits h WHERE h.id = OLD.habit_id AND {due_sql("h", "OLD.day")});
+        END""",
+}
+
+# Hari-hari berbukti satu habit, aktif maupun arsip
+_HABIT_DONE_DAYS = """(SELECT day FROM habit_log WHERE habit_id = {habit}.id AND evidence IS NOT NULL
+                       UNION ALL SELECT day FROM archived_log_days WHERE habit_id = {habit}.id)"""
+
+# Trigger yang menjaga `due` (dan `done` milik habit itu) saat habit atau aturannya berubah
+HABIT_ROLLUP_TRIGGERS = {
+    "trg_habits_insert_rollup": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_habits_insert_rollup
+        AFTER INSERT ON habits
+        BEGIN
+            UPDATE daily_completion SET due = due + 1 WHERE {due_sql("NEW", "day")};
+        END""",
+    # BEFORE: log habit ini masih ada untuk menghitung `done` yang berkurang
+    "trg_habits_delete_rollup": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_habits_delete_rollup
+        BEFORE DELETE ON habits
+        BEGIN
+            UPDATE daily_completion
+            SET due = due - 1,
+                done = done - (day IN {_HABIT_DONE_DAYS.format(habit="OLD")})
+            WHERE {due_sql("OLD", "day")};
+        END""",
+    "trg_habits_recurrence_rollup": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_habits_recurrence_rollup
+        AFTER UPDATE OF {", ".join(RECURRENCE_COLUMNS)} ON habits
+        BEGIN
+            UPDATE daily_completion
+            SET due = due - {due_sql("OLD", "day")} + {due_sql("NEW", "day")},
+                done = done + (day IN {_HABIT_DONE_DAYS.format(habit="NEW")})
+                              * ({due_sql("NEW", "day")} - {due_sql("OLD", "day")})
+            WHERE {due_sql("OLD", "day")} OR {due_sql("NEW", "day")};
+        END""",
+}
+
+# Trigger yang menjaga indeks FTS catatan log (hanya baris yang punya catatan)
+LOG_FTS_TRIGGERS = {
+    "trg_habit_log_insert_fts": """
+        CREATE TRIGGER IF NOT EXISTS trg_habit_log_insert_fts
+        AFTER INSERT ON habit_log
+        WHEN NEW.note IS NOT NULL
+        BEGIN
+            INSERT INTO log_fts (rowid, note) VALUES (NEW.id, NEW.note);
+        END""",
+    "trg_habit_log_delete_fts": """
+        CREATE TRIGGER IF NOT EXISTS trg_habit_log_delete_fts
+        AFTER DELETE ON habit_log
+        WHEN OLD.note IS NOT NULL
+        BEGIN
+            INSERT INTO log_fts (log_fts, rowid, note) VALUES ('delete', OLD.id, OLD.note);
+        END""",
+    "trg_habit_log_update_fts": """
+        CREATE TRIGGER IF NOT EXISTS trg_habit_log_update_fts
+        AFTER UPDATE OF note ON habit_log
+        BEGIN
+            INSERT INTO log_fts (log_fts, rowid, note)
+            SELECT 'delete', OLD.id, OLD.note WHERE OLD.note IS NOT NULL;
+            INSERT INTO log_fts (rowid, note)
+            SELECT NEW.id, NEW.note WHERE NEW.note IS NOT NULL;
+        END""",
+}
+
+def _set_version(conn, version):
+    conn.execute(f"PRAGMA user_version = {version}")
+
+def _migrate_v1(db):
+    """Skema awal: habits dan habit_log berbasis nama"""
+    with db.transaction() as conn:
+        conn.execute('''CREATE TABLE IF NOT EXISTS habits (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            name TEXT NOT NULL,
+                            remind_time TEXT NOT NULL,
+                            description TEXT)''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS habit_log (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            habit_name TEXT NOT NULL,
+                            date TEXT NOT NULL,
+                            evidence TEXT)''')
+        _set_version(conn, 1)
+
+def _migrate_v2(db):
+    """habit_log memakai habit_id + nomor hari, dengan indeks
+
+    Log disalin per batch id sehingga migrasi bisa dilanjutkan jika terputus:
+    habit_log_new dan baris yang sudah tersalin tetap ada di antara batch.
+    """
+    with db.transaction() as conn:
+        # Nama habit dibuat unik; duplikat diberi akhiran id-nya
+        conn.execute("""UPDATE habits SET name = name || ' (' || id || ')'
+                        WHERE id NOT IN (SELECT MIN(id) FROM habits GROUP BY name)""")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_habits_name ON habits(name)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_habits_remind_time ON habits(remind_time)")
+        conn.execute('''CREATE TABLE IF NOT EXISTS habit_log_new (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            habit_id INTEGER NOT NULL REFERENCES habits(id) ON DELETE CASCADE,
+                            day INTEGER NOT NULL,
+                            evidence TEXT)''')
+
+    start = db.fetchone("SELECT COALESCE(MAX(id), 0) FROM habit_log_new")[0]
+    end = db.fetchone("SELECT COALESCE(MAX(id), 0) FROM habit_log")[0]
+    # Log milik habit yang sudah dihapus tidak punya pasangan dan ikut dibuang
+    while start < end:
+        stop = start + MIGRATION_BATCH
+        with db.transaction() as conn:
+            conn.execute("""
+                INSERT OR IGNORE INTO habit_log_new (id, habit_id, day, evidence)
+                SELECT l.id, h.id, CAST(julianday(l.date) - 2440587.5 AS INTEGER), l.evidence
+                FROM habit_log l JOIN habits h ON h.name = l.habit_name
+                WHERE l.id > ? AND l.id <= ?""", (start, stop))
+        start = stop
+
+    with db.transaction() as conn:
+        conn.execute("DROP TABLE habit_log")
+        conn.execute("ALTER TABLE habit_log_new RENAME TO habit_log")
+        for sql in LOG_INDEXES.values():
+            conn.execute(sql)
+        _set_version(conn, 2)
+
+def _rebuild_daily_completion(conn):
+    # Hari di tahun yang sudah diarsipkan tidak punya log aktif: rollup-nya dipertahankan
+    archived = ""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'archive_partitions'").fetchone():
+        archived = """AND NOT EXISTS (SELECT 1 FROM archive_partitions p
+                                      WHERE day BETWEEN p.first_day AND p.last_day)"""
+    # Sebelum v7 belum ada aturan jadwal: semua habit wajib setiap hari
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(habits)")}
+    due_log, due_day = ("1", "1") if "weekdays" not in columns else (
+        due_sql("h", "l.day"), due_sql("h", "d.day"))
+    conn.execute(f"DELETE FROM daily_completion WHERE 1 {archived}")
+    conn.execute(f"""
+        INSERT INTO daily_completion (day, done, due)
+        SELECT d.day, d.done, (SELECT COUNT(*) FROM habits h WHERE {due_day})
+        FROM (SELECT l.day AS day,
+                     COUNT(DISTINCT CASE WHEN {due_log} THEN l.habit_id END) AS done
+              FROM habit_log l JOIN habits h ON h.id = l.habit_id
+              WHERE l.evidence IS NOT NULL {archived}
+              GROUP BY l.day) AS d""")
+
+def _migrate_v3(db):
+    """Rollup daily_completion yang dijaga oleh trigger"""
+    with db.transaction() as conn:
+        conn.execute('''CREATE TABLE IF NOT EXISTS daily_completion (
+                            day INTEGER PRIMARY KEY,
+                            done INTEGER NOT NULL,
+                            due INTEGER NOT NULL)''')
+        for sql in LOG_ROLLUP_TRIGGERS.values():
+            conn.execute(sql)
+        # Semua habit dianggap jatuh tempo setiap hari
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_habits_insert_rollup
+            AFTER INSERT ON habits
+            BEGIN
+                UPDATE daily_completion SET due = due + 1;
+            END""")
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_habits_delete_rollup
+            AFTER DELETE ON habits
+            BEGIN
+                UPDATE daily_completion SET due = due - 1;
+            END""")
+        _rebuild_daily_completion(conn)
+        _set_version(conn, 3)
+
+def _migrate_v4(db):
+    """Penanda versi jadwal reminder, naik setiap kali habits berubah
+
+    Proses lain (misalnya daemon reminder) cukup membaca satu baris ini
+    untuk tahu apakah jadwal perlu dimuat ulang.
+    """
+    with db.transaction() as conn:
+        conn.execute('''CREATE TABLE IF NOT EXISTS schedule_version (
+                            id INTEGER PRIMARY KEY CHECK (id = 1),
+                            version INTEGER NOT NULL)''')
+        conn.execute("INSERT OR IGNORE INTO schedule_version (id, version) VALUES (1, 0)")
+        for event in ("INSERT", "UPDATE OF name, remind_time", "DELETE"):
+            name = event.split()[0].lower()
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_habits_{name}_schedule
+                AFTER {event} ON habits
+                BEGIN
+                    UPDATE schedule_version SET version = version + 1;
+                END""")
+        _set_version(conn, 4)
+
+def _rebuild_log_fts(conn):
+    # Hanya log bercatatan yang diindeks; jauh lebih cepat dari 'rebuild' pada jutaan log
+    conn.execute("INSERT INTO log_fts (log_fts) VALUES ('delete-all')")
+    conn.execute("INSERT INTO log_fts (rowid, note) SELECT id, note FROM habit_log WHERE note IS NOT NULL")
+
+def _migrate_v5(db):
+    """Pencarian full-text (FTS5) untuk nama/deskripsi habit dan catatan log"""
+    with db.transaction() as conn:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(habit_log)")]
+        if "note" not in columns:
+            conn.execute("ALTER TABLE habit_log ADD COLUMN note TEXT")
+
+        # Tabel FTS external-content: teks tetap disimpan di habits/habit_log
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS habits_fts USING fts5(
+                name, description, content='habits', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3')""")
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_habits_insert_fts
+            AFTER INSERT ON habits
+            BEGIN
+                INSERT INTO habits_fts (rowid, name, description)
+                VALUES (NEW.id, NEW.name, NEW.description);
+            END""")
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_habits_delete_fts
+            AFTER DELETE ON habits
+            BEGIN
+                INSERT INTO habits_fts (habits_fts, rowid, name, description)
+                VALUES ('delete', OLD.id, OLD.name, OLD.description);
+            END""")
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_habits_update_fts
+            AFTER UPDATE OF name, description ON habits
+            BEGIN
+                INSERT INTO habits_fts (habits_fts, rowid, name, description)
+                VALUES ('delete', OLD.id, OLD.name, OLD.description);
+                INSERT INTO habits_fts (rowid, name, description)
+                VALUES (NEW.id, NEW.name, NEW.description);
+            END""")
+        conn.execute("INSERT INTO habits_fts (habits_fts) VALUES ('rebuild')")
+
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS log_fts USING fts5(
+                note, content='habit_log', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3')""")
+        for sql in LOG_FTS_TRIGGERS.values():
+            conn.execute(sql)
+        _rebuild_log_fts(conn)
+        _set_version(conn, 5)
+
+def _migrate_v6(db):
+    """Daftar partisi arsip: satu file SQLite per tahun yang sudah ditutup"""
+    with db.transaction() as conn:
+        conn.execute('''CREATE TABLE IF NOT EXISTS archive_partitions (
+                            year INTEGER PRIMARY KEY,
+                            file TEXT NOT NULL,
+                            first_day INTEGER NOT NULL,
+                            last_day INTEGER NOT NULL,
+                            min_id INTEGER NOT NULL,
+                            max_id INTEGER NOT NULL,
+                            rows INTEGER NOT NULL)''')
+        _set_version(conn, 6)
+
+def _migrate_v7(db):
+    """Aturan jadwal per habit (hari tertentu, setiap N hari, N kali per minggu, rentang tanggal)
+
+    Nilai default berarti setiap hari, sama seperti sebelumnya. Rollup
+    dihitung ulang: `due` per hari kini hanya menghitung habit yang wajib.
+    """
+    with db.transaction() as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(habits)")}
+        for name, definition in (("weekdays", "INTEGER NOT NULL DEFAULT 127"),
+                                 ("every_days", "INTEGER NOT NULL DEFAULT 1"),
+                                 ("per_week", "INTEGER"),
+                                 ("start_day", "INTEGER"),
+                                 ("end_day", "INTEGER")):
+            if name not in columns:
+                conn.execute(f"ALTER TABLE habits ADD COLUMN {name} {definition}")
+        for name in tuple(LOG_ROLLUP_TRIGGERS) + tuple(HABIT_ROLLUP_TRIGGERS):
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        for sql in LOG_ROLLUP_TRIGGERS.values():
+            conn.execute(sql)
+        for sql in HABIT_ROLLUP_TRIGGERS.values():
+            conn.execute(sql)
+        # Perubahan aturan juga mengubah jadwal reminder
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_habits_recurrence_schedule
+            AFTER UPDATE OF {", ".join(RECURRENCE_COLUMNS)} ON habits
+            BEGIN
+                UPDATE schedule_version SET version = version + 1;
+            END""")
+        _rebuild_daily_completion(conn)
+        _set_version(conn, 7)
+
+def _migrate_v8(db):
+    """Tabel sinkronisasi antarperangkat (lihat database/sync.py)
+
+    Habit mendapat uid global. change_log baru terisi (dan trigger
+    pencatatnya baru dibuat) saat sync pertama kali diaktifkan.
+    """
+    with db.transaction() as conn:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(habits)")}
+        if "uid" not in columns:
+            conn.execute("ALTER TABLE habits ADD COLUMN uid TEXT")
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_habits_uid ON habits(uid)")
+        conn.execute('''CREATE TABLE IF NOT EXISTS sync_state (
+                            id INTEGER PRIMARY KEY CHECK (id = 1),
+                            device TEXT NOT NULL,
+                            seq INTEGER NOT NULL,
+                            clock INTEGER NOT NULL)''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS change_log (
+                            seq INTEGER PRIMARY KEY,
+                            origin TEXT NOT NULL,
+                            origin_seq INTEGER NOT NULL,
+                            clock INTEGER NOT NULL,
+                            entity TEXT NOT NULL,
+                            uid TEXT NOT NULL,
+                            op TEXT NOT NULL,
+                            payload TEXT)''')
+        conn.execute("""CREATE UNIQUE INDEX IF NOT EXISTS idx_change_log_origin
+                        ON change_log(origin, origin_seq)""")
+        conn.execute("""CREATE INDEX IF NOT EXISTS idx_change_log_habit
+                        ON change_log(uid, clock) WHERE entity = 'habit'""")
+        conn.execute('''CREATE TABLE IF NOT EXISTS sync_vector (
+                            origin TEXT PRIMARY KEY,
+                            seq INTEGER NOT NULL)''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS sync_peers (
+                            device TEXT PRIMARY KEY,
+                            vector TEXT NOT NULL,
+                            synced_at INTEGER NOT NULL)''')
+        _set_version(conn, 8)
+
+def _migrate_v9(db):
+    """Trigger rollup log versi v7 menghitung ulang `due` untuk setiap log; diganti"""
+    with db.transaction() as conn:
+        conn.execute("DROP TRIGGER IF EXISTS trg_habit_log_insert_rollup")
+        conn.execute(LOG_ROLLUP_TRIGGERS["trg_habit_log_insert_rollup"])
+        _set_version(conn, 9)
+
+def _migrate_v10(db):
+    """Pasangan habit/hari berbukti yang sudah diarsipkan, dibaca oleh trigger rollup
+
+    Sebelumnya trigger hanya melihat log aktif: log baru di hari arsip
+    menambah `done` lagi. Tabel diisi dari partisi yang sudah ada.
+    """
+    with db.transaction() as conn:
+        conn.execute('''CREATE TABLE IF NOT EXISTS archived_log_days (
+                            habit_id INTEGER NOT NULL REFERENCES habits(id) ON DELETE CASCADE,
+                            day INTEGER NOT NULL,
+                            PRIMARY KEY (habit_id, day)) WITHOUT ROWID''')
+    for year, file in db.fetchall("SELECT year, file FROM archive_partitions"):
+        with attached_archive(year, file, db) as schema:
+            with db.transaction() as conn:
+                conn.execute(f"""
+                    INSERT OR IGNORE INTO main.archived_log_days (habit_id, day)
+                    SELECT DISTINCT habit_id, day FROM {schema}.habit_log
+                    WHERE evidence IS NOT NULL AND habit_id IN (SELECT id FROM main.habits)""")
+    with db.transaction() as conn:
+        for name in tuple(LOG_ROLLUP_TRIGGERS) + tuple(HABIT_ROLLUP_TRIGGERS):
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        for sql in LOG_ROLLUP_TRIGGERS.values():
+            conn.execute(sql)
+        for sql in HABIT_ROLLUP_TRIGGERS.values():
+            conn.execute(sql)
+        _set_version(conn, 10)
+
+MIGRATIONS = (_migrate_v1, _migrate_v2, _migrate_v3, _migrate_v4, _migrate_v5, _migrate_v6, _migrate_v7,
+              _migrate_v8, _migrate_v9, _migrate_v10)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+def migrate(db):
+    """Menjalankan migrasi yang belum diterapkan secara berurutan"""
+    version = db.fetchone("PRAGMA user_version")[0]
+    for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        migration(db)
+        assert db.fetchone("PRAGMA user_version")[0] == target
+    return SCHEMA_VERSION
+
+
+def ensure_log_objects(db):
+    """Membuat ulang indeks/trigger habit_log yang hilang (misalnya impor massal terputus)"""
+    names = tuple(LOG_INDEXES) + tuple(LOG_ROLLUP_TRIGGERS) + tuple(LOG_FTS_TRIGGERS)
+    placeholders = ", ".join("?" * len(names))
+    present = db.fetchone(
+        f"SELECT COUNT(*) FROM sqlite_master WHERE name IN ({placeholders})", names)[0]
+    if present == len(names):
+        return False
+    with db.transaction() as conn:
+        for sql in LOG_INDEXES.values():
+            conn.execute(sql)
+        for sql in LOG_ROLLUP_TRIGGERS.values():
+            conn.execute(sql)
+        for sql in LOG_FTS_TRIGGERS.values():
+            conn.execute(sql)
+        _rebuild_daily_completion(conn)
+        _rebuild_log_fts(conn)
+    return True
+
+@contextmanager
+def bulk_load(db):
+    """Melepas indeks sekunder serta trigger rollup dan FTS habit_log selama impor besar
+
+    Menyisipkan jutaan baris ke tabel tanpa indeks lalu membangun indeks
+    sekali di akhir jauh lebih cepat daripada memperbarui B-tree per baris.
+    Jika proses terputus, init_db() memulihkannya lewat ensure_log_objects().
+    """
+    with db.transaction() as conn:
+        for name in tuple(LOG_ROLLUP_TRIGGERS) + tuple(LOG_FTS_TRIGGERS):
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        for name in LOG_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+    try:
+        yield db
+    finally:
+        ensure_log_objects(db)
+
+
+# ---------------------------------------------------------------------------
+# Partisi arsip: log tahun yang sudah ditutup dipindah ke file per tahun
+# (lihat database/archive.py) dan di-ATTACH hanya saat rentang query
+# membutuhkannya. Rollup daily_completion tetap di database utama.
+# ---------------------------------------------------------------------------
+
+ARCHIVE_DIRNAME = "archive"
+
+def archive_dir(db=None):
+    """Folder file arsip, di samping file database utama"""
+    db = db or get_manager()
+    return os.path.join(os.path.dirname(os.path.abspath(db.db_file)), ARCHIVE_DIRNAME)
+
+def archive_path(file, db=None):
+    """Path file arsip yang bisa di-ATTACH; arsip .gz diekstrak sekali ke folder cache"""
+    directory = archive_dir(db)
+    path = os.path.join(directory, file)
+    if not file.endswith(".gz"):
+        return path
+    extracted = os.path.join(directory, "cache", file[:-3])
+    if not os.path.exists(extracted) or os.path.getmtime(extracted) < os.path.getmtime(path):
+        os.makedirs(os.path.dirname(extracted), exist_ok=True)
+        partial = f"{extracted}.{os.getpid()}.{threading.get_ident()}.part"
+        with gzip.open(path, "rb") as src, open(partial, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(partial, extracted)
+    return extracted
+
+@contextmanager
+def attached_archive(year, file, db=None):
+    """ATTACH satu file arsip sebagai skema archive_<tahun> selama blok with"""
+    db = db or get_manager()
+    schema = f"archive_{int(year)}"
+    db.execute(f"ATTACH DATABASE ? AS {schema}", (archive_path(file, db),))
+    try:
+        yield schema
+    finally:
+        db.execute(f"DETACH DATABASE {schema}")
+
+def fetch_archive_partitions(start=MIN_DAY, end=MAX_DAY):
+    """Partisi (tahun, file, hari pertama, hari terakhir, id terkecil, id terbesar)
+    yang beririsan dengan rentang hari, terbaru dulu"""
+    return get_manager().cached_fetchall("""
+        SELECT year, file, first_day, last_day, min_id, max_id
+        FROM archive_partitions
+        WHERE last_day >= ? AND first_day <= ?
+        ORDER BY year DESC""", (start, end))
+
+def _archive_fetchall(sql, params=(), partitions=None):
+    """Menjalankan sql pada setiap partisi; {log} diganti tabel habit_log arsip"""
+    db = get_manager()
+    if partitions is None:
+        partitions = fetch_archive_partitions()
+    rows = []
+    for year, file, *_ in partitions:
+        with attached_archive(year, file, db) as schema:
+            rows.extend(db.fetchall(sql.format(log=f"{schema}.habit_log"), params))
+    return rows
+
+
+# Kolom habits yang dibaca menjadi Habit (lihat Habit.from_row)
+HABIT_FIELDS = ("id", "name", "remind_time", "description") + RECURRENCE_COLUMNS
+HABIT_COLUMNS = ", ".join(HABIT_FIELDS)
+HABIT_COLUMNS_H = ", ".join(f"h.{name}" for name in HABIT_FIELDS)
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_FILE = os.path.join(BASE_DIR, "..", "data", "habits.db")
 
 def init_db():
     """Inisialisasi Database"""
-    os.makedirs(os.path.join(BASE_DIR, "..", "data"), exist_ok=True)
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute('''CREATE TABLE IF NOT EXISTS habits (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL,
-                        remind_time TEXT NOT NULL,
-                        description TEXT)''')
-    cursor.execute('''CREATE TABLE IF NOT EXISTS habit_log (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        habit_name TEXT NOT NULL,
-                        date TEXT NOT NULL,
-                        evidence TEXT)''')
-    conn.commit()
-    conn.close()
+    db = get_manager()
+    migrate(db)
+    ensure_log_objects(db)
 
 def fetch_habits():
-    """Mengambil semua habit dari database"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("SELECT name, remind_time, description FROM habits")
-    habits = cursor.fetchall()
-    conn.close()
-    return habits
-
-def add_habit(name, remind_time, description):
-    """Menambahkan habit baru ke database"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute("INSERT INTO habits (name, remind_time, description) VALUES (?, ?, ?)", 
-                   (name, remind_time, description))
-    conn.commit()
-    conn.close()
-
-# Tambahkan fungsi lain seperti `delete_habit`, `update_habit`, dll.
\ No newline at end of file
+    """Mengambil semua habit dari database sebagai Habit"""
+    return [Habit.from_row(row) for row in get_manager().cached_fetchall(
+        f"SELECT {HABIT_COLUMNS} FROM habits ORDER BY id")]
+
+def fetch_habits_page(after_id=0, limit=200):
+    """Mengambil satu halaman habit dengan id > after_id (keyset pagination)"""
+    return [Habit.from_row(row) for row in get_manager().cached_fetchall(
+        f"SELECT {HABIT_COLUMNS} FROM habits WHERE id > ? ORDER BY id LIMIT ?",
+        (after_id, limit))]
+
+def fetch_habit(habit_id):
+    """Mengambil satu Habit berdasarkan id, atau None"""
+    row = get_manager().cached_fetchone(
+        f"SELECT {HABIT_COLUMNS} FROM habits WHERE id = ?", (habit_id,))
+    return None if row is None else Habit.from_row(row)
+
+def _write(sql, params, wait):
+    # wait=True: antrean (termasuk mutasi lain yang menunggu) langsung di-commit
+    db = get_manager()
+    future = db.writes.submit(sql, params)
+    if not wait:
+        return future
+    db.writes.flush()
+    return future.result()
+
+def add_habit(name, remind_time, description, recurrence=DAILY, wait=True):
+    """Menambahkan habit baru ke database, mengembalikan id-nya
+
+    Dengan wait=False habit hanya diantrekan untuk group commit dan yang
+    dikembalikan adalah Future berisi id tersebut.
+    """
+    return _write(f"""
+        INSERT INTO habits (name, remind_time, description, {", ".join(RECURRENCE_COLUMNS)})
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)""", (name, remind_time, description) + recurrence.columns(), wait)
+
+def update_habit(habit_id, name, remind_time, description, recurrence=None):
+    """Memperbarui habit berdasarkan id; recurrence=None mempertahankan aturan jadwalnya
+
+    Rollup hari aktif maupun arsip disesuaikan oleh trigger.
+    """
+    db = get_manager()
+    if recurrence is None:
+        db.execute(
+            "UPDATE habits SET name = ?, remind_time = ?, description = ? WHERE id = ?",
+            (name, remind_time, description, habit_id))
+    else:
+        db.execute(f"""
+            UPDATE habits SET name = ?, remind_time = ?, description = ?,
+                {", ".join(f"{column} = ?" for column in RECURRENCE_COLUMNS)}
+            WHERE id = ?""", (name, remind_time, description) + recurrence.columns() + (habit_id,))
+    db.cache.invalidate()
+
+def delete_habit(habit_id):
+    """Menghapus habit berdasarkan id (log-nya ikut terhapus)
+
+    Log di arsip tidak diubah (query arsip selalu JOIN ke habits); rollup
+    hari-hari arsip yang diselesaikan habit ini dikurangi oleh trigger.
+    """
+    db = get_manager()
+    db.execute("DELETE FROM habits WHERE id = ?", (habit_id,))
+    db.cache.invalidate()
+
+def fetch_reminders():
+    """Mengambil semua habit (tanpa deskripsi) untuk penjadwal reminder"""
+    return [Habit.from_row(row) for row in get_manager().cached_fetchall(
+        f"SELECT id, name, remind_time, NULL, {', '.join(RECURRENCE_COLUMNS)} FROM habits")]
+
+def fetch_schedule_version():
+    """Versi jadwal reminder; berubah jika ada habit ditambah, diubah atau dihapus"""
+    return get_manager().fetchone("SELECT version FROM schedule_version")[0]
+
+def fetch_data_version():
+    """PRAGMA data_version koneksi ini; berubah jika koneksi lain melakukan commit"""
+    return get_manager().fetchone("PRAGMA data_version")[0]
+
+def fetch_due_habits(remind_time, day=None):
+    """Mengambil id dan nama habit dengan waktu pengingat tertentu (HH:MM) yang terjadwal hari itu
+
+    day default hari ini; aturan dicek lewat Recurrence.occurs (O(1) per habit).
+    """
+    day = to_day(datetime.date.today() if day is None else day)
+    rows = get_manager().cached_fetchall(
+        f"SELECT id, name, {', '.join(RECURRENCE_COLUMNS)} FROM habits WHERE remind_time = ?", (remind_time,))
+    return [(habit_id, name) for habit_id, name, *rule in rows
+            if Recurrence.from_columns(*rule).occurs(day)]
+
+def log_evidence(habit_id, date, evidence, note=None, wait=True):
+    """Mencatat bukti penyelesaian habit pada tanggal tertentu, mengembalikan id log
+
+    Dengan wait=False (misalnya menandai banyak habit sekaligus) log hanya
+    diantrekan dan dikembalikan sebagai Future; log-log tersebut ditulis
+    bersama dalam satu transaksi.
+    """
+    return _write("INSERT INTO habit_log (habit_id, day, evidence, note) VALUES (?, ?, ?, ?)",
+                  (habit_id, to_day(date), evidence, note or None), wait)
+
+def flush_writes():
+    """Menulis semua mutasi write-behind yang masih mengantre"""
+    return get_manager().writes.flush()
+
+def fetch_completed_logs():
+    """Mengambil semua log yang memiliki bukti (LogEntry, urut id), termasuk arsip"""
+    sql = """
+        SELECT l.id, l.habit_id, h.name, l.day, l.evidence
+        FROM {log} l JOIN main.habits h ON h.id = l.habit_id
+        WHERE l.evidence IS NOT NULL"""
+    rows = get_manager().cached_fetchall(sql.format(log="main.habit_log")) + _archive_fetchall(sql)
+    rows.sort()
+    return [LogEntry.from_row(row) for row in rows]
+
+def fetch_log_range(start, end):
+    """Log (LogEntry, dengan catatan) dalam rentang tanggal
+
+    Partisi arsip hanya di-ATTACH jika beririsan dengan rentang tersebut.
+    """
+    start, end = to_day(start), to_day(end)
+    sql = """
+        SELECT l.id, l.habit_id, h.name, l.day, l.evidence, l.note
+        FROM {log} l JOIN main.habits h ON h.id = l.habit_id
+        WHERE l.day BETWEEN ? AND ?"""
+    rows = get_manager().cached_fetchall(sql.format(log="main.habit_log"), (start, end))
+    rows = rows + _archive_fetchall(sql, (start, end), fetch_archive_partitions(start, end))
+    rows.sort(key=lambda row: (row[3], row[0]))
+    return [LogEntry.from_row(row) for row in rows]
+
+def iter_completion_days():
+    """(habit_id, nomor hari) untuk semua log berbukti, tanpa fetchall pada data aktif"""
+    yield from get_manager().execute(
+        "SELECT habit_id, day FROM habit_log WHERE evidence IS NOT NULL")
+    yield from _archive_fetchall("SELECT habit_id, day FROM {log} WHERE evidence IS NOT NULL")
+
+def fetch_habit_ids():
+    """Mengambil daftar id semua habit"""
+    return [row[0] for row in get_manager().cached_fetchall("SELECT id FROM habits ORDER BY id")]
+
+def fetch_completed_logs_page(before_id=None, limit=200):
+    """Mengambil satu halaman log berbukti (terbaru dulu) dengan id < before_id
+
+    Partisi arsip hanya dibuka jika rentang id-nya masih bisa mengisi halaman.
+    """
+    if before_id is None:
+        before_id = 2 ** 63 - 1
+    sql = """
+        SELECT l.id, l.habit_id, h.name, l.day, l.evidence
+        FROM {log} l JOIN main.habits h ON h.id = l.habit_id
+        WHERE l.evidence IS NOT NULL AND l.id < ?
+        ORDER BY l.id DESC
+        LIMIT ?"""
+    rows = get_manager().cached_fetchall(sql.format(log="main.habit_log"), (before_id, limit))
+    partitions = sorted((p for p in fetch_archive_partitions() if p[4] < before_id),
+                        key=lambda p: p[5], reverse=True)
+    for partition in partitions:
+        # Halaman sudah penuh dengan id yang lebih besar dari seluruh isi partisi ini
+        if len(rows) >= limit and partition[5] < rows[-1][0]:
+            break
+        rows = rows + _archive_fetchall(sql, (before_id, limit), [partition])
+        rows.sort(reverse=True)
+        del rows[limit:]
+    return [LogEntry.from_row(row) for row in rows]
+
+def fetch_completed_log(log_id):
+    """Mengambil satu log berbukti sebagai LogEntry, atau None"""
+    row = get_manager().cached_fetchone("""
+        SELECT l.id, l.habit_id, h.name, l.day, l.evidence
+        FROM habit_log l JOIN habits h ON h.id = l.habit_id
+        WHERE l.id = ? AND l.evidence IS NOT NULL""", (log_id,))
+    return None if row is None else LogEntry.from_row(row)
+
+def fetch_completed_dates(start=None, end=None):
+    """Mengambil nomor hari (dalam rentang start..end) di mana semua habit yang wajib hari itu selesai"""
+    start = MIN_DAY if start is None else to_day(start)
+    end = MAX_DAY if end is None else to_day(end)
+    return [row[0] for row in get_manager().cached_fetchall("""
+        SELECT day
+        FROM daily_completion
+        WHERE day BETWEEN ? AND ? AND due > 0 AND done >= due
+        ORDER BY day""", (start, end))]
+
+def fts_query(text):
+    """Mengubah teks ketikan menjadi query FTS5: setiap kata sebagai prefiks (AND)"""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"*' for term in terms)
+
+# Di atas jumlah kecocokan ini hasil tidak diurutkan bm25 (biayanya sebanding
+# dengan jumlah kecocokan); kecocokan nama tetap didahulukan.
+RANKED_SEARCH_LIMIT = 5000
+
+def search_habits(text, limit=200):
+    """Habit yang cocok dengan teks, urut relevansi
+
+    Kecocokan nama/deskripsi (nama diberi bobot lebih) di urutan atas,
+    disusul habit yang catatan log-nya cocok. Prefiks yang sangat umum
+    (misalnya dua huruf pertama saat mengetik) tidak di-ranking penuh.
+    """
+    query = fts_query(text)
+    if not query:
+        return []
+    db = get_manager()
+    matches = db.cached_fetchone("SELECT COUNT(*) FROM habits_fts WHERE habits_fts MATCH ?", (query,))[0]
+    if matches <= RANKED_SEARCH_LIMIT:
+        rows = db.cached_fetchall(f"""
+            SELECT {HABIT_COLUMNS_H}
+            FROM (SELECT rowid, bm25(habits_fts, 10.0, 1.0) AS score
+                  FROM habits_fts WHERE habits_fts MATCH ?
+                  ORDER BY score LIMIT ?) AS m
+            JOIN habits h ON h.id = m.rowid
+            ORDER BY m.score""", (query, limit))
+    else:
+        rows = db.cached_fetchall(f"""
+            SELECT {HABIT_COLUMNS_H}
+            FROM (SELECT rowid, 0 AS source FROM (
+                      SELECT rowid FROM habits_fts WHERE habits_fts MATCH ? LIMIT ?)
+                  UNION ALL
+                  SELECT rowid, 1 FROM (
+                      SELECT rowid FROM habits_fts WHERE habits_fts MATCH ? LIMIT ?)) AS m
+            JOIN habits h ON h.id = m.rowid
+            GROUP BY h.id
+            ORDER BY MIN(m.source), h.id
+            LIMIT ?""", (f"{{name}} : ({query})", limit, query, limit, limit))
+    if len(rows) < limit:
+        found = {row[0] for row in rows}
+        for row in db.cached_fetchall(f"""
+                SELECT {HABIT_COLUMNS_H}
+                FROM (SELECT rowid, bm25(log_fts) AS score
+                      FROM log_fts WHERE log_fts MATCH ?
+                      ORDER BY score LIMIT ?) AS m
+                JOIN habit_log l ON l.id = m.rowid
+                JOIN habits h ON h.id = l.habit_id
+                GROUP BY h.id
+                ORDER BY MIN(m.score)""", (query, limit)):
+            if row[0] not in found and len(rows) < limit:
+                found.add(row[0])
+                rows.append(row)
+    return [Habit.from_row(row) for row in rows]
+
+def search_logs(text, limit=200):
+    """Log (LogEntry, dengan catatan) yang catatannya cocok, urut relevansi"""
+    query = fts_query(text)
+    if not query:
+        return []
+    return [LogEntry.from_row(row) for row in get_manager().cached_fetchall("""
+        SELECT l.id, l.habit_id, h.name, l.day, l.evidence, l.note
+        FROM (SELECT rowid, bm25(log_fts) AS score
+              FROM log_fts WHERE log_fts MATCH ?
+              ORDER BY score LIMIT ?) AS m
+        JOIN habit_log l ON l.id = m.rowid
+        JOIN habits h ON h.id = l.habit_id
+        ORDER BY m.score""", (query, limit))]
+
+def cache_stats():
+    """Statistik QueryCache (hit/miss, jumlah entri dan baris) database bersama"""
+    return get_manager().cache.stats()
+
+def write_stats():
+    """Statistik group commit write-behind database bersama"""
+    return get_manager().writes.stats()
+
+def rebuild_daily_completion():
+    """Menghitung ulang rollup daily_completion dari seluruh habit_log"""
+    db = get_manager()
+    with db.transaction() as conn:
+        _rebuild_daily_completion(conn)
+    return db.fetchone("SELECT COUNT(*) FROM daily_completion")[0]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Perawatan database habtrack")
+    parser.add_argument("command", choices=["migrate", "rebuild-rollup"])
+    parser.add_argument("--profile", help="profil (shard database) yang dirawat")
+    args = parser.parse_args()
+
+    if args.profile:
+        use_profile(args.profile)
+    init_db()
+    if args.command == "rebuild-rollup":
+        print(f"daily_completion: {rebuild_daily_completion()} hari dihitung ulang")
+    close_db()
@@ -0,0 +1,90 @@
+import datetime
+from utils.recurrence import DAILY, Recurrence
+
+EPOCH = datetime.date(1970, 1, 1).toordinal()
+MIN_DAY = datetime.date.min.toordinal() - EPOCH
+MAX_DAY = datetime.date.max.toordinal() - EPOCH
+
+def to_day(date):
+    """Mengubah date atau string yyyy-MM-dd menjadi nomor hari sejak 1970-01-01"""
+    if isinstance(date, int):
+        return date
+    if isinstance(date, str):
+        date = datetime.date.fromisoformat(date)
+    return date.toordinal() - EPOCH
+
+def from_day(day):
+    """Mengubah nomor hari kembali menjadi datetime.date"""
+    return datetime.date.fromordinal(day + EPOCH)
+
+def time_to_minutes(remind_time):
+    """Mengubah string HH:MM menjadi menit sejak tengah malam"""
+    hours, minutes = map(int, remind_time.split(":"))
+    return hours * 60 + minutes
+
+def minutes_to_time(minutes):
+    """Kebalikan time_to_minutes: menit sejak tengah malam menjadi HH:MM"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class Habit:
+    """Satu habit; waktu pengingat disimpan sebagai menit sejak tengah malam"""
+
+    __slots__ = ("id", "name", "remind_minutes", "description", "recurrence")
+
+    def __init__(self, id, name, remind_minutes, description=None, recurrence=DAILY):
+        self.id = id
+        self.name = name
+        self.remind_minutes = remind_minutes
+        self.description = description
+        self.recurrence = recurrence
+
+    @classmethod
+    def from_row(cls, row):
+        """Dari baris (id, name, remind_time, description[, kolom aturan]) tabel habits"""
+        habit_id, name, remind_time, description, *rule = row
+        recurrence = Recurrence.from_columns(*rule) if rule else DAILY
+        return cls(habit_id, name, time_to_minutes(remind_time), description, recurrence)
+
+    @property
+    def remind_time(self):
+        return minutes_to_time(self.remind_minutes)
+
+    def label(self):
+        """Teks baris di daftar habit"""
+        if self.recurrence.daily:
+            return f"{self.name} - {self.remind_time} - {self.description}"
+        return f"{self.name} - {self.remind_time} ({self.recurrence.label()}) - {self.description}"
+
+    def __repr__(self):
+        return f"Habit({self.id!r}, {self.name!r}, {self.remind_time!r})"
+
+
+class LogEntry:
+    """Satu log bukti; tanggal disimpan sebagai nomor hari sejak 1970-01-01"""
+
+    __slots__ = ("id", "habit_id", "habit_name", "day", "evidence", "note")
+
+    def __init__(self, id, habit_id, habit_name, day, evidence, note=None):
+        self.id = id
+        self.habit_id = habit_id
+        self.habit_name = habit_name
+        self.day = day
+        self.evidence = evidence
+        self.note = note
+
+    @classmethod
+    def from_row(cls, row):
+        """Dari baris (id, habit_id, nama habit, nomor hari, bukti[, catatan])"""
+        return cls(*row)
+
+    @property
+    def date(self):
+        return from_day(self.day)
+
+    def label(self):
+        """Teks baris di riwayat; tanggal baru diformat saat baris ditampilkan"""
+        return f"✅ {self.habit_name} - {self.date.strftime('%d %b %Y')}"
+
+    def __repr__(self):
+        return f"LogEntry({self.id!r}, {self.habit_name!r}, {self.date.isoformat()!r})"
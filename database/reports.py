@@ -0,0 +1,175 @@
+import datetime
+import heapq
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from database.db_manager import DatabaseManager, attached_archive, to_day
+from database.records import time_to_minutes, minutes_to_time
+from utils import paths
+from utils.recurrence import RECURRENCE_COLUMNS, Recurrence, weekday
+
+# Rentang tingkat penyelesaian (hari) dan batas mundur perhitungan streak
+WINDOW = 30
+STREAK_HORIZON = 366
+TOP_STREAKS = 10
+
+
+def _completed_days(db, start, end):
+    """{habit_id: set nomor hari} berbukti dalam rentang, dari data aktif dan arsip yang beririsan"""
+    sql = """
+        SELECT DISTINCT habit_id, day FROM {log}
+        WHERE evidence IS NOT NULL AND day BETWEEN ? AND ?"""
+    rows = db.fetchall(sql.format(log="main.habit_log"), (start, end))
+    if db.fetchone("PRAGMA user_version")[0] >= 6:
+        for year, file in db.fetchall("""
+                SELECT year, file FROM archive_partitions
+                WHERE last_day >= ? AND first_day <= ?""", (start, end)):
+            with attached_archive(year, file, db) as schema:
+                rows += db.fetchall(sql.format(log=f"{schema}.habit_log"), (start, end))
+    days = {}
+    for habit_id, day in rows:
+        days.setdefault(habit_id, set()).add(day)
+    return days
+
+def _streak(recurrence, done, today):
+    """Streak aktif dalam hari jadwal; hari ini yang belum selesai tidak memutusnya
+
+    Habit bertarget per minggu: jumlah penyelesaian sejak minggu penuh
+    terakhir yang kurang dari target.
+    """
+    days = recurrence.days(today - STREAK_HORIZON + 1, today)
+    if recurrence.fixed:
+        streak = 0
+        for day in reversed(days):
+            if day in done:
+                streak += 1
+            elif day != today:
+                break
+        return streak
+    monday = today - weekday(today)
+    streak = sum(1 for day in recurrence.days(monday, today) if day in done)
+    while monday > today - STREAK_HORIZON:
+        monday -= 7
+        count = sum(1 for day in recurrence.days(monday, monday + 6) if day in done)
+        if count < recurrence.per_week:
+            break
+        streak += count
+    return streak
+
+def profile_report(profile, db_file, today, now_minutes, window=WINDOW, top=TOP_STREAKS):
+    """Agregat parsial satu shard; dijalankan di proses worker, hasilnya kecil dan bisa di-pickle"""
+    partial = {"profile": profile, "habits": 0, "due": 0, "done": 0, "active_streaks": 0,
+               "streaks": [], "overdue": [], "error": None}
+    if not os.path.exists(db_file):
+        partial["error"] = "database tidak ditemukan"
+        return partial
+    db = DatabaseManager(db_file)
+    try:
+        # Shard yang belum dimigrasikan ke v7: semua habit setiap hari
+        rule = ", ".join(RECURRENCE_COLUMNS)
+        if db.fetchone("PRAGMA user_version")[0] < 7:
+            rule = "127, 1, NULL, NULL, NULL"
+        habits = db.fetchall(f"SELECT id, name, remind_time, {rule} FROM habits")
+        days = _completed_days(db, today - max(window, STREAK_HORIZON) + 1, today)
+    except sqlite3.Error as exc:
+        partial["error"] = str(exc)
+        return partial
+    finally:
+        db.close()
+
+    streaks = []
+    first = today - window + 1
+    for habit_id, name, remind_time, *rule in habits:
+        recurrence = Recurrence.from_columns(*rule)
+        done = days.get(habit_id, ())
+        recent = [day for day in done if day >= first and recurrence.occurs(day)]
+        if recurrence.fixed:
+            partial["due"] += recurrence.due_mask(first, today).bit_count()
+            partial["done"] += len(recent)
+        else:
+            target = recurrence.per_week * window / 7
+            partial["due"] += target
+            partial["done"] += min(len(recent), target)
+        streak = _streak(recurrence, done, today)
+        if streak:
+            partial["active_streaks"] += 1
+            streaks.append((streak, profile, name))
+        minutes = time_to_minutes(remind_time)
+        if minutes <= now_minutes and today not in done and recurrence.occurs(today):
+            partial["overdue"].append((profile, name, minutes))
+    partial["habits"] = len(habits)
+    partial["streaks"] = heapq.nlargest(top, streaks)
+    return partial
+
+def merge_reports(partials, top=TOP_STREAKS):
+    """Menggabungkan agregat parsial semua shard menjadi satu laporan tim"""
+    partials = list(partials)
+    due = sum(p["due"] for p in partials)
+    done = sum(p["done"] for p in partials)
+    return {
+        "profiles": len(partials),
+        "habits": sum(p["habits"] for p in partials),
+        "rate": done / due if due else 0.0,
+        "active_streaks": sum(p["active_streaks"] for p in partials),
+        "top_streaks": heapq.nlargest(top, (s for p in partials for s in p["streaks"])),
+        "overdue": sorted(o for p in partials for o in p["overdue"]),
+        "per_profile": [
+            {"profile": p["profile"], "habits": p["habits"],
+             "rate": p["done"] / p["due"] if p["due"] else 0.0,
+             "active_streaks": p["active_streaks"], "overdue": len(p["overdue"])}
+            for p in partials if p["error"] is None
+        ],
+        "errors": {p["profile"]: p["error"] for p in partials if p["error"] is not None},
+    }
+
+def team_report(profiles=None, window=WINDOW, workers=None, now=None, top=TOP_STREAKS):
+    """Laporan lintas profil: setiap shard diagregasi di ProcessPoolExecutor lalu digabung
+
+    Satu shard (atau workers=1) dihitung langsung tanpa membuat pool.
+    """
+    profiles = profiles or paths.list_profiles()
+    now = now or datetime.datetime.now()
+    today = to_day(now.date())
+    now_minutes = now.hour * 60 + now.minute
+    jobs = [(profile, paths.db_file(profile)) for profile in profiles]
+    args = ([profile for profile, _ in jobs], [path for _, path in jobs],
+            [today] * len(jobs), [now_minutes] * len(jobs), [window] * len(jobs), [top] * len(jobs))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        partials = map(profile_report, *args)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            # Beberapa shard per tugas agar overhead IPC tidak mendominasi pada ratusan profil
+            chunksize = max(1, len(jobs) // (workers * 4))
+            partials = list(pool.map(profile_report, *args, chunksize=chunksize))
+    return merge_reports(partials, top)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Laporan gabungan semua profil habtrack")
+    parser.add_argument("--profiles", nargs="+", help="profil yang dilaporkan (default: semua)")
+    parser.add_argument("--window", type=int, default=WINDOW, help="rentang tingkat penyelesaian (hari)")
+    parser.add_argument("--workers", type=int, help="jumlah proses (default: jumlah core)")
+    parser.add_argument("--top", type=int, default=TOP_STREAKS)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = team_report(args.profiles, args.window, args.workers, top=args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['profiles']} profil, {report['habits']} habit, "
+              f"{args.window} hari: {report['rate']:.0%} selesai, "
+              f"{report['active_streaks']} streak aktif, {len(report['overdue'])} terlambat hari ini")
+        for row in report["per_profile"]:
+            print(f"  {row['profile']:<20} {row['habits']:>5} habit  {row['rate']:>5.0%}  "
+                  f"streak {row['active_streaks']:>4}  terlambat {row['overdue']:>4}")
+        for streak, profile, name in report["top_streaks"]:
+            print(f"  streak {streak:>4} hari: {name} ({profile})")
+        for profile, name, minutes in report["overdue"]:
+            print(f"  terlambat {minutes_to_time(minutes)}: {name} ({profile})")
+        for profile, error in report["errors"].items():
+            print(f"  {profile}: gagal dibaca ({error})")
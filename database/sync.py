@@ -0,0 +1,490 @@
+import json
+import os
+import socket
+import time
+from heapq import merge
+from database.db_manager import (
+    get_manager, init_db, close_db, use_profile
+)
+from utils.instance import encode_message, decode_message
+from utils.recurrence import RECURRENCE_COLUMNS
+
+# Default hanya localhost; --host 0.0.0.0 untuk sync antarmesin di jaringan tepercaya
+HOST = "127.0.0.1"
+PORT = 48620
+SOCKET_TIMEOUT = 30.0
+PROTOCOL = 1
+
+# Perubahan per pesan dan per transaksi penerapan
+BATCH_SIZE = 1000
+
+# Field habit di payload perubahan 'habit'
+HABIT_FIELDS = ("name", "remind_time", "description") + RECURRENCE_COLUMNS
+CHANGE_COLUMNS = "origin, origin_seq, clock, entity, uid, op, payload"
+
+NOW_MS = "CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER)"
+# Setiap perubahan lokal menaikkan nomor urut perangkat; jam (hybrid logical
+# clock, ms) tidak pernah mundur dan selalu melewati perubahan yang diterima
+TICK = f"UPDATE sync_state SET seq = seq + 1, clock = MAX(clock + 1, {NOW_MS});"
+
+
+def _habit_payload(alias):
+    return "json_object(" + ", ".join(f"'{name}', {alias}.{name}" for name in HABIT_FIELDS) + ")"
+
+# Mencatat keadaan terkini satu habit (id {habit_id}) sebagai perubahan lokal
+HABIT_CHANGE = f"""
+    INSERT INTO change_log ({CHANGE_COLUMNS})
+    SELECT s.device, s.seq, s.clock, 'habit', h.uid, 'upsert', {_habit_payload("h")}
+    FROM sync_state s JOIN habits h ON h.id = {{habit_id}}"""
+
+# Trigger pencatat perubahan, dibuat oleh enable_sync(). Penghapusan log karena
+# cascade atau pengarsipan tidak dicatat: penghapusan habit sudah mewakilinya.
+CHANGE_TRIGGERS = {
+    "trg_habits_insert_change": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_habits_insert_change
+        AFTER INSERT ON habits
+        BEGIN
+            UPDATE habits SET uid = lower(hex(randomblob(16))) WHERE id = NEW.id AND uid IS NULL;
+            {TICK}
+            {HABIT_CHANGE.format(habit_id="NEW.id")};
+        END""",
+    "trg_habits_update_change": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_habits_update_change
+        AFTER UPDATE OF {", ".join(HABIT_FIELDS)} ON habits
+        WHEN {" OR ".join(f"OLD.{name} IS NOT NEW.{name}" for name in HABIT_FIELDS)}
+        BEGIN
+            {TICK}
+            INSERT INTO change_log ({CHANGE_COLUMNS})
+            SELECT device, seq, clock, 'habit', NEW.uid, 'upsert', {_habit_payload("NEW")}
+            FROM sync_state;
+        END""",
+    "trg_habits_delete_change": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_habits_delete_change
+        AFTER DELETE ON habits
+        BEGIN
+            {TICK}
+            INSERT INTO change_log ({CHANGE_COLUMNS})
+            SELECT device, seq, clock, 'habit', OLD.uid, 'delete', NULL FROM sync_state;
+        END""",
+    # uid perubahan log adalah uid habit-nya
+    "trg_habit_log_insert_change": f"""
+        CREATE TRIGGER IF NOT EXISTS trg_habit_log_insert_change
+        AFTER INSERT ON habit_log
+        BEGIN
+            {TICK}
+            INSERT INTO change_log ({CHANGE_COLUMNS})
+            SELECT s.device, s.seq, s.clock, 'log', h.uid, 'insert',
+                   json_object('day', NEW.day, 'evidence', NEW.evidence, 'note', NEW.note)
+            FROM sync_state s JOIN habits h ON h.id = NEW.habit_id;
+        END""",
+}
+
+
+def sync_enabled(db=None):
+    db = db or get_manager()
+    return db.fetchone("SELECT 1 FROM sync_state") is not None
+
+def enable_sync(db=None):
+    """Mengaktifkan pencatatan perubahan (sekali per database), mengembalikan id perangkat
+
+    Data yang sudah ada dicatat sebagai snapshot awal dalam transaksi yang
+    sama dengan pembuatan trigger. Habit lama mendapat uid dari namanya,
+    sehingga dua salinan database yang sama (atau habit bernama sama di
+    dua perangkat) dianggap habit yang sama. Log di arsip tidak ikut.
+    """
+    db = db or get_manager()
+    row = db.fetchone("SELECT device FROM sync_state")
+    if row is not None:
+        return row[0]
+    with db.transaction() as conn:
+        conn.execute(f"""INSERT INTO sync_state (id, device, seq, clock)
+                         VALUES (1, lower(hex(randomblob(8))), 0, {NOW_MS})""")
+        conn.execute("UPDATE habits SET uid = 'legacy-' || lower(hex(name)) WHERE uid IS NULL")
+        seq = conn.execute(f"""
+            INSERT INTO change_log ({CHANGE_COLUMNS})
+            SELECT s.device, ROW_NUMBER() OVER (ORDER BY h.id), s.clock, 'habit', h.uid, 'upsert',
+                   {_habit_payload("h")}
+            FROM habits h, sync_state s""").rowcount
+        seq += conn.execute(f"""
+            INSERT INTO change_log ({CHANGE_COLUMNS})
+            SELECT s.device, ? + ROW_NUMBER() OVER (ORDER BY l.id), s.clock, 'log', h.uid, 'insert',
+                   json_object('day', l.day, 'evidence', l.evidence, 'note', l.note)
+            FROM habit_log l JOIN habits h ON h.id = l.habit_id, sync_state s""", (seq,)).rowcount
+        conn.execute("UPDATE sync_state SET seq = ?", (seq,))
+        for sql in CHANGE_TRIGGERS.values():
+            conn.execute(sql)
+        return conn.execute("SELECT device FROM sync_state").fetchone()[0]
+
+def reset_device(db=None):
+    """Memberi database ini id perangkat baru, mengembalikan id tersebut
+
+    Dipakai setelah restore backup atau jika file database disalin utuh ke
+    perangkat lain: nomor urut id lama bisa bentrok dengan perubahan yang
+    sudah dikirim. Id lama menjadi perangkat asal biasa, sehingga perubahan
+    id lama yang hilang diterima kembali dari peer saat sync berikutnya.
+    """
+    db = db or get_manager()
+    with db.transaction() as conn:
+        conn.execute("""INSERT INTO sync_vector (origin, seq) SELECT device, seq FROM sync_state WHERE 1
+                        ON CONFLICT(origin) DO UPDATE SET seq = MAX(seq, excluded.seq)""")
+        conn.execute("UPDATE sync_state SET device = lower(hex(randomblob(8))), seq = 0")
+        return conn.execute("SELECT device FROM sync_state").fetchone()[0]
+
+def local_vector(db=None):
+    """{perangkat asal: nomor urut terakhir yang dimiliki}, termasuk perangkat ini"""
+    db = db or get_manager()
+    vector = dict(db.fetchall("SELECT origin, seq FROM sync_vector"))
+    device, seq = db.fetchone("SELECT device, seq FROM sync_state")
+    vector[device] = seq
+    return vector
+
+def _merged(*vectors):
+    result = {}
+    for vector in vectors:
+        for origin, seq in vector.items():
+            result[origin] = max(seq, result.get(origin, 0))
+    return result
+
+def iter_changes(vector, db=None):
+    """Perubahan yang belum ada di `vector`, urut saat dicatat di database ini
+
+    Satu cursor per perangkat asal lewat indeks (origin, origin_seq), lalu
+    digabung menurut seq lokal: biaya sebanding jumlah perubahan yang
+    dikirim, dan urutan kausal (habit sebelum log-nya) tetap terjaga.
+    """
+    db = db or get_manager()
+    cursors = [db.execute(f"""
+                   SELECT seq, {CHANGE_COLUMNS} FROM change_log
+                   WHERE origin = ? AND origin_seq > ? ORDER BY origin_seq""", (origin, vector.get(origin, 0)))
+               for origin, seq in local_vector(db).items() if seq > vector.get(origin, 0)]
+    for row in merge(*cursors):
+        yield row[1:]
+
+
+def _record_habit(conn, habit_id):
+    # Perubahan turunan saat sync (trigger pencatat sedang dilepas) dicatat manual
+    conn.execute(TICK)
+    conn.execute(HABIT_CHANGE.format(habit_id="?"), (habit_id,))
+
+def _resolve_name(conn, name, uid):
+    """(nama untuk habit `uid`, apakah nama itu diubah)
+
+    Bentrok nama dua habit berbeda: uid terkecil mempertahankan nama, yang
+    lain diberi akhiran uid. Penggantian nama dicatat sebagai perubahan
+    lokal agar semua perangkat berakhir dengan nama yang sama.
+    """
+    row = conn.execute("SELECT id, uid FROM habits WHERE name = ? AND uid IS NOT ?", (name, uid)).fetchone()
+    if row is None:
+        return name, False
+    other_id, other_uid = row
+    if uid < other_uid:
+        conn.execute("UPDATE habits SET name = ? WHERE id = ?", (f"{name} ({other_uid[-6:]})", other_id))
+        _record_habit(conn, other_id)
+        return name, False
+    return f"{name} ({uid[-6:]})", True
+
+def _apply_habit(conn, clock, origin, uid, op, payload):
+    # Penghapusan menang atas perubahan apa pun; selain itu last-writer-wins per (clock, origin)
+    latest = conn.execute("""
+        SELECT op, clock, origin FROM change_log WHERE entity = 'habit' AND uid = ?
+        ORDER BY op = 'delete' DESC, clock DESC, origin DESC LIMIT 1""", (uid,)).fetchone()
+    if latest is not None and latest[0] == "delete":
+        return
+    if op == "delete":
+        conn.execute("DELETE FROM habits WHERE uid = ?", (uid,))
+        return
+    if latest is not None and (clock, origin) < latest[1:]:
+        return
+    values = json.loads(payload)
+    values["name"], renamed = _resolve_name(conn, values["name"], uid)
+    params = tuple(values[name] for name in HABIT_FIELDS)
+    row = conn.execute("SELECT id FROM habits WHERE uid = ?", (uid,)).fetchone()
+    if row is None:
+        habit_id = conn.execute(f"""
+            INSERT INTO habits (uid, {", ".join(HABIT_FIELDS)})
+            VALUES (?, {", ".join("?" * len(HABIT_FIELDS))})""", (uid,) + params).lastrowid
+    else:
+        habit_id = row[0]
+        conn.execute(f"UPDATE habits SET {', '.join(f'{name} = ?' for name in HABIT_FIELDS)} WHERE id = ?",
+                     params + (habit_id,))
+    if renamed:
+        _record_habit(conn, habit_id)
+
+def _apply_log(conn, uid, payload):
+    # Log adalah gabungan; log yang sama (habit, hari, bukti) tidak digandakan
+    row = conn.execute("SELECT id FROM habits WHERE uid = ?", (uid,)).fetchone()
+    if row is None:
+        return
+    values = json.loads(payload)
+    params = (row[0], values["day"], values["evidence"])
+    if conn.execute("SELECT 1 FROM habit_log WHERE habit_id = ? AND day = ? AND evidence IS ?",
+                    params).fetchone() is None:
+        conn.execute("INSERT INTO habit_log (habit_id, day, evidence, note) VALUES (?, ?, ?, ?)",
+                     params + (values["note"],))
+
+def apply_changes(changes, db=None):
+    """Menerapkan satu batch perubahan dari perangkat lain dalam satu transaksi
+
+    Perubahan yang sudah dimiliki (menurut vector lokal) dilewati, sehingga
+    batch yang sama aman diterapkan ulang. Perubahan yang kalah konflik
+    tetap dicatat agar bisa diteruskan ke perangkat lain. Mengembalikan
+    jumlah perubahan baru.
+    """
+    db = db or get_manager()
+    vector = local_vector(db)
+    changes = [tuple(change) for change in changes if change[1] > vector.get(change[0], 0)]
+    if not changes:
+        return 0
+    with db.transaction() as conn:
+        # Perubahan hasil sync tidak dicatat ulang sebagai perubahan lokal
+        for name in CHANGE_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        # Perubahan lokal sesudah ini (termasuk penggantian nama) menang atas batch ini
+        conn.execute("UPDATE sync_state SET clock = MAX(clock, ?)", (max(change[2] for change in changes),))
+        for change in changes:
+            origin, origin_seq, clock, entity, uid, op, payload = change
+            if entity == "habit":
+                _apply_habit(conn, clock, origin, uid, op, payload)
+            else:
+                _apply_log(conn, uid, payload)
+            conn.execute(f"INSERT INTO change_log ({CHANGE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", change)
+            vector[origin] = origin_seq
+        conn.executemany("""INSERT INTO sync_vector (origin, seq) VALUES (?, ?)
+                            ON CONFLICT(origin) DO UPDATE SET seq = MAX(seq, excluded.seq)""",
+                         [(origin, vector[origin]) for origin in {change[0] for change in changes}])
+        for sql in CHANGE_TRIGGERS.values():
+            conn.execute(sql)
+    return len(changes)
+
+
+# ---------------------------------------------------------------------------
+# Protokol: pesan JSON per baris (hello, changes*, done[, ack]), sama untuk
+# file bundle dan socket
+# ---------------------------------------------------------------------------
+
+def _send(stream, message):
+    stream.write(encode_message(message))
+    stream.flush()
+
+def _receive(stream):
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("Sync terputus sebelum selesai")
+    return decode_message(line)
+
+def _hello(db):
+    device = enable_sync(db)
+    return {"type": "hello", "protocol": PROTOCOL, "device": device, "vector": local_vector(db)}
+
+def _check_hello(message, device):
+    if message.get("type") != "hello" or message.get("protocol") != PROTOCOL:
+        raise ValueError("Bukan data sync habtrack yang dikenali")
+    if message["device"] == device:
+        raise ValueError("Peer memakai id perangkat yang sama (database disalin utuh?); "
+                         "jalankan reset-device di salah satunya")
+    return message
+
+def send_changes(stream, vector, db=None):
+    """Mengirim perubahan yang belum ada di `vector` per batch lalu 'done'
+
+    Mengembalikan (jumlah, vector yang terkirim).
+    """
+    count, sent, batch = 0, {}, []
+    for change in iter_changes(vector, db):
+        batch.append(change)
+        sent[change[0]] = change[1]
+        if len(batch) >= BATCH_SIZE:
+            _send(stream, {"type": "changes", "changes": batch})
+            count += len(batch)
+            batch = []
+    if batch:
+        _send(stream, {"type": "changes", "changes": batch})
+        count += len(batch)
+    _send(stream, {"type": "done"})
+    return count, sent
+
+def receive_changes(stream, db=None):
+    """Menerapkan batch yang diterima sampai 'done', mengembalikan jumlah perubahan baru"""
+    count = 0
+    while True:
+        message = _receive(stream)
+        if message.get("type") == "done":
+            return count
+        if message.get("type") != "changes":
+            raise ValueError(f"Pesan sync tidak terduga: {message.get('type')!r}")
+        count += apply_changes(message["changes"], db)
+
+def _remember_peer(db, device, vector):
+    row = db.fetchone("SELECT vector FROM sync_peers WHERE device = ?", (device,))
+    if row is not None:
+        vector = _merged(json.loads(row[0]), vector)
+    db.execute("""INSERT INTO sync_peers (device, vector, synced_at) VALUES (?, ?, ?)
+                  ON CONFLICT(device) DO UPDATE SET vector = excluded.vector, synced_at = excluded.synced_at""",
+               (device, json.dumps(vector), int(time.time())))
+
+def peer_vector(peer=None, db=None):
+    """Vector yang pasti dimiliki `peer` (sync terakhir), atau minimum semua peer yang dikenal"""
+    db = db or get_manager()
+    if peer is not None:
+        row = db.fetchone("SELECT vector FROM sync_peers WHERE device = ?", (peer,))
+        if row is None:
+            raise ValueError(f"Perangkat {peer} belum pernah disinkronkan")
+        return json.loads(row[0])
+    vectors = [json.loads(row[0]) for row in db.fetchall("SELECT vector FROM sync_peers")]
+    if not vectors:
+        return {}
+    return {origin: min(vector.get(origin, 0) for vector in vectors) for origin in set().union(*vectors)}
+
+def export_bundle(path, peer=None, full=False, db=None):
+    """Menulis perubahan yang belum dimiliki peer ke file bundle, mengembalikan jumlahnya
+
+    Tanpa `peer` isinya perubahan yang belum dimiliki salah satu peer yang
+    dikenal; full=True menulis semuanya (untuk perangkat yang baru).
+    """
+    db = db or get_manager()
+    hello = _hello(db)
+    vector = {} if full else peer_vector(peer, db)
+    partial = path + ".partial"
+    try:
+        with open(partial, "wb") as stream:
+            _send(stream, hello)
+            count, _ = send_changes(stream, vector, db)
+    except BaseException:
+        os.remove(partial)
+        raise
+    os.replace(partial, path)
+    return count
+
+def import_bundle(path, db=None):
+    """Menerapkan file bundle dari perangkat lain, mengembalikan jumlah perubahan baru"""
+    db = db or get_manager()
+    with open(path, "rb") as stream:
+        hello = _check_hello(_receive(stream), enable_sync(db))
+        count = receive_changes(stream, db)
+    _remember_peer(db, hello["device"], hello["vector"])
+    return count
+
+def exchange(stream, initiator, db=None):
+    """Sync dua arah lewat stream biner (socket), mengembalikan (diterima, dikirim)
+
+    Pihak yang menerima koneksi mengirim lebih dulu; setelah keduanya
+    menerapkan kiriman masing-masing, vector peer dicatat untuk bundle
+    berikutnya.
+    """
+    db = db or get_manager()
+    hello = _hello(db)
+    if initiator:
+        _send(stream, hello)
+        peer = _check_hello(_receive(stream), hello["device"])
+        received = receive_changes(stream, db)
+        sent_count, sent = send_changes(stream, peer["vector"], db)
+        if _receive(stream).get("type") != "ack":
+            raise ValueError("Peer tidak mengonfirmasi sync")
+    else:
+        peer = _check_hello(_receive(stream), hello["device"])
+        _send(stream, hello)
+        sent_count, sent = send_changes(stream, peer["vector"], db)
+        # 'done' dari peer berarti kiriman kita sudah diterapkan di sana
+        received = receive_changes(stream, db)
+        _send(stream, {"type": "ack"})
+    _remember_peer(db, peer["device"], _merged(peer["vector"], sent))
+    return received, sent_count
+
+def sync_with(host, port=PORT, db=None):
+    """Sync dua arah dengan SyncServer di host:port, mengembalikan (diterima, dikirim)"""
+    with socket.create_connection((host, port), timeout=SOCKET_TIMEOUT) as sock:
+        with sock.makefile("rwb") as stream:
+            return exchange(stream, True, db)
+
+
+class SyncServer:
+    """Server TCP yang melayani sync dari perangkat lain, satu sesi per koneksi
+
+    Tidak ada autentikasi: default hanya mendengarkan di localhost.
+    Port 0 memilih port bebas (lihat address).
+    """
+
+    def __init__(self, host=HOST, port=PORT, db=None):
+        self.db = db or get_manager()
+        self.socket = socket.create_server((host, port))
+
+    @property
+    def address(self):
+        return self.socket.getsockname()[:2]
+
+    def serve_once(self):
+        """Melayani satu koneksi, mengembalikan (alamat peer, diterima, dikirim)"""
+        conn, address = self.socket.accept()
+        with conn:
+            conn.settimeout(SOCKET_TIMEOUT)
+            with conn.makefile("rwb") as stream:
+                return (address,) + exchange(stream, False, self.db)
+
+    def close(self):
+        self.socket.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sinkronisasi delta antardatabase habtrack")
+    parser.add_argument("--profile", help="profil (shard database) yang disinkronkan")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="tampilkan id perangkat dan peer")
+    export_cmd = sub.add_parser("export", help="tulis perubahan untuk perangkat lain ke file")
+    export_cmd.add_argument("path")
+    export_cmd.add_argument("--peer", help="hanya yang belum dimiliki perangkat ini")
+    export_cmd.add_argument("--full", action="store_true", help="semua perubahan (perangkat baru)")
+    import_cmd = sub.add_parser("import", help="terapkan file dari perangkat lain")
+    import_cmd.add_argument("path")
+    serve_cmd = sub.add_parser("serve", help="tunggu sync dari perangkat lain")
+    serve_cmd.add_argument("--host", default=HOST)
+    serve_cmd.add_argument("--port", type=int, default=PORT)
+    serve_cmd.add_argument("--once", action="store_true", help="berhenti setelah satu sesi")
+    connect_cmd = sub.add_parser("connect", help="sync dua arah dengan perangkat yang menjalankan serve")
+    connect_cmd.add_argument("host")
+    connect_cmd.add_argument("--port", type=int, default=PORT)
+    sub.add_parser("reset-device", help="id perangkat baru (setelah database disalin utuh)")
+    args = parser.parse_args()
+
+    if args.profile:
+        use_profile(args.profile)
+    init_db()
+    if args.command == "status":
+        if not sync_enabled():
+            print("sync belum aktif")
+        else:
+            print(f"perangkat ini: {enable_sync()}")
+            for origin, seq in sorted(local_vector().items()):
+                print(f"asal {origin}: {seq} perubahan")
+            for device, vector, synced_at in get_manager().fetchall("SELECT * FROM sync_peers ORDER BY device"):
+                print(f"peer {device}: sync terakhir {time.strftime('%Y-%m-%d %H:%M', time.localtime(synced_at))}")
+    elif args.command == "export":
+        print(f"{export_bundle(args.path, args.peer, args.full)} perubahan diekspor")
+    elif args.command == "import":
+        print(f"{import_bundle(args.path)} perubahan baru diterapkan")
+    elif args.command == "serve":
+        server = SyncServer(args.host, args.port)
+        print(f"menunggu sync di {server.address[0]}:{server.address[1]}")
+        try:
+            while True:
+                try:
+                    address, received, sent = server.serve_once()
+                except (OSError, ValueError) as exc:
+                    print(f"sync gagal: {exc}")
+                    if args.once:
+                        break
+                    continue
+                print(f"{address[0]}: {received} diterima, {sent} dikirim")
+                if args.once:
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+    elif args.command == "connect":
+        received, sent = sync_with(args.host, args.port)
+        print(f"{received} diterima, {sent} dikirim")
+    else:
+        print(f"id perangkat baru: {reset_device()}")
+    close_db()
@@ -0,0 +1,190 @@
+import csv
+import json
+import os
+from contextlib import closing, nullcontext
+from database.db_manager import (
+    get_manager, init_db, close_db, use_profile, bulk_load, attached_archive, fetch_archive_partitions
+)
+from database.records import to_day, from_day
+from utils.recurrence import RECURRENCE_COLUMNS, Recurrence
+
+# Kolom yang dipakai untuk file impor/ekspor; aturan jadwal opsional saat impor
+HABIT_FIELDS = ("name", "remind_time", "description", "weekdays", "every_days", "per_week",
+                "start_date", "end_date")
+LOG_FIELDS = ("habit", "date", "evidence", "note")
+
+BATCH_SIZE = 10000
+
+
+def detect_format(path):
+    """Menentukan format file dari ekstensinya: 'csv' atau 'jsonl'"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Format file tidak dikenal: {path}")
+
+def read_records(path, fmt=None):
+    """Membaca file baris demi baris sebagai dict (streaming)"""
+    fmt = fmt or detect_format(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def write_records(path, fields, rows, fmt=None):
+    """Menulis iterable tuple ke file tanpa menampungnya di memori"""
+    fmt = fmt or detect_format(path)
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(fields)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False))
+                f.write("\n")
+                count += 1
+    return count
+
+def _batches(records, size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _recurrence(record):
+    """Recurrence dari field aturan sebuah record impor (kosong = default setiap hari)"""
+    def value(name, parse=int):
+        raw = record.get(name)
+        return None if raw in (None, "") else parse(raw)
+
+    return Recurrence.from_columns(value("weekdays") or 127, value("every_days") or 1, value("per_week"),
+                                   value("start_date", to_day), value("end_date", to_day))
+
+def import_habits(path, fmt=None, batch_size=BATCH_SIZE):
+    """Mengimpor habit; habit dengan nama yang sama diperbarui"""
+    db = get_manager()
+    rows = ((r["name"], r["remind_time"], r.get("description") or "") + _recurrence(r).columns()
+            for r in read_records(path, fmt))
+    count = 0
+    for batch in _batches(rows, batch_size):
+        with db.transaction() as conn:
+            conn.executemany(f"""
+                INSERT INTO habits (name, remind_time, description, {", ".join(RECURRENCE_COLUMNS)})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    remind_time = excluded.remind_time,
+                    description = excluded.description,
+                    {", ".join(f"{column} = excluded.{column}" for column in RECURRENCE_COLUMNS)}""", batch)
+        count += len(batch)
+    return count
+
+def import_log(path, fmt=None, batch_size=BATCH_SIZE, bulk=False):
+    """Mengimpor habit_log; mengembalikan (jumlah diimpor, jumlah dilewati)
+
+    Nama habit dipetakan ke id lewat dict di memori; baris untuk habit yang
+    tidak ada dilewati. Tanggal yang sama hanya di-parse sekali. Dengan
+    bulk=True indeks dan rollup dibangun ulang sekali di akhir (lihat bulk_load).
+    """
+    db = get_manager()
+    habit_ids = dict(db.fetchall("SELECT name, id FROM habits"))
+    days = {}
+    skipped = 0
+
+    def rows():
+        nonlocal skipped
+        for record in read_records(path, fmt):
+            habit_id = habit_ids.get(record["habit"])
+            if habit_id is None:
+                skipped += 1
+                continue
+            date = record["date"]
+            day = days.get(date)
+            if day is None:
+                day = days[date] = to_day(date)
+            yield habit_id, day, record.get("evidence") or None, record.get("note") or None
+
+    count = 0
+    with bulk_load(db) if bulk else nullcontext():
+        for batch in _batches(rows(), batch_size):
+            with db.transaction() as conn:
+                conn.executemany(
+                    "INSERT INTO habit_log (habit_id, day, evidence, note) VALUES (?, ?, ?, ?)", batch)
+            count += len(batch)
+    return count, skipped
+
+
+def export_habits(path, fmt=None):
+    """Mengekspor semua habit langsung dari cursor"""
+    cursor = get_manager().execute(
+        f"SELECT name, remind_time, description, {', '.join(RECURRENCE_COLUMNS)} FROM habits ORDER BY id")
+    rows = (row[:6] + tuple(None if day is None else from_day(day).isoformat() for day in row[6:])
+            for row in cursor)
+    return write_records(path, HABIT_FIELDS, rows, fmt)
+
+def _log_rows():
+    """Baris log arsip (tahun terlama dulu) lalu log aktif, semuanya langsung dari cursor"""
+    db = get_manager()
+    sql = """
+        SELECT h.name, l.day, l.evidence, l.note
+        FROM {log} l JOIN main.habits h ON h.id = l.habit_id
+        ORDER BY l.id"""
+    for year, file, *_ in reversed(fetch_archive_partitions()):
+        with attached_archive(year, file, db) as schema:
+            # Cursor ditutup sebelum DETACH, juga jika pembaca berhenti di tengah jalan
+            with closing(db.execute(sql.format(log=f"{schema}.habit_log"))) as cursor:
+                yield from cursor
+    yield from db.execute(sql.format(log="main.habit_log"))
+
+def export_log(path, fmt=None):
+    """Mengekspor habit_log, termasuk tahun yang sudah diarsipkan"""
+    dates = {}
+
+    def rows():
+        for name, day, evidence, note in _log_rows():
+            date = dates.get(day)
+            if date is None:
+                date = dates[day] = from_day(day).isoformat()
+            yield name, date, evidence, note
+
+    return write_records(path, LOG_FIELDS, rows(), fmt)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Impor/ekspor data habtrack (CSV atau JSON Lines)")
+    parser.add_argument("command", choices=["import-habits", "import-log", "export-habits", "export-log"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--bulk", action="store_true",
+                        help="bangun ulang indeks di akhir (untuk impor log yang besar)")
+    parser.add_argument("--profile", help="profil (shard database) tujuan/sumber")
+    args = parser.parse_args()
+
+    if args.profile:
+        use_profile(args.profile)
+    init_db()
+    if args.command == "import-habits":
+        print(f"{import_habits(args.path, args.format)} habit diimpor")
+    elif args.command == "import-log":
+        imported, skipped = import_log(args.path, args.format, bulk=args.bulk)
+        print(f"{imported} log diimpor, {skipped} dilewati (habit tidak ditemukan)")
+    elif args.command == "export-habits":
+        print(f"{export_habits(args.path, args.format)} habit diekspor")
+    else:
+        print(f"{export_log(args.path, args.format)} log diekspor")
+    close_db()
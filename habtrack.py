@@ -1,9 +1,82 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from ui.main_window import HabitTrackerApp
+from utils.startup import StartupProfiler
+
+# Dibuat sebelum impor Qt agar waktu impor ikut terukur
+profiler = StartupProfiler(enabled="--profile-startup" in sys.argv)
+
+import argparse
+import datetime
+import os
+from database.db_manager import use_profile
+from utils.instance import SingleInstance
+
+def iso_date(value):
+    """Tipe argparse: tanggal yyyy-MM-dd, dikembalikan sebagai string ISO"""
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tanggal tidak valid: {value!r} (format yyyy-MM-dd)")
+
+
+class LogEvidenceAction(argparse.Action):
+    """Mengubah HABIT_ID menjadi int saat parsing; error argparse jika bukan angka"""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        habit_id, file_path = values
+        try:
+            habit_id = int(habit_id)
+        except ValueError:
+            parser.error(f"{option_string}: HABIT_ID harus berupa angka, bukan {habit_id!r}")
+        setattr(namespace, self.dest, (habit_id, file_path))
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Habit Tracker")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="cetak waktu tiap fase startup ke stderr lalu keluar")
+    parser.add_argument("--log-evidence", nargs=2, metavar=("HABIT_ID", "FILE"), action=LogEvidenceAction,
+                        help="catat bukti untuk habit (diteruskan ke instance yang berjalan)")
+    parser.add_argument("--date", type=iso_date, help="tanggal bukti (yyyy-MM-dd), default hari ini")
+    parser.add_argument("--note", help="catatan bukti (bisa dicari)")
+    parser.add_argument("--profile", help="profil pengguna; setiap profil punya database sendiri")
+    # Argumen lain (misalnya milik Qt) diteruskan ke QApplication
+    return parser.parse_known_args(argv)
+
+def intent_message(args):
+    """Perintah yang diminta launch ini, dalam format pesan IPC"""
+    if args.log_evidence:
+        habit_id, file_path = args.log_evidence
+        return {"command": "log-evidence", "habit_id": habit_id,
+                "file": os.path.abspath(file_path), "date": args.date, "note": args.note}
+    return {"command": "show"}
+
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = HabitTrackerApp()
+    args, qt_args = parse_args(sys.argv[1:])
+    message = intent_message(args)
+    if args.profile:
+        use_profile(args.profile)
+
+    # Instance kedua hanya meneruskan perintahnya lalu keluar, tanpa memuat Qt
+    instance = SingleInstance()
+    if not instance.acquire():
+        if instance.send(message) is None:
+            sys.exit("Habit Tracker sudah berjalan tetapi tidak merespons")
+        sys.exit(0)
+    profiler.mark("instance_lock")
+
+    from PyQt6.QtWidgets import QApplication
+    from ui.main_window import HabitTrackerApp
+    from ui.ipc import InstanceServer
+    profiler.mark("imports")
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    profiler.mark("qapplication")
+    window = HabitTrackerApp(profiler)
+    server = InstanceServer(instance, window)
+    server.message_received.connect(window.handle_instance_message)
+    server.listen()
     window.show()
+    if message["command"] != "show":
+        window.handle_instance_message(message)
     sys.exit(app.exec())
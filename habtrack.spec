@@ -0,0 +1,57 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Build onedir tanpa UPX: tidak ada unpack ke folder temp di setiap launch
+# dan DLL Qt tidak perlu didekompresi, sehingga cold start lebih cepat.
+
+
+a = Analysis(
+    ['habtrack.py'],
+    pathex=[],
+    binaries=[],
+    datas=[('icon.png', '.')],
+    # plyer memuat backend notifikasi per platform secara dinamis (fallback tanpa tray)
+    hiddenimports=[
+        'plyer.platforms.win.notification', 'plyer.platforms.linux.notification',
+        'plyer.platforms.macosx.notification',
+    ],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=[
+        'tkinter', 'unittest', 'pydoc', 'doctest',
+        'PyQt6.QtQml', 'PyQt6.QtQuick', 'PyQt6.QtQuickWidgets', 'PyQt6.QtWebEngineCore',
+        'PyQt6.QtWebEngineWidgets', 'PyQt6.QtMultimedia', 'PyQt6.QtPdf', 'PyQt6.QtSql',
+        'PyQt6.QtTest', 'PyQt6.QtBluetooth', 'PyQt6.QtOpenGL', 'PyQt6.QtOpenGLWidgets',
+        'PyQt6.QtSvg', 'PyQt6.QtDesigner', 'PyQt6.QtHelp', 'PyQt6.QtPrintSupport',
+    ],
+    noarchive=False,
+    optimize=1,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='habtrack',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='habtrack',
+)
@@ -8,32 +8,25 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtGui import QAction 
 from PyQt6.QtGui import QIcon
-from PyQt6.QtCore import QTimer, QTime
+from PyQt6.QtCore import Qt, QTimer
+from database.db_manager import init_db, fetch_habits, fetch_habit, add_habit, close_db
+from ui.notifications import NotificationDispatcher
+from utils.instance import SingleInstance
+from utils.scheduler import ReminderScheduler
 
 # Struktur Folder
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_FILE = os.path.join(BASE_DIR, "data", "habits.db")
 
-def create_db():
-    os.makedirs(os.path.join(BASE_DIR, "data"), exist_ok=True)
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS habits (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            remind_time TEXT NOT NULL
-        )
-    ''')
-    conn.commit()
-    conn.close()
+# Batas tidur timer reminder, agar sleep/perubahan jam tetap terkejar
+MAX_REMINDER_SLEEP = 300
 
 class HabitTrackerApp(QWidget):
     def __init__(self):
         super().__init__()
         self.initUI()
-        create_db()
+        init_db()
         self.load_habits()
+        self.init_reminders()
         self.check_reminders()
         self.init_tray_icon()
     
@@ -62,11 +55,13 @@ class HabitTrackerApp(QWidget):
         habit = self.habit_input.text().strip()
         remind_time = self.time_input.time().toString("HH:mm")
         if habit:
-            conn = sqlite3.connect(DB_FILE)
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO habits (name, remind_time) VALUES (?, ?)", (habit, remind_time))
-            conn.commit()
-            conn.close()
+            try:
+                habit_id = add_habit(habit, remind_time, "")
+            except sqlite3.IntegrityError:
+                QMessageBox.warning(self, "Input Error", f"Habit '{habit}' sudah ada!")
+                return
+            self.scheduler.update(fetch_habit(habit_id))
+            self.arm_reminder_timer()
             self.habit_list.addItem(f"{habit} - {remind_time}")
             self.habit_input.clear()
         else:
@@ -74,39 +69,48 @@ class HabitTrackerApp(QWidget):
     
     def load_habits(self):
         self.habit_list.clear()
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, remind_time FROM habits")
-        habits = cursor.fetchall()
-        conn.close()
-        for habit in habits:
-            self.habit_list.addItem(f"{habit[0]} - {habit[1]}")
-    
+        for habit in fetch_habits():
+            self.habit_list.addItem(f"{habit.name} - {habit.remind_time}")
+
+    def init_reminders(self):
+        """Menyiapkan jadwal reminder dan timer single-shot-nya (sama seperti ui/main_window.py)"""
+        self.scheduler = ReminderScheduler()
+        self.reminder_timer = QTimer(self)
+        self.reminder_timer.setSingleShot(True)
+        self.reminder_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.reminder_timer.timeout.connect(self.show_reminder)
+
+        # Klik pada notifikasi membuka aplikasi
+        self.notifications = NotificationDispatcher(self)
+        self.notifications.activated.connect(self.show_window)
+        # Lock daemon reminder (utils/daemon.py) untuk database yang sama
+        self.reminder_daemon = SingleInstance("daemon")
+
     def check_reminders(self):
-        timer = QTimer(self)
-        timer.timeout.connect(self.show_reminder)
-        timer.start(60000)  # Cek setiap menit
-    
-    def show_reminder(self):
-        current_time = QTime.currentTime().toString("HH:mm")
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM habits WHERE remind_time = ?", (current_time,))
-        habits = cursor.fetchall()
-        conn.close()
+        """Memuat jadwal reminder dari database lalu mengatur timer untuk yang terdekat"""
+        self.scheduler.rebuild(fetch_habits())
+        self.arm_reminder_timer()
 
-        for habit in habits:
-            msg_box = QMessageBox(self)
-            msg_box.setIcon(QMessageBox.Icon.Information)
-            msg_box.setWindowTitle("Habit Reminder")
-            msg_box.setText(f"Saatnya untuk: {habit[0]}")
-            msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
+    def arm_reminder_timer(self):
+        """Mengatur timer ke reminder terdekat (tanpa polling database)"""
+        delay = self.scheduler.seconds_until_next()
+        if delay is None:
+            self.reminder_timer.stop()
+            return
+        self.reminder_timer.start(int(min(delay, MAX_REMINDER_SLEEP) * 1000))
+
+    def show_reminder(self):
+        """Menampilkan notifikasi non-modal untuk reminder yang jatuh tempo"""
+        due = self.scheduler.pop_due()
+        # Selama daemon reminder berjalan, daemon yang mengirim notifikasinya
+        if due and not self.reminder_daemon.is_held():
+            self.notifications.enqueue(due)
+        self.arm_reminder_timer()
 
-            # Jika user klik "OK", maka aplikasi akan terbuka
-            if msg_box.exec() == QMessageBox.StandardButton.Ok:
-                self.showNormal()  # Membuka kembali aplikasi
-                self.raise_()      # Membawa jendela ke depan
-                self.activateWindow()  # Fokus ke aplikasi
+    def show_window(self):
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
 
     
     def init_tray_icon(self):
@@ -125,6 +129,7 @@ class HabitTrackerApp(QWidget):
         self.tray_icon.setContextMenu(menu)
         self.tray_icon.activated.connect(self.tray_icon_clicked)
         self.tray_icon.show()
+        self.notifications.set_tray_icon(self.tray_icon)
     
     def closeEvent(self, event):
         event.ignore()
@@ -137,6 +142,7 @@ class HabitTrackerApp(QWidget):
     
     def close_app(self):
         self.tray_icon.hide()
+        close_db()
         QApplication.quit()
 
 def schedule_task():
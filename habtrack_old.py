@@ -1,18 +1,23 @@
 import sys
 import os
-import sqlite3
 import datetime
-# import threading
 import platform
 from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QPushButton, QListWidget, 
+    QApplication, QWidget, QVBoxLayout, QPushButton, QListWidget, QListWidgetItem,
     QLabel, QCalendarWidget, QTimeEdit, QMessageBox, QFileDialog, 
     QDialog, QFormLayout, QLineEdit, QDialogButtonBox, QInputDialog,
     QSystemTrayIcon, QMenu
 )
 from PyQt6.QtGui import QPixmap, QTextCharFormat, QColor, QAction, QIcon
-from PyQt6.QtCore import QTimer, QTime
-from plyer import notification
+from PyQt6.QtCore import Qt, QTimer, QTime
+from database.db_manager import (
+    init_db, fetch_habits, fetch_habit, add_habit, update_habit, delete_habit,
+    log_evidence, fetch_completed_logs, fetch_completed_dates, close_db
+)
+from database.records import from_day
+from ui.notifications import NotificationDispatcher
+from utils.instance import SingleInstance
+from utils.scheduler import ReminderScheduler
 
 # Database path
 if getattr(sys, 'frozen', False):
@@ -22,26 +27,10 @@ else:
     # Jika dijalankan sebagai script Python
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-DB_FILE = os.path.join(BASE_DIR, "data", "habits.db")
 ICON_FILE = os.path.join(BASE_DIR, "icon.png")
 
-def init_db():
-    """Inisialisasi Database"""
-    os.makedirs(os.path.join(BASE_DIR, "data"), exist_ok=True)
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    cursor.execute('''CREATE TABLE IF NOT EXISTS habits (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL,
-                        remind_time TEXT NOT NULL,
-                        description TEXT)''')
-    cursor.execute('''CREATE TABLE IF NOT EXISTS habit_log (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        habit_name TEXT NOT NULL,
-                        date TEXT NOT NULL,
-                        evidence TEXT)''')
-    conn.commit()
-    conn.close()
+# Batas tidur timer reminder, agar sleep/perubahan jam tetap terkejar
+MAX_REMINDER_SLEEP = 300
 
 class HabitTrackerApp(QWidget):
     def __init__(self):
@@ -52,6 +41,7 @@ class HabitTrackerApp(QWidget):
         init_db()
         self.load_habits()
         self.load_completed_habits()
+        self.init_reminders()
         self.check_reminders()
         self.init_tray_icon()
     
@@ -91,13 +81,6 @@ class HabitTrackerApp(QWidget):
 
         self.setLayout(layout)
 
-    def check_reminders(self):
-        # Timer untuk Reminder (Cek setiap menit)
-        timer = QTimer(self)
-        timer.timeout.connect(self.check_reminders)
-        timer.start(60000)  # Cek tiap 60 detik
-        # self.start_scheduler()
-
     def init_tray_icon(self):
         self.tray_icon = QSystemTrayIcon(self)
         self.tray_icon.setIcon(QIcon(ICON_FILE))   
@@ -114,6 +97,7 @@ class HabitTrackerApp(QWidget):
         self.tray_icon.setContextMenu(menu)
         self.tray_icon.activated.connect(self.tray_icon_clicked)
         self.tray_icon.show()
+        self.notifications.set_tray_icon(self.tray_icon)
 
     def closeEvent(self, event):
         event.ignore()
@@ -126,28 +110,17 @@ class HabitTrackerApp(QWidget):
     
     def close_app(self):
         self.tray_icon.hide()
+        close_db()
         QApplication.quit()
 
-    # def start_scheduler(self):
-    #     """Menjalankan scheduler untuk reminder di latar belakang"""
-    #     def run_reminder():
-    #         while True:
-    #             self.check_reminders()
-    #             threading.Event().wait(60)  # Cek setiap 60 detik
-
-    #     reminder_thread = threading.Thread(target=run_reminder, daemon=True)
-    #     reminder_thread.start()
-
     def load_habits(self):
         """Memuat daftar habit dari database"""
         self.habit_list.clear()
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name, remind_time, description FROM habits")
-        habits = cursor.fetchall()
+        habits = fetch_habits()
         for habit in habits:
-            self.habit_list.addItem(f"{habit[0]} - {habit[1]} - {habit[2]}")  # Tampilkan deskripsi
-        conn.close()
+            item = QListWidgetItem(habit.label())  # Tampilkan deskripsi
+            item.setData(Qt.ItemDataRole.UserRole, habit.id)
+            self.habit_list.addItem(item)
 
     def add_habit(self):
         """Menambahkan habit baru"""
@@ -165,28 +138,21 @@ class HabitTrackerApp(QWidget):
                 return
 
             # Simpan ke database
-            conn = sqlite3.connect(DB_FILE)
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO habits (name, remind_time, description) VALUES (?, ?, ?)", 
-                        (habit_name, remind_time, description))
-            conn.commit()
-            conn.close()
+            habit_id = add_habit(habit_name, remind_time, description)
+            self.scheduler.update(fetch_habit(habit_id))
+            self.arm_reminder_timer()
             self.load_habits()
             self.mark_completed_days()  # Tambahkan ini
 
     def edit_habit(self):
         """Mengedit habit yang dipilih"""
         selected_item = self.habit_list.currentItem()
-        if selected_item:
-            habit_name = selected_item.text().split(" - ")[0]
-            conn = sqlite3.connect(DB_FILE)
-            cursor = conn.cursor()
-            cursor.execute("SELECT remind_time, description FROM habits WHERE name = ?", (habit_name,))
-            habit = cursor.fetchone()
-            conn.close()
+        habit_id = selected_item.data(Qt.ItemDataRole.UserRole) if selected_item else None
+        if habit_id is not None:
+            habit = fetch_habit(habit_id)
 
             if habit:
-                dialog = HabitDialog(self, habit_name, habit[0], habit[1])
+                dialog = HabitDialog(self, habit.name, habit.remind_time, habit.description)
                 if dialog.exec() == QDialog.DialogCode.Accepted:
                     new_name, new_remind_time, new_description = dialog.get_data()
 
@@ -200,12 +166,9 @@ class HabitTrackerApp(QWidget):
                         return
 
                     # Update database
-                    conn = sqlite3.connect(DB_FILE)
-                    cursor = conn.cursor()
-                    cursor.execute("UPDATE habits SET name = ?, remind_time = ?, description = ? WHERE name = ?", 
-                                   (new_name, new_remind_time, new_description, habit_name))
-                    conn.commit()
-                    conn.close()
+                    update_habit(habit_id, new_name, new_remind_time, new_description)
+                    self.scheduler.update(fetch_habit(habit_id))
+                    self.arm_reminder_timer()
                     self.load_habits()
         else:
             QMessageBox.warning(self, "Error", "Pilih habit yang ingin diedit!")
@@ -213,8 +176,9 @@ class HabitTrackerApp(QWidget):
     def delete_habit(self):
         """Menghapus habit yang dipilih"""
         selected_item = self.habit_list.currentItem()
-        if selected_item:
-            habit_name = selected_item.text().split(" - ")[0]
+        habit_id = selected_item.data(Qt.ItemDataRole.UserRole) if selected_item else None
+        if habit_id is not None:
+            habit_name = fetch_habit(habit_id).name
             confirm = QMessageBox.question(
                 self,
                 "Konfirmasi",
@@ -222,11 +186,9 @@ class HabitTrackerApp(QWidget):
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
             )
             if confirm == QMessageBox.StandardButton.Yes:
-                conn = sqlite3.connect(DB_FILE)
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM habits WHERE name = ?", (habit_name,))
-                conn.commit()
-                conn.close()
+                delete_habit(habit_id)
+                self.scheduler.remove(habit_id)
+                self.arm_reminder_timer()
                 self.load_habits()
         else:
             QMessageBox.warning(self, "Error", "Pilih habit yang ingin dihapus!")
@@ -234,50 +196,56 @@ class HabitTrackerApp(QWidget):
 
     def mark_completed_days(self):
         """Menandai hari di kalender dengan highlight hijau jika semua habit selesai"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-
         # Ambil semua tanggal di mana semua habit selesai dengan bukti screenshot
-        cursor.execute("""
-            SELECT date
-            FROM habit_log
-            WHERE evidence IS NOT NULL
-            GROUP BY date
-            HAVING COUNT(DISTINCT habit_name) = (SELECT COUNT(*) FROM habits)
-        """)
-        completed_dates = cursor.fetchall()
-        conn.close()
+        completed_dates = fetch_completed_dates()
 
         # Format untuk highlight hijau
         highlight_format = QTextCharFormat()
         highlight_format.setBackground(QColor("lightgreen"))
 
         # Tandai tanggal di kalender
-        for date in completed_dates:
-            date_obj = datetime.datetime.strptime(date[0], "%Y-%m-%d").date()
-            self.calendar.setDateTextFormat(date_obj, highlight_format)
+        for day in completed_dates:
+            self.calendar.setDateTextFormat(from_day(day), highlight_format)
+
+    def init_reminders(self):
+        """Menyiapkan jadwal reminder dan timer single-shot-nya (sama seperti ui/main_window.py)"""
+        self.scheduler = ReminderScheduler()
+        self.reminder_timer = QTimer(self)
+        self.reminder_timer.setSingleShot(True)
+        self.reminder_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.reminder_timer.timeout.connect(self.show_reminder)
+
+        # Klik pada notifikasi membuka aplikasi
+        self.notifications = NotificationDispatcher(self)
+        self.notifications.activated.connect(self.show_window)
+        # Lock daemon reminder (utils/daemon.py) untuk database yang sama
+        self.reminder_daemon = SingleInstance("daemon")
 
     def check_reminders(self):
-        """Memeriksa dan menampilkan notifikasi reminder"""
-        current_time = QTime.currentTime().toString("HH:mm")
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM habits WHERE remind_time = ?", (current_time,))
-        habits = cursor.fetchall()
-        conn.close()
-
-        for habit in habits:
-            msg_box = QMessageBox(self)
-            msg_box.setIcon(QMessageBox.Icon.Information)
-            msg_box.setWindowTitle("Habit Reminder")
-            msg_box.setText(f"Saatnya untuk: {habit[0]}")
-            msg_box.setStandardButtons(QMessageBox.StandardButton.Ok)
-
-            # Jika user klik "OK", maka aplikasi akan terbuka
-            if msg_box.exec() == QMessageBox.StandardButton.Ok:
-                self.showNormal()  # Membuka kembali aplikasi
-                self.raise_()      # Membawa jendela ke depan
-                self.activateWindow()  # Fokus ke aplikasi
+        """Memuat jadwal reminder dari database lalu mengatur timer untuk yang terdekat"""
+        self.scheduler.rebuild(fetch_habits())
+        self.arm_reminder_timer()
+
+    def arm_reminder_timer(self):
+        """Mengatur timer ke reminder terdekat (tanpa polling database)"""
+        delay = self.scheduler.seconds_until_next()
+        if delay is None:
+            self.reminder_timer.stop()
+            return
+        self.reminder_timer.start(int(min(delay, MAX_REMINDER_SLEEP) * 1000))
+
+    def show_reminder(self):
+        """Menampilkan notifikasi non-modal untuk reminder yang jatuh tempo"""
+        due = self.scheduler.pop_due()
+        # Selama daemon reminder berjalan, daemon yang mengirim notifikasinya
+        if due and not self.reminder_daemon.is_held():
+            self.notifications.enqueue(due)
+        self.arm_reminder_timer()
+
+    def show_window(self):
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
 
     def open_and_prompt_upload(self, habit_name):
         """Membuka aplikasi dan meminta pengguna mengunggah bukti untuk habit tertentu"""
@@ -302,17 +270,12 @@ class HabitTrackerApp(QWidget):
         file_path, _ = QFileDialog.getOpenFileName(self, "Pilih Screenshot", "", "Images (*.png *.jpg *.jpeg)")
         if file_path:
             selected_item = self.habit_list.currentItem()
-            if selected_item:
-                habit_name = selected_item.text().split(" - ")[0]
-                date = self.calendar.selectedDate().toString("yyyy-MM-dd")
-
-                conn = sqlite3.connect(DB_FILE)
-                cursor = conn.cursor()
-                cursor.execute("INSERT INTO habit_log (habit_name, date, evidence) VALUES (?, ?, ?)", 
-                               (habit_name, date, file_path))
-                conn.commit()
-                conn.close()
-                
+            habit_id = selected_item.data(Qt.ItemDataRole.UserRole) if selected_item else None
+            if habit_id is not None:
+                date = self.calendar.selectedDate().toPyDate()
+
+                log_evidence(habit_id, date, file_path)
+
                 QMessageBox.information(self, "Success", "Bukti berhasil diunggah dan habit ditandai selesai!")
                 self.load_completed_habits()
             else:
@@ -320,16 +283,10 @@ class HabitTrackerApp(QWidget):
 
     def load_completed_habits(self):
         """Menampilkan habit yang sudah selesai di kalender"""
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT habit_name, date FROM habit_log WHERE evidence IS NOT NULL")
-        completed_habits = cursor.fetchall()
-        conn.close()
+        completed_habits = fetch_completed_logs()
 
-        for habit_name, date in completed_habits:
-            date_obj = datetime.datetime.strptime(date, "%Y-%m-%d").date()
-            fmt_date = date_obj.strftime("%d %b %Y")
-            self.habit_list.addItem(f"✅ {habit_name} - {fmt_date}")
+        for entry in completed_habits:
+            self.habit_list.addItem(entry.label())
 
 class HabitDialog(QDialog):
     """Dialog untuk menambahkan atau mengedit habit"""
@@ -394,14 +351,4 @@ if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = HabitTrackerApp()
     window.show()
-
-    # Menjalankan Thread untuk Notifikasi di Latar Belakang
-    # def run_reminder():
-    #     while True:
-    #         window.check_reminders()
-    #         threading.Event().wait(60)  # Cek setiap 60 detik
-
-    # reminder_thread = threading.Thread(target=run_reminder, daemon=True)
-    # reminder_thread.start()
-
     sys.exit(app.exec())
\ No newline at end of file
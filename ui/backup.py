@@ -0,0 +1,54 @@
+import threading
+import time
+from PyQt6.QtCore import QThread, pyqtSignal
+from database.backup import BackupCancelled, create_backup, list_snapshots, prune
+
+# Backup otomatis saat startup jika snapshot terakhir lebih tua dari ini (detik)
+AUTO_BACKUP_INTERVAL = 24 * 60 * 60
+
+
+def backup_due(now=None):
+    """True jika belum ada snapshot atau snapshot terakhir sudah lewat AUTO_BACKUP_INTERVAL"""
+    snapshots = list_snapshots()
+    if not snapshots:
+        return True
+    now = now or time.time()
+    return now - snapshots[0][0].timestamp() >= AUTO_BACKUP_INTERVAL
+
+
+class BackupWorker(QThread):
+    """Menjalankan satu backup online di thread sendiri
+
+    Tidak memakai DatabaseWorker: backup database besar bisa makan waktu
+    lama dan tidak boleh menahan query UI yang antre di belakangnya.
+    Backup berjalan bertahap dengan jeda antarlangkah, sehingga penulisan
+    dari worker tetap bisa masuk selama backup.
+    """
+
+    # Dipancarkan dari thread backup, diterima di thread GUI (queued)
+    progressed = pyqtSignal(int, int)
+    completed = pyqtSignal(str, float)
+    failed = pyqtSignal(object)
+
+    def __init__(self, parent=None, compress=True):
+        super().__init__(parent)
+        self.compress = compress
+        self._cancel = threading.Event()
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            path = create_backup(compress=self.compress, progress=self.progressed.emit,
+                                 cancel=self._cancel)
+            prune()
+        except BackupCancelled:
+            return
+        except Exception as exc:
+            self.failed.emit(exc)
+        else:
+            self.completed.emit(path, time.perf_counter() - start)
+
+    def cancel(self):
+        """Menghentikan backup di langkah berikutnya lalu menunggu thread selesai"""
+        self._cancel.set()
+        self.wait()
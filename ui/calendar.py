@@ -0,0 +1,115 @@
+import datetime
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QTextCharFormat, QColor
+from database.db_manager import fetch_completed_dates
+from database.records import from_day, to_day
+from utils.tracing import traced
+
+# QCalendarWidget selalu menampilkan 6 minggu per halaman
+VISIBLE_DAYS = 42
+# Jumlah halaman (bulan) yang hasilnya disimpan
+PAGE_CACHE_SIZE = 24
+
+
+def visible_range(year, month, first_day_of_week):
+    """(hari pertama, hari terakhir) yang tampil di halaman bulan tersebut
+
+    first_day_of_week memakai nilai Qt.DayOfWeek (Senin = 1 ... Minggu = 7).
+    Jika tanggal 1 jatuh di kolom pertama, Qt menampilkan satu minggu penuh
+    dari bulan sebelumnya di baris pertama.
+    """
+    first = datetime.date(year, month, 1)
+    offset = (first.isoweekday() - first_day_of_week) % 7 or 7
+    start = to_day(first) - offset
+    return start, start + VISIBLE_DAYS - 1
+
+def neighbour_pages(year, month):
+    """Halaman bulan sebelum dan sesudahnya"""
+    previous = (year - 1, 12) if month == 1 else (year, month - 1)
+    following = (year + 1, 1) if month == 12 else (year, month + 1)
+    return previous, following
+
+
+class CalendarHighlighter(QObject):
+    """Menandai hari yang semua habit-nya selesai pada halaman kalender yang terlihat
+
+    Hanya rentang 6 minggu yang tampil yang di-query; hasil per halaman
+    disimpan (LRU) dan halaman tetangga dimuat lebih dulu di worker.
+    Perubahan diterapkan sebagai selisih terhadap hari yang sudah disorot,
+    memakai dua objek format bersama.
+    """
+
+    highlighted = pyqtSignal()
+
+    def __init__(self, calendar, worker=None, parent=None):
+        super().__init__(parent)
+        self.calendar = calendar
+        self.worker = worker
+        self.highlight_format = QTextCharFormat()
+        self.highlight_format.setBackground(QColor("lightgreen"))
+        self.plain_format = QTextCharFormat()
+        self._pages = OrderedDict()   # (tahun, bulan) -> frozenset nomor hari
+        self._painted = frozenset()
+        self._generation = 0
+        calendar.currentPageChanged.connect(lambda year, month: self.refresh())
+
+    def current_page(self):
+        return self.calendar.yearShown(), self.calendar.monthShown()
+
+    def _load(self, page, on_loaded, key):
+        start, end = visible_range(*page, self.calendar.firstDayOfWeek().value)
+        # Hasil dari sebelum invalidate() dibuang
+        generation = self._generation
+
+        def loaded(days):
+            if generation != self._generation:
+                return
+            self._pages[page] = frozenset(days)
+            self._pages.move_to_end(page)
+            while len(self._pages) > PAGE_CACHE_SIZE:
+                self._pages.popitem(last=False)
+            on_loaded(page)
+
+        if self.worker is None:
+            loaded(fetch_completed_dates(start, end))
+        else:
+            self.worker.submit(fetch_completed_dates, start, end, on_result=loaded, key=key)
+
+    @traced()
+    def refresh(self):
+        """Menyorot halaman yang terlihat, dari cache jika ada"""
+        page = self.current_page()
+        days = self._pages.get(page)
+        if days is None:
+            self._load(page, self._current_loaded, key="calendar")
+        else:
+            self._pages.move_to_end(page)
+            self.apply(days)
+        self.prefetch(page)
+
+    def _current_loaded(self, page):
+        if page == self.current_page():
+            self.apply(self._pages[page])
+
+    def prefetch(self, page):
+        """Memuat halaman tetangga di worker agar berpindah bulan langsung tampil"""
+        for neighbour in neighbour_pages(*page):
+            if neighbour not in self._pages:
+                self._load(neighbour, lambda _: None, key=("calendar-prefetch",) + neighbour)
+
+    def invalidate(self):
+        """Membuang cache halaman (data berubah) lalu memuat ulang halaman yang terlihat"""
+        self._generation += 1
+        self._pages.clear()
+        self.refresh()
+
+    @traced()
+    def apply(self, days):
+        """Hanya mengubah format hari yang statusnya berbeda dari yang sudah disorot"""
+        for day in self._painted - days:
+            self.calendar.setDateTextFormat(from_day(day), self.plain_format)
+        for day in days - self._painted:
+            self.calendar.setDateTextFormat(from_day(day), self.highlight_format)
+        self._painted = days
+        self.highlighted.emit()
@@ -0,0 +1,124 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+from PyQt6.QtCore import QThread, pyqtSignal
+from utils.tracing import tracer
+
+
+class DatabaseWorker(QThread):
+    """Thread khusus yang menjalankan semua query di luar thread GUI
+
+    Job dijalankan berurutan (FIFO) di satu thread yang memiliki koneksinya
+    sendiri dari DatabaseManager. Hasil dikirim kembali ke thread GUI lewat
+    signal lalu diteruskan ke callback job. Job dengan `key` yang sama saling
+    menggantikan: job lama yang belum jalan dilewati dan hasilnya dibuang.
+    Job yang mengembalikan Future (mutasi write-behind dengan wait=False)
+    dikirim hasilnya setelah Future selesai; worker langsung lanjut ke job
+    berikutnya sehingga mutasi beruntun masuk ke satu group commit.
+    """
+
+    # Dipancarkan dari thread worker, diterima di thread GUI (queued)
+    job_done = pyqtSignal(int, object)
+    job_error = pyqtSignal(int, object)
+    # Error dari job tanpa callback on_error
+    failed = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._callbacks = {}   # job_id -> (on_result, on_error)
+        self._latest = {}      # key -> job_id terbaru
+        self._job_keys = {}    # job_id -> key
+        self.job_done.connect(self._deliver_result)
+        self.job_error.connect(self._deliver_error)
+
+    def submit(self, fn, *args, on_result=None, on_error=None, key=None):
+        """Menjadwalkan fn(*args) di thread worker, mengembalikan id job"""
+        job_id = next(self._ids)
+        with self._lock:
+            self._callbacks[job_id] = (on_result, on_error)
+            if key is not None:
+                self._latest[key] = job_id
+                self._job_keys[job_id] = key
+        self._jobs.put((job_id, fn, args, time.perf_counter()))
+        return job_id
+
+    def cancel(self, job_id):
+        """Membatalkan job; jika sudah berjalan, hasilnya dibuang"""
+        with self._lock:
+            self._callbacks.pop(job_id, None)
+            key = self._job_keys.pop(job_id, None)
+            if key is not None and self._latest.get(key) == job_id:
+                del self._latest[key]
+
+    def _is_live(self, job_id):
+        with self._lock:
+            if job_id not in self._callbacks:
+                return False
+            key = self._job_keys.get(job_id)
+            return key is None or self._latest.get(key) == job_id
+
+    def _take_callbacks(self, job_id):
+        with self._lock:
+            callbacks = self._callbacks.pop(job_id, None)
+            key = self._job_keys.pop(job_id, None)
+            stale = key is not None and self._latest.get(key) != job_id
+            if key is not None and not stale:
+                del self._latest[key]
+        return None if stale else callbacks
+
+    def run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            job_id, fn, args, submitted = job
+            if not self._is_live(job_id):
+                self._take_callbacks(job_id)
+                continue
+            start = time.perf_counter()
+            try:
+                result = fn(*args)
+            except Exception as exc:
+                self.job_error.emit(job_id, exc)
+            else:
+                if isinstance(result, Future):
+                    result.add_done_callback(partial(self._future_done, job_id))
+                else:
+                    self.job_done.emit(job_id, result)
+            if tracer.enabled:
+                # wait_ms: lama job menunggu di antrean sebelum dijalankan
+                tracer.record("job", getattr(fn, "__qualname__", repr(fn)), time.perf_counter() - start,
+                              wait_ms=round((start - submitted) * 1000, 3))
+
+    def _future_done(self, job_id, future):
+        # Dipanggil dari thread flusher setelah COMMIT; signal diantrekan ke thread GUI
+        error = future.exception()
+        if error is None:
+            self.job_done.emit(job_id, future.result())
+        else:
+            self.job_error.emit(job_id, error)
+
+    def _deliver_result(self, job_id, result):
+        callbacks = self._take_callbacks(job_id)
+        if callbacks and callbacks[0] is not None:
+            callbacks[0](result)
+
+    def _deliver_error(self, job_id, exc):
+        callbacks = self._take_callbacks(job_id)
+        if callbacks is None:
+            return
+        if callbacks[1] is not None:
+            callbacks[1](exc)
+        else:
+            self.failed.emit(exc)
+
+    def stop(self):
+        """Menyelesaikan job yang masih antre lalu menghentikan thread"""
+        self._jobs.put(None)
+        self.wait()
@@ -0,0 +1,101 @@
+import time
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QPushButton
+)
+from PyQt6.QtCore import Qt, QObject, QTimer
+from database.db_manager import cache_stats, write_stats
+from utils.tracing import tracer, PERCENTILES
+
+# Interval sampel watchdog event loop (ms)
+WATCHDOG_INTERVAL = 100
+PANEL_REFRESH = 1000
+
+
+class EventLoopWatchdog(QObject):
+    """Mengukur keterlambatan timer periodik sebagai latensi event loop GUI
+
+    Jika thread GUI sibuk (misalnya query sinkron atau dekode gambar),
+    timeout datang terlambat; selisihnya dicatat sebagai event `event_loop`.
+    """
+
+    def __init__(self, parent=None, interval=WATCHDOG_INTERVAL):
+        super().__init__(parent)
+        self.interval = interval
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.timer.timeout.connect(self._tick)
+        self._expected = None
+
+    def start(self):
+        self._expected = time.perf_counter() + self.interval / 1000
+        self.timer.start(self.interval)
+
+    def stop(self):
+        self.timer.stop()
+
+    def _tick(self):
+        now = time.perf_counter()
+        tracer.record("event_loop", "lag", max(0.0, now - self._expected))
+        self._expected = now + self.interval / 1000
+
+
+class DebugPanel(QWidget):
+    """Tabel p50/p95/p99 per operasi dari tracer, diperbarui setiap detik"""
+
+    COLUMNS = ("jenis", "operasi", "jumlah") + tuple(f"p{pct} (ms)" for pct in PERCENTILES)
+
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.WindowType.Window)
+        self.setWindowTitle("Habit Tracker - Debug")
+        self.resize(720, 400)
+        layout = QVBoxLayout(self)
+
+        self.table = QTableWidget(0, len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.cache_label = QLabel(self)
+        layout.addWidget(self.cache_label)
+        self.writes_label = QLabel(self)
+        layout.addWidget(self.writes_label)
+
+        reset_button = QPushButton("Reset", self)
+        reset_button.clicked.connect(self.reset)
+        layout.addWidget(reset_button)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start(PANEL_REFRESH)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def reset(self):
+        tracer.reset()
+        self.refresh()
+
+    def refresh(self):
+        stats = cache_stats()
+        self.cache_label.setText(
+            f"Query cache: {stats['hits']} hit / {stats['misses']} miss ({stats['hit_rate']:.0%}), "
+            f"{stats['entries']} entri, {stats['rows']} baris, generasi {stats['generation']}")
+        writes = write_stats()
+        flush = "-" if writes["flush_p50"] is None else f"{writes['flush_p50']:.1f}/{writes['flush_p95']:.1f} ms"
+        self.writes_label.setText(
+            f"Write-behind: {writes['writes']} mutasi dalam {writes['flushes']} commit "
+            f"(rata-rata {writes['batch_mean']:.1f}, maks {writes['batch_max']} per batch), "
+            f"flush p50/p95 {flush}, mengantre {writes['pending']}")
+        rows = tracer.summary()
+        self.table.setRowCount(len(rows))
+        for row, summary in enumerate(rows):
+            values = [summary["kind"], summary["name"], str(summary["count"])]
+            values += [f"{summary[f'p{pct}']:.1f}" for pct in PERCENTILES]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
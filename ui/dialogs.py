@@ -1,10 +1,14 @@
-from PyQt6.QtWidgets import QDialog, QFormLayout, QLineEdit, QTimeEdit, QDialogButtonBox
-from PyQt6.QtCore import QTime
+from PyQt6.QtWidgets import (
+    QDialog, QFormLayout, QLineEdit, QTimeEdit, QDialogButtonBox, QCheckBox, QSpinBox, QDateEdit, QHBoxLayout
+)
+from PyQt6.QtCore import QTime, QDate
 import datetime
+from database.records import to_day, from_day
+from utils.recurrence import DAILY, WEEKDAY_NAMES, Recurrence
 
 class HabitDialog(QDialog):
     """Dialog untuk menambahkan atau mengedit habit"""
-    def __init__(self, parent=None, habit_name="", remind_time="", description=""):
+    def __init__(self, parent=None, habit_name="", remind_time="", description="", recurrence=DAILY):
         super().__init__(parent)
         self.setWindowTitle("Habit Details")
         self.setModal(True)
@@ -27,12 +31,60 @@ class HabitDialog(QDialog):
         self.description_input.setText(description)
         layout.addRow("Deskripsi:", self.description_input)
 
+        # Aturan jadwal
+        weekday_row = QHBoxLayout()
+        self.weekday_inputs = []
+        for bit, name in enumerate(WEEKDAY_NAMES):
+            checkbox = QCheckBox(name, self)
+            checkbox.setChecked(bool(recurrence.weekdays >> bit & 1))
+            weekday_row.addWidget(checkbox)
+            self.weekday_inputs.append(checkbox)
+        layout.addRow("Hari:", weekday_row)
+
+        self.every_days_input = QSpinBox(self)
+        self.every_days_input.setRange(1, 365)
+        self.every_days_input.setValue(recurrence.every_days)
+        layout.addRow("Setiap N hari:", self.every_days_input)
+
+        self.per_week_input = QSpinBox(self)
+        self.per_week_input.setRange(0, 7)
+        self.per_week_input.setSpecialValueText("wajib setiap hari jadwal")
+        self.per_week_input.setValue(recurrence.per_week or 0)
+        layout.addRow("Target per minggu:", self.per_week_input)
+
+        self.start_input, self.start_enabled = self._date_row(layout, "Mulai:", recurrence.start_day)
+        self.end_input, self.end_enabled = self._date_row(layout, "Berakhir:", recurrence.end_day)
+
         # Tombol OK dan Cancel
         self.button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel, self)
         self.button_box.accepted.connect(self.accept)
         self.button_box.rejected.connect(self.reject)
         layout.addWidget(self.button_box)
 
+    def _date_row(self, layout, label, day):
+        """Baris tanggal opsional (checkbox + QDateEdit)"""
+        row = QHBoxLayout()
+        enabled = QCheckBox(self)
+        date_input = QDateEdit(self)
+        date_input.setCalendarPopup(True)
+        date = datetime.date.today() if day is None else from_day(day)
+        date_input.setDate(QDate(date.year, date.month, date.day))
+        enabled.setChecked(day is not None)
+        date_input.setEnabled(day is not None)
+        enabled.toggled.connect(date_input.setEnabled)
+        row.addWidget(enabled)
+        row.addWidget(date_input, 1)
+        layout.addRow(label, row)
+        return date_input, enabled
+
+    def get_recurrence(self):
+        """Recurrence dari input aturan jadwal; ValueError jika tidak valid"""
+        weekdays = sum(1 << bit for bit, checkbox in enumerate(self.weekday_inputs) if checkbox.isChecked())
+        start_day = to_day(self.start_input.date().toPyDate()) if self.start_enabled.isChecked() else None
+        end_day = to_day(self.end_input.date().toPyDate()) if self.end_enabled.isChecked() else None
+        return Recurrence.from_columns(weekdays, self.every_days_input.value(),
+                                       self.per_week_input.value() or None, start_day, end_day)
+
     def get_data(self):
         """Mengembalikan data dari input"""
         return self.name_input.text(), self.remind_time_input.text(), self.description_input.text()
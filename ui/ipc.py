@@ -0,0 +1,49 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer
+from utils.instance import encode_message, decode_message, check_command
+
+
+class InstanceServer(QObject):
+    """Menerima pesan dari launch berikutnya lewat QLocalServer
+
+    Setiap koneksi mengirim satu baris JSON dan menerima satu baris
+    balasan. Hanya pesan yang lolos check_command yang dipancarkan lewat
+    message_received; pesan lain dibalas dengan error.
+    """
+
+    message_received = pyqtSignal(dict)
+
+    def __init__(self, instance, parent=None):
+        super().__init__(parent)
+        self.instance = instance
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._accept)
+
+    def listen(self):
+        """Mulai mendengarkan; socket sisa proses yang mati dihapus dulu (lock sudah dipegang)"""
+        QLocalServer.removeServer(self.instance.socket_path)
+        return self.server.listen(self.instance.socket_path)
+
+    def close(self):
+        self.server.close()
+
+    def _accept(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            connection.readyRead.connect(lambda connection=connection: self._read(connection))
+            connection.disconnected.connect(connection.deleteLater)
+
+    def _read(self, connection):
+        if not connection.canReadLine():
+            return
+        line = bytes(connection.readLine())
+        try:
+            message = check_command(decode_message(line))
+        except ValueError as exc:
+            connection.write(encode_message({"ok": False, "error": str(exc)}))
+        else:
+            connection.write(encode_message({"ok": True}))
+            self.message_received.emit(message)
+        connection.flush()
+        connection.disconnectFromServer()
@@ -1,54 +1,542 @@
+import datetime
+import os
+import sqlite3
 from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QPushButton, QListWidget, 
-    QLabel, QCalendarWidget, QTimeEdit, QMessageBox, QFileDialog, 
-    QDialog, QFormLayout, QLineEdit, QDialogButtonBox, QInputDialog,
-    QSystemTrayIcon, QMenu
+    QApplication, QWidget, QVBoxLayout, QPushButton, QListView,
+    QLabel, QCalendarWidget, QMessageBox, QFileDialog, QDialog, QInputDialog,
+    QLineEdit, QSystemTrayIcon, QMenu
 )
-from PyQt6.QtGui import QPixmap, QTextCharFormat, QColor, QAction, QIcon
-from PyQt6.QtCore import QTimer
-from database.db_manager import init_db, fetch_habits, add_habit
+from PyQt6.QtGui import QPixmap, QAction, QIcon, QKeySequence, QShortcut
+from PyQt6.QtCore import Qt, QTimer
+from database.db_manager import (
+    init_db, fetch_habits, fetch_habit, add_habit, update_habit, delete_habit,
+    log_evidence, close_db
+)
+from database.records import Habit, time_to_minutes
+from ui.calendar import CalendarHighlighter
+from ui.notifications import NotificationDispatcher
 from ui.dialogs import HabitDialog
+from ui.models import (
+    HABIT_ID_ROLE, HABIT_NAME_ROLE, EVIDENCE_ROLE, HabitListModel, HabitSearchModel, CompletedLogModel
+)
+from ui.db_worker import DatabaseWorker
+from ui.backup import BackupWorker, backup_due
+from utils.instance import SingleInstance, check_command
+from utils.scheduler import ReminderScheduler
+from utils.startup import StartupProfiler
+from utils.tracing import tracer, traced
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ICON_FILE = os.path.join(BASE_DIR, "..", "icon.png")
+
+# Batas tidur timer reminder, agar sleep/perubahan jam tetap terkejar
+MAX_REMINDER_SLEEP = 300
+
+# Jeda setelah ketikan terakhir sebelum pencarian dijalankan (ms)
+SEARCH_DEBOUNCE_MS = 150
+
+# Jeda maksimal sebelum data dimuat jika jendela belum pernah di-paint (mis. tersembunyi)
+STARTUP_FALLBACK_MS = 500
+
+@traced()
+def store_and_log_evidence(habit_id, date, file_path, note=None):
+    """Menyalin bukti ke evidence store lalu mengantrekan log-nya (dijalankan di worker)
+
+    Mengembalikan Future: DatabaseWorker mengirim id log setelah group commit.
+    """
+    from utils.evidence import get_store
+    return log_evidence(habit_id, date, get_store().add(file_path), note, wait=False)
+
+def load_thumbnail(evidence):
+    """Thumbnail bukti dari evidence store (dijalankan di worker)"""
+    from utils.evidence import get_store
+    return get_store().thumbnail(evidence)
+
+def load_analytics():
+    """Mengimpor NumPy dan membangun HabitAnalytics (dijalankan di worker)"""
+    from utils.analytics import HabitAnalytics
+    analytics = HabitAnalytics()
+    analytics.load()
+    return analytics
 
 class HabitTrackerApp(QWidget):
-    def __init__(self):
+    def __init__(self, profiler=None):
         super().__init__()
+        self.profiler = profiler or StartupProfiler()
+        # Semua query berjalan di thread worker; init_db antre paling awal
+        self.db_worker = DatabaseWorker(self)
+        self.db_worker.failed.connect(self.show_db_error)
+        self.db_worker.start()
+        QApplication.instance().aboutToQuit.connect(self.db_worker.stop)
+        self.db_worker.submit(init_db)
+
+        # Diisi di thread worker oleh load_analytics (lihat analytics_call)
+        self.analytics = None
+        self.tray_icon = None
+        self.backup_worker = None
+
         self.initUi()
-        init_db()
-        self.load_habits()
+        self.init_reminders()
+        if tracer.enabled:
+            self.init_debug_tools()
+        self.profiler.mark("window_created")
+
+        # Data dimuat bertahap setelah paint pertama; daftar habit dan
+        # riwayat diambil sendiri oleh view begitu terlihat.
+        self._loading_started = False
+        QTimer.singleShot(STARTUP_FALLBACK_MS, self.start_loading)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._loading_started:
+            self.profiler.mark("first_paint")
+            QTimer.singleShot(0, self.start_loading)
+
+    def start_loading(self):
+        """Tahapan startup setelah jendela tampil, dari yang paling terlihat"""
+        if self._loading_started:
+            return
+        self._loading_started = True
+        self.mark_completed_days()
+        self.check_reminders()
+        self.init_tray_icon()
+        self.db_worker.submit(self.init_analytics)
+        # Worker FIFO: job ini selesai setelah semua job startup di atas
+        self.db_worker.submit(lambda: None, on_result=lambda _: self.startup_finished())
+
+    def startup_finished(self):
+        self.profiler.mark("data_loaded")
+        if self.profiler.enabled:
+            self.profiler.print_report()
+            self.close_app()
+        elif backup_due():
+            self.start_backup()
+
+    def init_analytics(self):
+        """Dijalankan di worker agar job analytics berikutnya langsung melihat hasilnya"""
+        self.analytics = load_analytics()
+
+    def analytics_call(self, method, *args):
+        """Memanggil method HabitAnalytics di worker; None jika belum dimuat"""
+        if self.analytics is None:
+            return None
+        return getattr(self.analytics, method)(*args)
 
     def initUi(self):
         self.setWindowTitle("Habit Tracker")
         self.setGeometry(100, 100, 400, 500)
-        
+
         # Layout
         layout = QVBoxLayout()
-        
+
         # Kalender
         self.calendar = QCalendarWidget(self)
+        # Highlight hari selesai mengikuti halaman yang terlihat (lihat ui/calendar.py)
+        self.calendar_highlighter = CalendarHighlighter(self.calendar, worker=self.db_worker, parent=self)
+        self.calendar_highlighter.highlighted.connect(lambda: self.profiler.mark("calendar_marked"))
         layout.addWidget(self.calendar)
 
-        # Daftar Habit
-        self.habit_list = QListWidget(self)
+        # Pencarian habit (FTS5), dijalankan setelah pengguna berhenti mengetik
+        self.search_input = QLineEdit(self)
+        self.search_input.setPlaceholderText("Cari habit...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_habits)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        layout.addWidget(self.search_input)
+
+        # Daftar Habit (dimuat bertahap oleh model)
+        self.habit_model = HabitListModel(self, worker=self.db_worker)
+        self.search_model = HabitSearchModel(self, worker=self.db_worker)
+        self.habit_list = QListView(self)
+        self.habit_list.setUniformItemSizes(True)
+        self.set_habit_list_model(self.habit_model)
         layout.addWidget(self.habit_list)
 
+        # Statistik habit yang dipilih
+        self.stats_label = QLabel(self)
+        layout.addWidget(self.stats_label)
+
+        # Riwayat habit yang sudah selesai
+        layout.addWidget(QLabel("Riwayat Selesai", self))
+        self.history_model = CompletedLogModel(self, worker=self.db_worker)
+        self.history_list = QListView(self)
+        self.history_list.setUniformItemSizes(True)
+        self.history_list.setModel(self.history_model)
+        self.history_list.selectionModel().currentChanged.connect(self.show_evidence_preview)
+        layout.addWidget(self.history_list)
+
+        # Pratinjau bukti (thumbnail dari cache, bukan gambar asli)
+        self.evidence_preview = QLabel(self)
+        self.evidence_preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.evidence_preview)
+
+        # Tombol Edit Habit
+        self.edit_button = QPushButton("Edit Habit", self)
+        self.edit_button.clicked.connect(self.edit_habit)
+        layout.addWidget(self.edit_button)
+
+        # Tombol Hapus Habit
+        self.delete_button = QPushButton("Hapus Habit", self)
+        self.delete_button.clicked.connect(self.delete_habit)
+        layout.addWidget(self.delete_button)
+
         # Tombol Tambah Habit
         self.add_button = QPushButton("Tambah Habit", self)
         self.add_button.clicked.connect(self.add_habit)
         layout.addWidget(self.add_button)
 
+        # Tombol Upload Screenshot
+        self.upload_button = QPushButton("Upload Bukti (Screenshot)", self)
+        self.upload_button.clicked.connect(self.upload_screenshot)
+        layout.addWidget(self.upload_button)
+
         self.setLayout(layout)
 
+    def set_habit_list_model(self, model):
+        """Mengganti model daftar habit (daftar lengkap atau hasil pencarian)"""
+        previous = self.habit_list.model()
+        if previous is model:
+            return
+        # setModel() membuat QItemSelectionModel baru; yang lama tidak dihapus oleh view
+        previous_selection = self.habit_list.selectionModel()
+        self.habit_list.setModel(model)
+        self.habit_list.selectionModel().currentChanged.connect(self.show_habit_stats)
+        if previous_selection is not None:
+            previous_selection.deleteLater()
+        if previous is not None:
+            self.show_habit_stats(self.habit_list.currentIndex())
+
+    @traced()
+    def search_habits(self):
+        """Menampilkan hasil pencarian, atau daftar lengkap jika kotak pencarian kosong"""
+        text = self.search_input.text().strip()
+        if text:
+            self.search_model.set_query(text)
+            self.set_habit_list_model(self.search_model)
+        else:
+            self.set_habit_list_model(self.habit_model)
+
+    def init_debug_tools(self):
+        """Watchdog event loop dan panel debug (Ctrl+Shift+D), hanya saat tracing aktif"""
+        from ui.debug import EventLoopWatchdog, DebugPanel
+        self.watchdog = EventLoopWatchdog(self)
+        self.watchdog.start()
+        self.debug_panel = DebugPanel(self)
+        shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        shortcut.activated.connect(self.debug_panel.show)
+
+    def init_tray_icon(self):
+        self.tray_icon = QSystemTrayIcon(self)
+        self.tray_icon.setIcon(QIcon(ICON_FILE))
+
+        menu = QMenu(self)
+        restore_action = QAction("Buka Habit Tracker", self)
+        restore_action.triggered.connect(self.show)
+        menu.addAction(restore_action)
+
+        backup_action = QAction("Backup Sekarang", self)
+        backup_action.triggered.connect(lambda: self.start_backup(notify=True))
+        menu.addAction(backup_action)
+
+        exit_action = QAction("Keluar", self)
+        exit_action.triggered.connect(self.close_app)
+        menu.addAction(exit_action)
+
+        self.tray_icon.setContextMenu(menu)
+        self.tray_icon.activated.connect(self.tray_icon_clicked)
+        self.tray_icon.show()
+        self.notifications.set_tray_icon(self.tray_icon)
+
+    def closeEvent(self, event):
+        event.ignore()
+        self.hide()
+        if self.tray_icon is not None:
+            self.tray_icon.showMessage("Habit Tracker", "Aplikasi berjalan di latar belakang", QSystemTrayIcon.MessageIcon.Information, 2000)
+
+    def tray_icon_clicked(self, reason):
+        if reason == QSystemTrayIcon.ActivationReason.Trigger:
+            self.show()
+
+    def start_backup(self, notify=False):
+        """Backup online di BackupWorker; notify=True menampilkan hasilnya di tray"""
+        if self.backup_worker is not None and self.backup_worker.isRunning():
+            return
+        self.backup_worker = BackupWorker(self)
+        if notify:
+            self.backup_worker.completed.connect(self.backup_completed)
+        self.backup_worker.failed.connect(self.show_db_error)
+        self.backup_worker.start()
+
+    def backup_completed(self, path, seconds):
+        if self.tray_icon is not None:
+            self.tray_icon.showMessage("Habit Tracker", f"Backup selesai ({seconds:.1f} dtk): {os.path.basename(path)}",
+                                       QSystemTrayIcon.MessageIcon.Information, 3000)
+
+    def close_app(self):
+        if self.tray_icon is not None:
+            self.tray_icon.hide()
+        if self.backup_worker is not None:
+            self.backup_worker.cancel()
+        self.db_worker.stop()
+        # close_db() menulis antrean write-behind sebelum koneksi ditutup
+        close_db()
+        QApplication.quit()
+
+    def selected_habit_id(self):
+        """Mengembalikan id habit yang dipilih, atau None"""
+        index = self.habit_list.currentIndex()
+        return index.data(HABIT_ID_ROLE) if index.isValid() else None
+
+    @traced()
     def load_habits(self):
-        """Memuat daftar habit dari database"""
-        self.habit_list.clear()
-        habits = fetch_habits()
-        for habit in habits:
-            self.habit_list.addItem(f"{habit[0]} - {habit[1]} - {habit[2]}")
+        """Memuat ulang daftar habit; baris diambil per halaman saat terlihat"""
+        self.habit_model.reload()
 
     def add_habit(self):
         """Menambahkan habit baru"""
         dialog = HabitDialog(self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             habit_name, remind_time, description = dialog.get_data()
-            add_habit(habit_name, remind_time, description)
-            self.load_habits()
\ No newline at end of file
+
+            # Validasi input
+            if not habit_name or not remind_time or not description:
+                QMessageBox.warning(self, "Error", "Semua field harus diisi!")
+                return
+
+            if not dialog.validate_time():
+                QMessageBox.warning(self, "Error", "Format waktu harus HH:MM (24-hour format)!")
+                return
+
+            try:
+                recurrence = dialog.get_recurrence()
+            except ValueError as exc:
+                QMessageBox.warning(self, "Error", str(exc))
+                return
+
+            def added(habit_id):
+                self.scheduler.update(Habit(habit_id, habit_name, time_to_minutes(remind_time), description,
+                                            recurrence))
+                self.arm_reminder_timer()
+                self.db_worker.submit(self.analytics_call, "set_recurrence", habit_id, recurrence)
+                self.habit_model.habit_added(habit_id)
+                self.search_model.habit_added(habit_id)
+                self.mark_completed_days()
+
+            # wait=False: id dikirim worker setelah group commit (lihat DatabaseWorker)
+            self.db_worker.submit(add_habit, habit_name, remind_time, description, recurrence, False,
+                                  on_result=added,
+                                  on_error=lambda exc: self.show_duplicate_error(exc, habit_name))
+
+    def edit_habit(self):
+        """Mengedit habit yang dipilih"""
+        habit_id = self.selected_habit_id()
+        if habit_id is None:
+            QMessageBox.warning(self, "Error", "Pilih habit yang ingin diedit!")
+            return
+        self.db_worker.submit(fetch_habit, habit_id,
+                              on_result=lambda habit: self.open_edit_dialog(habit_id, habit))
+
+    def open_edit_dialog(self, habit_id, habit):
+        """Menampilkan dialog edit setelah data habit selesai dimuat"""
+        if habit:
+            dialog = HabitDialog(self, habit.name, habit.remind_time, habit.description, habit.recurrence)
+            if dialog.exec() == QDialog.DialogCode.Accepted:
+                new_name, new_remind_time, new_description = dialog.get_data()
+
+                # Validasi input
+                if not new_name or not new_remind_time or not new_description:
+                    QMessageBox.warning(self, "Error", "Semua field harus diisi!")
+                    return
+
+                if not dialog.validate_time():
+                    QMessageBox.warning(self, "Error", "Format waktu harus HH:MM (24-hour format)!")
+                    return
+
+                try:
+                    recurrence = dialog.get_recurrence()
+                except ValueError as exc:
+                    QMessageBox.warning(self, "Error", str(exc))
+                    return
+
+                def updated(_):
+                    self.scheduler.update(Habit(habit_id, new_name, time_to_minutes(new_remind_time),
+                                                new_description, recurrence))
+                    self.arm_reminder_timer()
+                    self.habit_model.habit_updated(habit_id)
+                    self.search_model.habit_updated(habit_id)
+                    self.history_model.habit_updated(habit_id)
+                    if recurrence != habit.recurrence:
+                        self.db_worker.submit(self.analytics_call, "set_recurrence", habit_id, recurrence)
+                        self.mark_completed_days()
+
+                self.db_worker.submit(update_habit, habit_id, new_name, new_remind_time, new_description,
+                                      recurrence, on_result=updated,
+                                      on_error=lambda exc: self.show_duplicate_error(exc, new_name))
+
+    def delete_habit(self):
+        """Menghapus habit yang dipilih"""
+        habit_id = self.selected_habit_id()
+        if habit_id is None:
+            QMessageBox.warning(self, "Error", "Pilih habit yang ingin dihapus!")
+            return
+
+        habit_name = self.habit_list.currentIndex().data(HABIT_NAME_ROLE)
+        confirm = QMessageBox.question(
+            self,
+            "Konfirmasi",
+            f"Apakah Anda yakin ingin menghapus habit '{habit_name}'?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if confirm == QMessageBox.StandardButton.Yes:
+            def deleted(_):
+                self.db_worker.submit(self.analytics_call, "remove_habit", habit_id)
+                self.scheduler.remove(habit_id)
+                self.arm_reminder_timer()
+                self.habit_model.habit_removed(habit_id)
+                self.search_model.habit_removed(habit_id)
+                self.history_model.habit_removed(habit_id)
+                self.mark_completed_days()
+
+            self.db_worker.submit(delete_habit, habit_id, on_result=deleted)
+
+    def mark_completed_days(self):
+        """Memperbarui highlight kalender setelah data habit/log berubah"""
+        self.calendar_highlighter.invalidate()
+
+    def show_duplicate_error(self, exc, habit_name):
+        if isinstance(exc, sqlite3.IntegrityError):
+            QMessageBox.warning(self, "Error", f"Habit '{habit_name}' sudah ada!")
+        else:
+            self.show_db_error(exc)
+
+    def show_db_error(self, exc):
+        QMessageBox.warning(self, "Error", f"Operasi database gagal: {exc}")
+
+    def init_reminders(self):
+        """Menyiapkan jadwal reminder (kosong) dan timer single-shot-nya"""
+        self.scheduler = ReminderScheduler()
+        self.reminder_timer = QTimer(self)
+        self.reminder_timer.setSingleShot(True)
+        self.reminder_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.reminder_timer.timeout.connect(self.show_reminder)
+
+        # Klik pada notifikasi membuka aplikasi
+        self.notifications = NotificationDispatcher(self)
+        self.notifications.activated.connect(self.show_window)
+        # Lock daemon reminder (utils/daemon.py) untuk database yang sama
+        self.reminder_daemon = SingleInstance("daemon")
+
+    def check_reminders(self):
+        """Memuat jadwal reminder dari database lalu mengatur timer untuk yang terdekat"""
+        def loaded(habits):
+            self.scheduler.rebuild(habits)
+            self.arm_reminder_timer()
+            self.profiler.mark("reminders_armed")
+
+        self.db_worker.submit(fetch_habits, on_result=loaded)
+
+    def arm_reminder_timer(self):
+        """Mengatur timer ke reminder terdekat (tanpa polling database)"""
+        delay = self.scheduler.seconds_until_next()
+        if delay is None:
+            self.reminder_timer.stop()
+            return
+        self.reminder_timer.start(int(min(delay, MAX_REMINDER_SLEEP) * 1000))
+
+    @traced()
+    def show_reminder(self):
+        """Menampilkan notifikasi untuk reminder yang jatuh tempo"""
+        due = self.scheduler.pop_due()
+        # Selama daemon reminder berjalan, daemon yang mengirim notifikasinya (tanpa duplikat)
+        if due and not self.reminder_daemon.is_held():
+            # Reminder pada tick yang sama digabung jadi satu notifikasi non-modal
+            self.notifications.enqueue(due)
+        self.arm_reminder_timer()
+
+    def show_window(self):
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def upload_screenshot(self):
+        """Mengunggah bukti screenshot sebelum habit dianggap selesai"""
+        file_path, _ = QFileDialog.getOpenFileName(self, "Pilih Screenshot", "", "Images (*.png *.jpg *.jpeg)")
+        if file_path:
+            habit_id = self.selected_habit_id()
+            if habit_id is not None:
+                note, ok = QInputDialog.getText(self, "Catatan", "Catatan bukti (opsional):")
+                if ok:
+                    self.log_evidence_file(habit_id, self.calendar.selectedDate().toPyDate(), file_path, note)
+            else:
+                QMessageBox.warning(self, "Error", "Pilih habit sebelum mengunggah bukti!")
+
+    @traced()
+    def log_evidence_file(self, habit_id, date, file_path, note=None):
+        """Menyimpan file bukti untuk habit di worker lalu memperbarui tampilan"""
+        def logged(log_id):
+            self.history_model.log_added(log_id)
+            self.mark_completed_days()
+            self.db_worker.submit(self.analytics_call, "record", habit_id, date)
+            self.show_habit_stats(self.habit_list.currentIndex())
+            QMessageBox.information(self, "Success", "Bukti berhasil diunggah dan habit ditandai selesai!")
+
+        self.db_worker.submit(store_and_log_evidence, habit_id, date, file_path, note, on_result=logged)
+
+    def handle_instance_message(self, message):
+        """Menjalankan perintah yang diteruskan oleh launch berikutnya (lihat ui/ipc.py)"""
+        # Exception di slot Qt menghentikan proses, jadi pesan divalidasi dulu
+        try:
+            message = check_command(message)
+        except ValueError as exc:
+            QMessageBox.warning(self, "Error", f"Perintah tidak valid: {exc}")
+            return
+        if message["command"] == "show":
+            self.show_window()
+        else:
+            date = message.get("date") or datetime.date.today().isoformat()
+            self.log_evidence_file(message["habit_id"], datetime.date.fromisoformat(date),
+                                   message["file"], message.get("note"))
+
+    @traced()
+    def show_habit_stats(self, current, previous=None):
+        """Menampilkan streak dan tingkat penyelesaian habit yang dipilih"""
+        habit_id = current.data(HABIT_ID_ROLE) if current.isValid() else None
+        if habit_id is None:
+            self.stats_label.clear()
+            return
+
+        def loaded(stats):
+            if stats is None:
+                self.stats_label.clear()
+                return
+            # Streak habit yang tidak harian dihitung per hari jadwal
+            unit = "hari" if stats["recurrence"].daily else "kali"
+            self.stats_label.setText(
+                f"Streak: {stats['current_streak']} {unit} (terpanjang {stats['longest_streak']})"
+                f" - 7 hari: {stats['rate_7']:.0%} - 30 hari: {stats['rate_30']:.0%}")
+
+        self.db_worker.submit(self.analytics_call, "stats", habit_id, on_result=loaded, key="habit-stats")
+
+    @traced()
+    def show_evidence_preview(self, current, previous=None):
+        """Memuat thumbnail bukti untuk log yang dipilih di thread worker"""
+        evidence = current.data(EVIDENCE_ROLE) if current.isValid() else None
+        if not evidence:
+            self.evidence_preview.clear()
+            return
+
+        def loaded(image):
+            if image is None:
+                self.evidence_preview.setText("Bukti tidak ditemukan")
+            else:
+                self.evidence_preview.setPixmap(QPixmap.fromImage(image))
+
+        self.db_worker.submit(load_thumbnail, evidence, on_result=loaded, key="evidence-preview")
+
+    @traced()
+    def load_completed_habits(self):
+        """Memuat ulang riwayat habit yang sudah selesai (per halaman)"""
+        self.history_model.reload()
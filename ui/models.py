@@ -0,0 +1,284 @@
+import bisect
+import logging
+from array import array
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+from database.db_manager import (
+    fetch_habits_page, fetch_habit, fetch_completed_logs_page, fetch_completed_log,
+    search_habits
+)
+
+# Id habit disimpan di model, bukan di-parse dari teks label
+HABIT_ID_ROLE = Qt.ItemDataRole.UserRole
+HABIT_NAME_ROLE = Qt.ItemDataRole.UserRole + 1
+EVIDENCE_ROLE = Qt.ItemDataRole.UserRole + 2
+
+PAGE_SIZE = 200
+
+log = logging.getLogger("habtrack.models")
+
+
+class _WorkerModel(QAbstractListModel):
+    """Dasar model yang mengambil data lewat DatabaseWorker (atau langsung jika tidak ada)"""
+
+    # Key job worker untuk halaman; job halaman lama dengan key sama dilewati
+    _page_key = None
+
+    def __init__(self, parent=None, page_size=PAGE_SIZE, worker=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.worker = worker
+        self._generation = 0
+        self._loading = False
+        self._exhausted = False
+
+    def _call(self, fn, *args, on_result, on_error=None, key=None):
+        # Hasil (dan error) dari sebelum reload() dibuang
+        generation = self._generation
+
+        def deliver(result):
+            if generation == self._generation:
+                on_result(result)
+
+        def fail(exc):
+            if generation == self._generation:
+                on_error(exc)
+
+        if self.worker is not None:
+            self.worker.submit(fn, *args, on_result=deliver, on_error=fail if on_error else None, key=key)
+        elif on_error is None:
+            deliver(fn(*args))
+        else:
+            try:
+                result = fn(*args)
+            except Exception as exc:
+                fail(exc)
+            else:
+                deliver(result)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._loading:
+            return
+        self._loading = True
+        self._call(self._page_query, *self._page_args(), on_result=self._page_loaded,
+                   on_error=self._page_failed, key=self._page_key)
+
+    def _page_loaded(self, page):
+        self._loading = False
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if page:
+            first = self.rowCount()
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self._append_page(page)
+            self.endInsertRows()
+
+    def _page_failed(self, exc):
+        # Tanpa ini model macet: canFetchMore() False selamanya
+        self._loading = False
+        log.error("%s: gagal memuat halaman: %s", type(self).__name__, exc)
+
+    def reload(self):
+        """Mengosongkan model; halaman pertama dimuat lagi oleh view"""
+        self.beginResetModel()
+        self._generation += 1
+        self._loading = False
+        self._exhausted = False
+        self._clear()
+        self.endResetModel()
+
+
+class HabitListModel(_WorkerModel):
+    """Daftar habit yang dimuat per halaman (keyset berdasarkan id)"""
+
+    _page_query = staticmethod(fetch_habits_page)
+
+    def __init__(self, parent=None, page_size=PAGE_SIZE, worker=None):
+        super().__init__(parent, page_size, worker)
+        self._ids = array("q")   # urut naik, dipakai untuk bisect
+        self._rows = []          # Habit
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        habit = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return habit.label()
+        if role == HABIT_ID_ROLE:
+            return habit.id
+        if role == HABIT_NAME_ROLE:
+            return habit.name
+        return None
+
+    def _page_args(self):
+        return (self._ids[-1] if self._ids else 0, self.page_size)
+
+    def _append_page(self, page):
+        self._ids.extend(habit.id for habit in page)
+        self._rows.extend(page)
+
+    def _clear(self):
+        self._ids, self._rows = array("q"), []
+
+    def _row_of(self, habit_id):
+        row = bisect.bisect_left(self._ids, habit_id)
+        if row < len(self._ids) and self._ids[row] == habit_id:
+            return row
+        return None
+
+    def habit_added(self, habit_id):
+        """Menambahkan satu baris; jika masih ada halaman tersisa, fetchMore yang memuatnya"""
+        if self._exhausted and not self._loading:
+            self._call(fetch_habit, habit_id, on_result=self._insert_habit)
+
+    def _insert_habit(self, habit):
+        if habit is None or self._row_of(habit.id) is not None:
+            return
+        row = bisect.bisect_left(self._ids, habit.id)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._ids.insert(row, habit.id)
+        self._rows.insert(row, habit)
+        self.endInsertRows()
+
+    def habit_updated(self, habit_id):
+        """Memperbarui satu baris yang sudah dimuat"""
+        if self._row_of(habit_id) is not None:
+            self._call(fetch_habit, habit_id,
+                       on_result=lambda habit: self._replace_habit(habit_id, habit))
+
+    def _replace_habit(self, habit_id, habit):
+        row = self._row_of(habit_id)
+        if row is None:
+            return
+        if habit is None:
+            self.habit_removed(habit_id)
+            return
+        self._rows[row] = habit
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def habit_removed(self, habit_id):
+        """Menghapus satu baris yang sudah dimuat"""
+        row = self._row_of(habit_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._ids[row]
+        del self._rows[row]
+        self.endRemoveRows()
+
+
+class HabitSearchModel(HabitListModel):
+    """Hasil pencarian habit (FTS5), urut relevansi, satu halaman saja"""
+
+    _page_query = staticmethod(search_habits)
+    _page_key = "habit-search"
+
+    def __init__(self, parent=None, page_size=PAGE_SIZE, worker=None):
+        super().__init__(parent, page_size, worker)
+        self.query = ""
+
+    def set_query(self, query):
+        self.query = query
+        self.reload()
+
+    def _page_args(self):
+        return (self.query, self.page_size)
+
+    def _page_loaded(self, page):
+        super()._page_loaded(page)
+        self._exhausted = True
+
+    def _row_of(self, habit_id):
+        # Baris urut relevansi, bukan id, jadi tidak bisa bisect
+        try:
+            return self._ids.index(habit_id)
+        except ValueError:
+            return None
+
+    def habit_added(self, habit_id):
+        """Habit baru mungkin cocok dengan query: jalankan ulang pencarian"""
+        self.reload()
+
+
+class CompletedLogModel(_WorkerModel):
+    """Riwayat log berbukti, terbaru di atas, dimuat per halaman"""
+
+    _page_query = staticmethod(fetch_completed_logs_page)
+
+    def __init__(self, parent=None, page_size=PAGE_SIZE, worker=None):
+        super().__init__(parent, page_size, worker)
+        self._rows = []    # LogEntry, id log menurun
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return entry.label()
+        if role == HABIT_ID_ROLE:
+            return entry.habit_id
+        if role == EVIDENCE_ROLE:
+            return entry.evidence
+        return None
+
+    def _page_args(self):
+        return (self._rows[-1].id if self._rows else None, self.page_size)
+
+    def _append_page(self, page):
+        self._rows.extend(page)
+
+    def _clear(self):
+        self._rows = []
+
+    def log_added(self, log_id):
+        """Menyisipkan log baru di baris teratas"""
+        if not self._rows and not self._exhausted:
+            return
+        self._call(fetch_completed_log, log_id, on_result=self._insert_log)
+
+    def _insert_log(self, log):
+        if log is None or (self._rows and self._rows[0].id >= log.id):
+            return
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._rows.insert(0, log)
+        self.endInsertRows()
+
+    def habit_updated(self, habit_id):
+        """Memperbarui nama habit pada baris log miliknya"""
+        self._call(fetch_habit, habit_id,
+                   on_result=lambda habit: self._rename_habit(habit_id, habit))
+
+    def _rename_habit(self, habit_id, habit):
+        if habit is None:
+            self.habit_removed(habit_id)
+            return
+        for row, entry in enumerate(self._rows):
+            if entry.habit_id == habit_id:
+                entry.habit_name = habit.name
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+    def habit_removed(self, habit_id):
+        """Menghapus baris log milik habit yang dihapus (ikut cascade di database)"""
+        row = len(self._rows) - 1
+        while row >= 0:
+            if self._rows[row].habit_id != habit_id:
+                row -= 1
+                continue
+            # Hapus blok baris berurutan sekaligus
+            last = row
+            while row > 0 and self._rows[row - 1].habit_id == habit_id:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row, last)
+            del self._rows[row:last + 1]
+            self.endRemoveRows()
+            row -= 1
@@ -0,0 +1,113 @@
+import importlib.util
+import logging
+import threading
+import time
+from collections import deque
+from PyQt6.QtWidgets import QMessageBox, QSystemTrayIcon
+from PyQt6.QtCore import Qt, QObject, QTimer, pyqtSignal
+from utils.notify import REMINDER_TITLE, PlyerNotifier, reminder_text
+from utils.tracing import tracer, percentile
+
+log = logging.getLogger("habtrack.notifications")
+
+# Jarak minimal antar notifikasi; reminder di antaranya digabung ke notifikasi berikutnya
+MIN_INTERVAL = 5.0
+# Lama tampil pesan tray (ms)
+MESSAGE_DURATION = 10000
+# Jumlah sampel latensi yang disimpan
+MAX_LATENCIES = 500
+
+
+class NotificationDispatcher(QObject):
+    """Mengantrekan reminder dan mengirimnya sebagai satu notifikasi non-modal
+
+    Semua reminder yang masuk sebelum antrean di-flush (tick yang sama,
+    atau selama jeda rate limit) digabung menjadi satu pesan. Backend:
+    pesan tray jika tersedia, lalu toast plyer (di thread terpisah agar
+    event loop tidak tertahan), lalu QMessageBox non-modal. Latensi dari
+    waktu terjadwal sampai notifikasi dikirim dicatat per reminder.
+    """
+
+    # Dipancarkan saat pengguna mengklik notifikasi (hanya backend tray/dialog)
+    activated = pyqtSignal()
+
+    def __init__(self, parent=None, min_interval=MIN_INTERVAL, clock=time.time):
+        super().__init__(parent)
+        self.min_interval = min_interval
+        self.clock = clock
+        self.tray_icon = None
+        self._pending = []      # (habit_id, name, fire_at)
+        self._last_sent = None
+        self._plyer = None
+        self.latencies = deque(maxlen=MAX_LATENCIES)
+        self.sent = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+
+    def set_tray_icon(self, tray_icon):
+        self.tray_icon = tray_icon
+        tray_icon.messageClicked.connect(self.activated)
+
+    def enqueue(self, due):
+        """Menambahkan (habit_id, name, fire_at) ke antrean; tidak pernah memblokir"""
+        if not due:
+            return
+        self._pending.extend(due)
+        if self.timer.isActive():
+            return
+        wait = 0.0
+        if self._last_sent is not None:
+            wait = max(0.0, self._last_sent + self.min_interval - self.clock())
+        # Timer 0 ms tetap menunggu event loop, sehingga reminder pada tick yang sama ikut tergabung
+        self.timer.start(int(wait * 1000))
+
+    def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        # Habit yang sama (mis. terlewat saat sleep lalu dijadwal ulang) cukup disebut sekali
+        names = list(dict.fromkeys(name for _, name, _ in pending))
+        self._deliver(REMINDER_TITLE, reminder_text(names))
+
+        now = self.clock()
+        self._last_sent = now
+        self.sent += 1
+        for _, name, fire_at in pending:
+            latency = max(0.0, now - fire_at)
+            self.latencies.append(latency)
+            tracer.record("notification", "latency", latency, habit=name)
+
+    def _deliver(self, title, message):
+        if self.tray_icon is not None and self.tray_icon.isVisible() and QSystemTrayIcon.supportsMessages():
+            self.tray_icon.showMessage(title, message, QSystemTrayIcon.MessageIcon.Information, MESSAGE_DURATION)
+        elif importlib.util.find_spec("plyer") is not None:
+            if self._plyer is None:
+                self._plyer = PlyerNotifier()
+            threading.Thread(target=self._notify_plyer, args=(title, message), daemon=True).start()
+        else:
+            self._show_dialog(title, message)
+
+    def _notify_plyer(self, title, message):
+        try:
+            self._plyer.notify(title, message)
+        except Exception:
+            log.exception("notifikasi plyer gagal")
+
+    def _show_dialog(self, title, message):
+        box = QMessageBox(QMessageBox.Icon.Information, title, message,
+                          QMessageBox.StandardButton.Ok, parent=self.parent())
+        box.setWindowModality(Qt.WindowModality.NonModal)
+        box.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        box.accepted.connect(self.activated)
+        box.show()
+
+    def latency_stats(self):
+        """Latensi pengiriman (detik) dari waktu terjadwal: p50, p95, maksimum"""
+        values = sorted(self.latencies)
+        return {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "max": values[-1] if values else None,
+        }
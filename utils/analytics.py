@@ -0,0 +1,225 @@
+import datetime
+import itertools
+import numpy as np
+from database.db_manager import iter_completion_days, fetch_habits, to_day
+from utils.recurrence import DAILY, EPOCH_WEEKDAY
+
+ROLLING_WINDOWS = (7, 30)
+
+
+def _mask_array(mask, length):
+    """Bitmask integer dari Recurrence.mask (bit i = kolom i) menjadi array bool"""
+    raw = np.frombuffer(mask.to_bytes((length + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:length].astype(bool)
+
+def _window_sums(values, window):
+    """Jumlah `window` kolom yang berakhir di setiap kolom, mulai kolom ke-`window`"""
+    cumulative = np.zeros((values.shape[0], values.shape[1] + 1), dtype=np.int64)
+    np.cumsum(values, axis=1, out=cumulative[:, 1:])
+    return cumulative[:, window + 1:] - cumulative[:, 1:-window]
+
+def _rates(done, due, quota, window):
+    """done / jumlah hari wajib; habit bertarget dibandingkan dengan target per minggunya"""
+    target = np.where(quota[:, None] > 0, quota[:, None] * window / 7, due)
+    return np.minimum(1.0, np.divide(done, target, out=np.zeros(done.shape), where=target > 0))
+
+
+class HabitAnalytics:
+    """Statistik streak dan tingkat penyelesaian dari bitmap habit x hari
+
+    Bitmap bertipe bool; kolom 0 adalah `start_day`. Hari jadwal tiap habit
+    dibentuk dari Recurrence-nya (satu ekspansi per aturan yang berbeda):
+    streak dan tingkat penyelesaian hanya menghitung hari jadwal, dan hari
+    di luar jadwal tidak memutus streak. Habit bertarget per minggu putus
+    streak-nya di akhir minggu yang kurang dari target. Hasil per habit
+    disimpan di array cache dan hanya baris habit yang berubah dihitung
+    ulang saat ada log baru (record). Semua akses sebaiknya dari satu
+    thread (DatabaseWorker).
+    """
+
+    def __init__(self, today=None):
+        self._today_override = today
+        self.habit_rows = {}        # habit_id -> indeks baris
+        self.row_recurrences = []   # indeks baris -> Recurrence
+        self.start_day = 0
+        self.bits = np.zeros((0, 0), dtype=bool)
+        self._results = None
+        self._results_today = None
+
+    def today(self):
+        if self._today_override is not None:
+            return self._today_override
+        return to_day(datetime.date.today())
+
+    def load(self):
+        """Membangun bitmap dari seluruh habit_log (dijalankan di worker)"""
+        habits = fetch_habits()
+        habit_ids = [habit.id for habit in habits]
+        pairs = np.fromiter(itertools.chain.from_iterable(iter_completion_days()), dtype=np.int64)
+        pairs = pairs.reshape(-1, 2)
+        self.habit_rows = {habit_id: row for row, habit_id in enumerate(habit_ids)}
+        self.row_recurrences = [habit.recurrence for habit in habits]
+
+        today = self.today()
+        if len(pairs):
+            self.start_day = int(min(pairs[:, 1].min(), today))
+            end_day = int(max(pairs[:, 1].max(), today))
+        else:
+            self.start_day = end_day = today
+        self.bits = np.zeros((len(habit_ids), end_day - self.start_day + 1), dtype=bool)
+
+        if len(pairs):
+            # Pemetaan id habit -> baris lewat tabel lookup, tanpa loop Python
+            size = int(max(max(habit_ids, default=0), pairs[:, 0].max())) + 1
+            lookup = np.full(size, -1, dtype=np.int64)
+            lookup[habit_ids] = np.arange(len(habit_ids))
+            rows = lookup[pairs[:, 0]]
+            valid = rows >= 0
+            self.bits[rows[valid], pairs[valid, 1] - self.start_day] = True
+        self._results = None
+        return len(pairs)
+
+    def _ensure_columns(self, day):
+        if day < self.start_day:
+            extra = self.start_day - day
+            self.bits = np.pad(self.bits, ((0, 0), (extra, 0)))
+            self.start_day = day
+            self._results = None
+        elif day - self.start_day >= self.bits.shape[1]:
+            # Tumbuh dua kali lipat agar penambahan hari tidak selalu menyalin
+            needed = day - self.start_day + 1
+            width = max(needed, self.bits.shape[1] * 2)
+            self.bits = np.pad(self.bits, ((0, 0), (0, width - self.bits.shape[1])))
+
+    def _row_for(self, habit_id):
+        row = self.habit_rows.get(habit_id)
+        if row is None:
+            row = self.habit_rows[habit_id] = self.bits.shape[0]
+            self.bits = np.vstack([self.bits, np.zeros((1, self.bits.shape[1]), dtype=bool)])
+            self.row_recurrences.append(DAILY)
+            if self._results is not None:
+                for name, values in self._results.items():
+                    self._results[name] = np.concatenate([values, np.zeros((1,) + values.shape[1:], values.dtype)])
+        return row
+
+    def _refresh_row(self, row):
+        if self._results is not None and self._results_today == self.today():
+            for name, values in self._compute(slice(row, row + 1)).items():
+                self._results[name][row] = values[0]
+
+    def record(self, habit_id, day):
+        """Menandai habit selesai pada hari tersebut dan memperbarui cache barisnya"""
+        day = to_day(day)
+        self._ensure_columns(max(day, self.today()))
+        row = self._row_for(habit_id)
+        self.bits[row, day - self.start_day] = True
+        self._refresh_row(row)
+
+    def set_recurrence(self, habit_id, recurrence):
+        """Mengganti aturan jadwal satu habit (baru atau diedit) dan menghitung ulang barisnya"""
+        row = self._row_for(habit_id)
+        self.row_recurrences[row] = recurrence
+        self._refresh_row(row)
+
+    def remove_habit(self, habit_id):
+        """Mengosongkan baris habit yang dihapus"""
+        row = self.habit_rows.pop(habit_id, None)
+        if row is not None:
+            self.bits[row] = False
+
+    def _schedule(self, rows, first_day, last_day):
+        """(hari jadwal bool habit x hari untuk first_day..last_day, target per minggu; 0 = tanpa target)"""
+        recurrences = self.row_recurrences[rows]
+        length = last_day - first_day + 1
+        scheduled = np.zeros((len(recurrences), length), dtype=bool)
+        expanded = {}
+        for index, recurrence in enumerate(recurrences):
+            days = expanded.get(recurrence)
+            if days is None:
+                days = expanded[recurrence] = _mask_array(recurrence.mask(first_day, last_day), length)
+            scheduled[index] = days
+        quota = np.array([recurrence.per_week or 0 for recurrence in recurrences], dtype=np.int64)
+        return scheduled, quota
+
+    def _compute(self, rows):
+        """Menghitung semua statistik untuk potongan baris bitmap"""
+        today = self.today()
+        today_col = today - self.start_day
+        history = self.bits[rows, :today_col + 1]
+        width = history.shape[1]
+        # Jadwal dimulai `pad` hari sebelum kolom 0 agar jendela rate selalu penuh
+        pad = max(ROLLING_WINDOWS)
+        padded, quota = self._schedule(rows, self.start_day - pad, today)
+        scheduled = padded[:, pad:]
+        flexible = quota > 0
+        done = history & scheduled
+        counts = np.zeros((len(history), width + 1), dtype=np.int64)
+        np.cumsum(done, axis=1, out=counts[:, 1:])
+
+        # Pemutus streak: hari wajib yang terlewat (hari ini belum dihitung) dan,
+        # untuk habit bertarget, minggu penuh yang sudah lewat dan kurang dari target
+        breaks = scheduled & ~history & ~flexible[:, None]
+        breaks[:, today_col] = False
+        columns = np.arange(width)
+        weekdays = (self.start_day + columns + EPOCH_WEEKDAY) % 7
+        sundays = columns[(weekdays == 6) & (columns >= 6) & (columns < today_col)]
+        if flexible.any() and len(sundays):
+            week_done = counts[:, sundays + 1] - counts[:, sundays - 6]
+            breaks[:, sundays] |= flexible[:, None] & (week_done < quota[:, None])
+
+        # Panjang run = hari jadwal selesai sejak pemutus terakhir (counts tidak menurun)
+        runs = counts[:, 1:] - np.maximum.accumulate(np.where(breaks, counts[:, 1:], 0), axis=1)
+        results = {
+            "current_streak": runs[:, today_col],
+            "longest_streak": runs.max(axis=1),
+        }
+        for window in ROLLING_WINDOWS:
+            recent_done = done[:, max(0, width - window):].sum(axis=1)
+            recent_due = padded[:, pad + width - window:].sum(axis=1)
+            results[f"rate_{window}"] = _rates(recent_done[:, None], recent_due[:, None], quota, window)[:, 0]
+
+        # Tingkat keberhasilan per hari (Senin..Minggu) di hari jadwal sejak log pertama
+        has_log = history.any(axis=1)
+        first_col = np.where(has_log, np.argmax(history, axis=1), width)
+        active = (columns[None, :] >= first_col[:, None]) & scheduled
+        weekday_rates = np.zeros((len(history), 7))
+        for weekday in range(7):
+            mask = active & (weekdays == weekday)[None, :]
+            total = mask.sum(axis=1)
+            weekday_rates[:, weekday] = np.divide((history & mask).sum(axis=1), total,
+                                                  out=np.zeros(len(history)), where=total > 0)
+        results["weekday_rates"] = weekday_rates
+        return results
+
+    def results(self):
+        """Semua statistik untuk semua habit (di-cache sampai tanggal berganti)"""
+        today = self.today()
+        if self._results is None or self._results_today != today:
+            self._ensure_columns(today)
+            self._results = self._compute(slice(None))
+            self._results_today = today
+        return self._results
+
+    def rolling_rates(self, window):
+        """Deret tingkat penyelesaian bergulir (habit x hari) sampai hari ini"""
+        today = self.today()
+        history = self.bits[:, :today - self.start_day + 1]
+        padded, quota = self._schedule(slice(None), self.start_day - window, today)
+        done = np.zeros(padded.shape, dtype=bool)
+        done[:, window:] = history & padded[:, window:]
+        return _rates(_window_sums(done, window), _window_sums(padded, window), quota, window)
+
+    def stats(self, habit_id):
+        """Ringkasan statistik satu habit sebagai dict, atau None"""
+        results = self.results()
+        row = self.habit_rows.get(habit_id)
+        if row is None:
+            return None
+        stats = {name: values[row] for name, values in results.items()}
+        stats["current_streak"] = int(stats["current_streak"])
+        stats["longest_streak"] = int(stats["longest_streak"])
+        for window in ROLLING_WINDOWS:
+            stats[f"rate_{window}"] = float(stats[f"rate_{window}"])
+        stats["weekday_rates"] = stats["weekday_rates"].tolist()
+        stats["recurrence"] = self.row_recurrences[row]
+        return stats
@@ -0,0 +1,104 @@
+import logging
+import time
+from database.db_manager import (
+    init_db, close_db, use_db_file, use_profile, fetch_reminders, fetch_schedule_version, fetch_data_version
+)
+from utils.scheduler import ReminderScheduler
+from utils.notify import NOTIFIERS, REMINDER_TITLE, get_notifier, reminder_text
+from utils.instance import SingleInstance
+
+log = logging.getLogger("habtrack.daemon")
+
+# Batas tidur: perubahan habit dan sleep/perubahan jam terdeteksi paling lambat selama ini
+POLL_INTERVAL = 60
+
+
+class ReminderDaemon:
+    """Daemon reminder tanpa Qt: tidur sampai reminder berikutnya lalu mengirim notifikasi
+
+    Perubahan habit dideteksi tanpa membaca ulang tabel: PRAGMA data_version
+    hanya berubah jika proses lain melakukan commit, dan baru setelah itu
+    satu baris schedule_version dibaca. Jadwal dimuat ulang hanya jika
+    versinya berbeda.
+    """
+
+    def __init__(self, notifier, poll_interval=POLL_INTERVAL, clock=time.time, sleep=time.sleep):
+        self.notifier = notifier
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.sleep = sleep
+        self.scheduler = ReminderScheduler(clock)
+        self._data_version = None
+        self._schedule_version = None
+
+    def reload(self):
+        """Membangun ulang jadwal dari tabel habits"""
+        self._data_version = fetch_data_version()
+        self._schedule_version = fetch_schedule_version()
+        self.scheduler.rebuild(fetch_reminders())
+        log.info("jadwal dimuat: %d habit (versi %d)", len(self.scheduler), self._schedule_version)
+
+    def check_changes(self):
+        """Memuat ulang jadwal jika habits berubah sejak reload terakhir"""
+        data_version = fetch_data_version()
+        if data_version == self._data_version:
+            return False
+        self._data_version = data_version
+        if fetch_schedule_version() == self._schedule_version:
+            return False
+        self.reload()
+        return True
+
+    def fire_due(self):
+        """Mengirim satu notifikasi gabungan untuk semua reminder yang jatuh tempo"""
+        due = self.scheduler.pop_due()
+        if due:
+            names = [habit_name for _, habit_name, _ in due]
+            try:
+                self.notifier.notify(REMINDER_TITLE, reminder_text(names))
+            except Exception:
+                log.exception("notifikasi gagal untuk %s", ", ".join(names))
+        return len(due)
+
+    def run_once(self):
+        """Satu putaran: cek perubahan, kirim yang jatuh tempo, kembalikan lama tidur"""
+        self.check_changes()
+        self.fire_due()
+        delay = self.scheduler.seconds_until_next()
+        return self.poll_interval if delay is None else min(delay, self.poll_interval)
+
+    def run(self):
+        self.reload()
+        while True:
+            self.sleep(self.run_once())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Daemon reminder habtrack (tanpa GUI)")
+    parser.add_argument("--notifier", choices=sorted(NOTIFIERS), default="plyer")
+    parser.add_argument("--db", help="file database (default: data/habits.db)")
+    parser.add_argument("--profile", help="profil yang reminder-nya dijalankan")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(name)s %(message)s")
+    if args.db:
+        use_db_file(args.db)
+    elif args.profile:
+        use_profile(args.profile)
+    # Satu daemon per database; objek disimpan agar lock tetap dipegang
+    # sampai proses berhenti (dilepas otomatis oleh OS)
+    instance = SingleInstance("daemon")
+    if not instance.acquire():
+        parser.exit(message="Daemon reminder sudah berjalan untuk database ini\n")
+    init_db()
+    try:
+        ReminderDaemon(get_notifier(args.notifier), args.poll_interval).run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_db()
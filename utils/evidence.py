@@ -0,0 +1,117 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from database import db_manager
+from utils.paths import db_file, evidence_dir
+
+EVIDENCE_DIR = evidence_dir(db_file())
+
+CHUNK_SIZE = 1024 * 1024
+THUMBNAIL_SIZE = 128
+
+
+class EvidenceStore:
+    """Penyimpanan bukti berbasis hash SHA-256 dengan cache thumbnail
+
+    File disimpan di objects/<2 karakter hash>/<hash><ext>, sehingga
+    screenshot yang sama hanya disimpan sekali. Thumbnail dibuat saat
+    pertama diminta, disimpan di thumbs/<ukuran>/ dan di LRU memori.
+    """
+
+    def __init__(self, root=EVIDENCE_DIR, memory_limit=32 * 1024 * 1024):
+        self.root = root
+        self.memory_limit = memory_limit
+        self._cache = OrderedDict()   # (key, size) -> QImage
+        self._cache_bytes = 0
+        self._lock = threading.Lock()
+
+    def add(self, source_path):
+        """Menyalin file ke store sambil di-hash, mengembalikan key relatifnya"""
+        objects = os.path.join(self.root, "objects")
+        os.makedirs(objects, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=objects, suffix=".tmp")
+        try:
+            with open(source_path, "rb") as src, os.fdopen(fd, "wb") as dst:
+                for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    dst.write(chunk)
+            name = digest.hexdigest()
+            ext = os.path.splitext(source_path)[1].lower()
+            key = f"{name[:2]}/{name}{ext}"
+            target = self.path_for(key)
+            if os.path.exists(target):
+                os.remove(tmp_path)   # Duplikat: pakai file yang sudah ada
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return key
+
+    def path_for(self, key):
+        """Path file untuk key; bukti lama yang berupa path absolut dikembalikan apa adanya"""
+        if os.path.isabs(key):
+            return key
+        return os.path.join(self.root, "objects", *key.split("/"))
+
+    def _thumbnail_path(self, key, size):
+        if os.path.isabs(key):
+            # Bukti lama: nama thumbnail diturunkan dari path aslinya
+            name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        else:
+            name = os.path.splitext(key.split("/")[-1])[0]
+        return os.path.join(self.root, "thumbs", str(size), f"{name}.png")
+
+    def thumbnail(self, key, size=THUMBNAIL_SIZE):
+        """QImage thumbnail (maks size x size), atau None jika file tidak bisa dibaca
+
+        QImage aman dipakai di luar thread GUI, jadi fungsi ini bisa
+        dijalankan di DatabaseWorker.
+        """
+        from PyQt6.QtCore import QSize, Qt
+        from PyQt6.QtGui import QImage, QImageReader
+
+        with self._lock:
+            image = self._cache.get((key, size))
+            if image is not None:
+                self._cache.move_to_end((key, size))
+                return image
+
+        thumb_path = self._thumbnail_path(key, size)
+        image = QImage(thumb_path) if os.path.exists(thumb_path) else QImage()
+        if image.isNull():
+            reader = QImageReader(self.path_for(key))
+            reader.setAutoTransform(True)
+            original = reader.size()
+            if original.isValid() and (original.width() > size or original.height() > size):
+                # Decoder (misalnya JPEG) bisa langsung membaca versi kecil
+                reader.setScaledSize(original.scaled(QSize(size, size), Qt.AspectRatioMode.KeepAspectRatio))
+            image = reader.read()
+            if image.isNull():
+                return None
+            os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+            image.save(thumb_path, "PNG")
+
+        with self._lock:
+            self._cache[(key, size)] = image
+            self._cache_bytes += image.sizeInBytes()
+            while self._cache_bytes > self.memory_limit and len(self._cache) > 1:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted.sizeInBytes()
+        return image
+
+
+_store = None
+
+def get_store():
+    """EvidenceStore bersama untuk folder evidence di samping database (profil) aktif"""
+    global _store
+    root = evidence_dir(db_manager.DB_FILE)
+    if _store is None or _store.root != root:
+        _store = EvidenceStore(root)
+    return _store
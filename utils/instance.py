@@ -0,0 +1,135 @@
+import datetime
+import hashlib
+import json
+import os
+import socket
+import sys
+import tempfile
+from database import db_manager
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+# Batas waktu menunggu balasan instance yang sudah berjalan
+SEND_TIMEOUT = 2.0
+
+
+def encode_message(message):
+    """Pesan IPC: satu objek JSON per baris"""
+    return json.dumps(message).encode("utf-8") + b"\n"
+
+def decode_message(line):
+    message = json.loads(line.decode("utf-8"))
+    if not isinstance(message, dict):
+        raise ValueError("Pesan IPC harus berupa objek JSON")
+    return message
+
+def check_command(message):
+    """Memvalidasi field perintah IPC; ValueError jika ada yang tidak valid"""
+    command = message.get("command")
+    if command == "show":
+        return message
+    if command != "log-evidence":
+        raise ValueError(f"Perintah tidak dikenal: {command!r}")
+    habit_id = message.get("habit_id")
+    if isinstance(habit_id, bool) or not isinstance(habit_id, int):
+        raise ValueError("habit_id harus berupa bilangan bulat")
+    if not isinstance(message.get("file"), str) or not message["file"]:
+        raise ValueError("file harus berupa path")
+    date = message.get("date")
+    if date is not None:
+        try:
+            datetime.date.fromisoformat(date)
+        except (TypeError, ValueError):
+            raise ValueError(f"date tidak valid: {date!r} (format yyyy-MM-dd)") from None
+    if message.get("note") is not None and not isinstance(message["note"], str):
+        raise ValueError("note harus berupa string")
+    return message
+
+
+class SingleInstance:
+    """Lock file + nama socket lokal untuk satu instance per database
+
+    Lock dipegang (flock/msvcrt) selama proses hidup dan dilepas otomatis
+    oleh OS jika proses mati, sehingga tidak ada lock basi. Instance kedua
+    cukup mengirim pesannya lewat send() tanpa mengimpor Qt; sisi server
+    ada di ui/ipc.py (QLocalServer).
+    """
+
+    def __init__(self, kind="app", db_file=None):
+        db_file = os.path.abspath(db_file or db_manager.DB_FILE)
+        digest = hashlib.sha1(db_file.encode("utf-8")).hexdigest()[:12]
+        self.kind = kind
+        self.lock_path = f"{db_file}.{kind}.lock"
+        self.server_name = f"habtrack-{kind}-{digest}"
+        self._lock_file = None
+
+    @property
+    def socket_path(self):
+        """Path Unix domain socket, atau named pipe di Windows"""
+        if sys.platform == "win32":
+            return rf"\\.\pipe\{self.server_name}"
+        return os.path.join(tempfile.gettempdir(), f"{self.server_name}.sock")
+
+    def acquire(self):
+        """Mengambil lock tanpa menunggu; False jika instance lain sudah berjalan"""
+        os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+        lock_file = open(self.lock_path, "a+")
+        # Byte yang dikunci (msvcrt) selalu byte pertama, sama seperti di is_held()
+        lock_file.seek(0)
+        try:
+            if sys.platform == "win32":
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._lock_file = lock_file
+        return True
+
+    def is_held(self):
+        """True jika proses lain sedang memegang lock ini; lock tidak diambil"""
+        if self._lock_file is not None:
+            return False
+        try:
+            probe = open(self.lock_path, "rb")
+        except FileNotFoundError:
+            return False
+        with probe:
+            try:
+                if sys.platform == "win32":
+                    msvcrt.locking(probe.fileno(), msvcrt.LK_NBRLCK, 1)
+                    msvcrt.locking(probe.fileno(), msvcrt.LK_UNLCK, 1)
+                else:
+                    fcntl.flock(probe.fileno(), fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except OSError:
+                return True
+        return False
+
+    def release(self):
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def send(self, message, timeout=SEND_TIMEOUT):
+        """Mengirim pesan ke instance yang berjalan, mengembalikan balasannya (atau None)"""
+        try:
+            if sys.platform == "win32":
+                with open(self.socket_path, "r+b", buffering=0) as pipe:
+                    pipe.write(encode_message(message))
+                    return decode_message(pipe.readline())
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(self.socket_path)
+                sock.sendall(encode_message(message))
+                with sock.makefile("rb") as reader:
+                    return decode_message(reader.readline())
+        except (OSError, ValueError):
+            return None
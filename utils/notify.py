@@ -0,0 +1,56 @@
+import datetime
+import sys
+
+APP_NAME = "Habit Tracker"
+REMINDER_TITLE = "Habit Reminder"
+
+# Jumlah nama habit yang ditulis dalam satu notifikasi gabungan
+MAX_NAMES = 3
+
+
+def reminder_text(names):
+    """Satu pesan untuk semua reminder yang jatuh tempo bersamaan"""
+    text = ", ".join(names[:MAX_NAMES])
+    if len(names) > MAX_NAMES:
+        text += f" dan {len(names) - MAX_NAMES} lainnya"
+    return f"Saatnya untuk: {text}"
+
+
+class LogNotifier:
+    """Menulis notifikasi sebagai baris teks (untuk tes dan server tanpa desktop)"""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def notify(self, title, message):
+        stream = self.stream or sys.stdout
+        timestamp = datetime.datetime.now().isoformat(timespec="seconds")
+        print(f"[{timestamp}] {title}: {message}", file=stream, flush=True)
+
+
+class PlyerNotifier:
+    """Notifikasi desktop lewat plyer (diimpor saat notifikasi pertama)"""
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self._notification = None
+
+    def notify(self, title, message):
+        if self._notification is None:
+            from plyer import notification
+            self._notification = notification
+        self._notification.notify(title=title, message=message, app_name=APP_NAME, timeout=self.timeout)
+
+
+# Backend dipilih lewat nama, misalnya `python -m utils.daemon --notifier log`
+NOTIFIERS = {
+    "log": LogNotifier,
+    "plyer": PlyerNotifier,
+}
+
+def get_notifier(name="plyer"):
+    """Membuat backend notifikasi berdasarkan nama"""
+    try:
+        return NOTIFIERS[name]()
+    except KeyError:
+        raise ValueError(f"Backend notifikasi tidak dikenal: {name}") from None
@@ -0,0 +1,61 @@
+import os
+import re
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Folder data dan profil aktif bisa diatur lewat environment (misalnya folder bersama tim)
+DATA_ENV = "HABTRACK_DATA"
+PROFILE_ENV = "HABTRACK_PROFILE"
+
+DEFAULT_PROFILE = "default"
+DB_NAME = "habits.db"
+PROFILE_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+
+def data_dir():
+    """Folder data utama (default: data/ di root proyek)"""
+    return os.path.abspath(os.environ.get(DATA_ENV) or os.path.join(ROOT_DIR, "data"))
+
+def profiles_dir():
+    return os.path.join(data_dir(), "profiles")
+
+def default_profile():
+    """Profil yang dipakai jika tidak dipilih lewat --profile"""
+    return os.environ.get(PROFILE_ENV) or DEFAULT_PROFILE
+
+def check_profile(profile):
+    """Nama profil dipakai sebagai nama folder: hanya huruf, angka, titik, _ dan -"""
+    if not PROFILE_NAME.match(profile):
+        raise ValueError(f"Nama profil tidak valid: {profile!r}")
+    return profile
+
+def profile_dir(profile=None):
+    """Folder shard satu profil
+
+    Profil default memakai data/ langsung sehingga instalasi lama
+    (data/habits.db, data/evidence) tetap terbaca tanpa dipindah.
+    """
+    profile = check_profile(profile or default_profile())
+    if profile == DEFAULT_PROFILE:
+        return data_dir()
+    return os.path.join(profiles_dir(), profile)
+
+def db_file(profile=None):
+    """File database (shard) satu profil"""
+    return os.path.join(profile_dir(profile), DB_NAME)
+
+def evidence_dir(db_path):
+    """Folder bukti milik sebuah shard, di samping file database-nya"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "evidence")
+
+def list_profiles():
+    """Profil yang sudah punya database, default lebih dulu"""
+    profiles = []
+    if os.path.exists(db_file(DEFAULT_PROFILE)):
+        profiles.append(DEFAULT_PROFILE)
+    if os.path.isdir(profiles_dir()):
+        for name in sorted(os.listdir(profiles_dir())):
+            if (name != DEFAULT_PROFILE and PROFILE_NAME.match(name)
+                    and os.path.exists(os.path.join(profiles_dir(), name, DB_NAME))):
+                profiles.append(name)
+    return profiles
@@ -0,0 +1,165 @@
+import functools
+import math
+
+# 1970-01-01 adalah hari Kamis; (day + 3) % 7 menghasilkan Senin = 0
+EPOCH_WEEKDAY = 3
+
+ALL_WEEKDAYS = 0b1111111
+WEEKDAY_NAMES = ("Sen", "Sel", "Rab", "Kam", "Jum", "Sab", "Min")
+
+# Kolom aturan di tabel habits, urutan sama dengan Recurrence.columns()
+RECURRENCE_COLUMNS = ("weekdays", "every_days", "per_week", "start_day", "end_day")
+
+
+def weekday(day):
+    """Hari dalam minggu dari nomor hari (Senin = 0 ... Minggu = 6)"""
+    return (day + EPOCH_WEEKDAY) % 7
+
+def _repunit(period, count):
+    # Bit 0, period, 2*period, ... : dikalikan pola satu periode menghasilkan pola berulang
+    return ((1 << (period * count)) - 1) // ((1 << period) - 1)
+
+@functools.lru_cache(maxsize=512)
+def _pattern(weekdays, every_days, anchor_weekday):
+    """Bitmask satu periode lcm(7, every_days) hari, bit 0 = hari anchor"""
+    period = math.lcm(7, every_days)
+    pattern = 0
+    for offset in range(0, period, every_days):
+        if weekdays >> ((anchor_weekday + offset) % 7) & 1:
+            pattern |= 1 << offset
+    return period, pattern
+
+def due_sql(habit, day):
+    """Ekspresi SQL (0/1) setara Recurrence.is_due untuk baris habits `habit` pada hari `day`
+
+    Dipakai trigger rollup daily_completion; harus tetap sejalan dengan
+    Recurrence.occurs dan Recurrence.fixed.
+    """
+    return (f"({habit}.per_week IS NULL"
+            f" AND (({habit}.weekdays >> (((({day}) + {EPOCH_WEEKDAY}) % 7 + 7) % 7)) & 1) = 1"
+            f" AND (({day}) - COALESCE({habit}.start_day, 0)) % {habit}.every_days = 0"
+            f" AND ({day}) >= COALESCE({habit}.start_day, ({day}))"
+            f" AND ({day}) <= COALESCE({habit}.end_day, ({day})))")
+
+
+class Recurrence:
+    """Aturan jadwal satu habit, dikompilasi menjadi pola bit hari
+
+    Hari jadwal adalah hari dalam `weekdays` (bit 0 = Senin) yang jaraknya
+    dari anchor (start_day, atau 1970-01-01) kelipatan `every_days`, di
+    antara start_day dan end_day. Dengan `per_week` habit cukup selesai
+    sekian kali per minggu (Senin-Minggu) di hari-hari jadwal tersebut;
+    habit seperti ini tidak punya hari wajib, sehingga is_due selalu False.
+    Pola satu periode dihitung sekali (di-cache per aturan), lalu rentang
+    berapa pun dibentuk dengan operasi integer tanpa loop per hari.
+    """
+
+    __slots__ = ("weekdays", "every_days", "per_week", "start_day", "end_day",
+                 "_anchor", "_period", "_pattern")
+
+    def __init__(self, weekdays=ALL_WEEKDAYS, every_days=1, per_week=None, start_day=None, end_day=None):
+        if not 0 < weekdays <= ALL_WEEKDAYS:
+            raise ValueError("Minimal satu hari dalam seminggu harus dipilih")
+        if every_days < 1:
+            raise ValueError("Interval hari minimal 1")
+        if per_week is not None and not 1 <= per_week <= 7:
+            raise ValueError("Target per minggu harus 1-7")
+        if start_day is not None and end_day is not None and end_day < start_day:
+            raise ValueError("Tanggal selesai sebelum tanggal mulai")
+        self.weekdays = weekdays
+        self.every_days = every_days
+        self.per_week = per_week
+        self.start_day = start_day
+        self.end_day = end_day
+        self._anchor = start_day or 0
+        self._period, self._pattern = _pattern(weekdays, every_days, weekday(self._anchor))
+
+    @classmethod
+    @functools.lru_cache(maxsize=1024)
+    def from_columns(cls, weekdays, every_days, per_week, start_day, end_day):
+        """Dari kolom aturan tabel habits; aturan yang sama memakai satu objek bersama"""
+        return cls(weekdays, every_days, per_week, start_day, end_day)
+
+    def columns(self):
+        return self.weekdays, self.every_days, self.per_week, self.start_day, self.end_day
+
+    @property
+    def fixed(self):
+        """True jika setiap hari jadwal wajib diselesaikan (bukan target per minggu)"""
+        return self.per_week is None
+
+    @property
+    def daily(self):
+        return self.columns() == (ALL_WEEKDAYS, 1, None, None, None)
+
+    def occurs(self, day):
+        """Apakah hari tersebut hari jadwal, O(1)"""
+        return ((self.start_day is None or day >= self.start_day)
+                and (self.end_day is None or day <= self.end_day)
+                and self.weekdays >> weekday(day) & 1 == 1
+                and (day - self._anchor) % self.every_days == 0)
+
+    def is_due(self, day):
+        """Apakah habit wajib diselesaikan pada hari tersebut, O(1)"""
+        return self.per_week is None and self.occurs(day)
+
+    def mask(self, start, end):
+        """Bitmask hari jadwal dalam start..end (bit i = hari start + i)"""
+        first = start if self.start_day is None else max(start, self.start_day)
+        last = end if self.end_day is None else min(end, self.end_day)
+        if first > last:
+            return 0
+        length = last - first + 1
+        phase = (first - self._anchor) % self._period
+        count = (phase + length) // self._period + 1
+        bits = (self._pattern * _repunit(self._period, count)) >> phase
+        return (bits & ((1 << length) - 1)) << (first - start)
+
+    def due_mask(self, start, end):
+        """Seperti mask, tetapi kosong untuk habit bertarget per minggu"""
+        return self.mask(start, end) if self.per_week is None else 0
+
+    def days(self, start, end):
+        """Daftar nomor hari jadwal dalam start..end"""
+        mask = self.mask(start, end)
+        days = []
+        while mask:
+            low = mask & -mask
+            days.append(start + low.bit_length() - 1)
+            mask ^= low
+        return days
+
+    def next_occurrence(self, day):
+        """Hari jadwal pertama pada/setelah `day`, atau None jika jadwal sudah berakhir"""
+        if self.start_day is not None:
+            day = max(day, self.start_day)
+        mask = self.mask(day, day + self._period - 1)
+        if not mask:
+            return None
+        return day + (mask & -mask).bit_length() - 1
+
+    def label(self):
+        """Teks singkat aturan, misalnya 'Sen, Rab, Jum' atau '3x/minggu'"""
+        if self.weekdays == ALL_WEEKDAYS and self.every_days == 1:
+            parts = [] if self.per_week is not None else ["setiap hari"]
+        elif self.weekdays == ALL_WEEKDAYS:
+            parts = [f"setiap {self.every_days} hari"]
+        else:
+            parts = [", ".join(name for bit, name in enumerate(WEEKDAY_NAMES) if self.weekdays >> bit & 1)]
+            if self.every_days > 1:
+                parts.append(f"setiap {self.every_days} hari")
+        if self.per_week is not None:
+            parts.append(f"{self.per_week}x/minggu")
+        return ", ".join(parts)
+
+    def __eq__(self, other):
+        return isinstance(other, Recurrence) and self.columns() == other.columns()
+
+    def __hash__(self):
+        return hash(self.columns())
+
+    def __repr__(self):
+        return f"Recurrence{self.columns()!r}"
+
+
+DAILY = Recurrence()
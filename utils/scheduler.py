@@ -1,12 +1,142 @@
 import os
 import platform
+import heapq
+import time
+import datetime
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_FILE = os.path.join(BASE_DIR, "..", "data", "habits.db")
+from database.records import to_day, from_day
+from utils.paths import ROOT_DIR, check_profile
 
-def schedule_task():
-    """Menjadwalkan aplikasi untuk berjalan setiap hari"""
+def schedule_task(profile=None):
+    """Menjalankan daemon reminder (utils/daemon.py, tanpa GUI) setiap kali login/boot"""
+    args = f" --profile {check_profile(profile)}" if profile else ""
+    task = "HabitTrackerReminder" + (f"-{profile}" if profile else "")
     if platform.system() == "Windows":
-        os.system("schtasks /create /sc daily /tn HabitTracker /tr %cd%\\HabitTracker.exe /st 08:00")
+        os.system(f'schtasks /create /sc onlogon /tn {task} '
+                  f'/tr "cmd /c cd /d {ROOT_DIR} && pythonw -m utils.daemon{args}"')
     else:
-        os.system("(crontab -l; echo '0 8 * * * python3 {}/habtrack.py') | crontab -".format(BASE_DIR))
\ No newline at end of file
+        os.system(f"(crontab -l; echo '@reboot cd {ROOT_DIR} && python3 -m utils.daemon{args}') | crontab -")
+
+def next_fire_time(minutes, after, recurrence=None):
+    """Timestamp kemunculan berikutnya dari jam (menit) tersebut setelah `after`
+
+    Dengan recurrence hanya hari jadwalnya yang dipakai; None jika jadwal
+    sudah berakhir.
+    """
+    now = datetime.datetime.fromtimestamp(after)
+    fire = now.replace(hour=minutes // 60, minute=minutes % 60, second=0, microsecond=0)
+    if fire <= now:
+        fire += datetime.timedelta(days=1)
+    if recurrence is not None:
+        day = recurrence.next_occurrence(to_day(fire.date()))
+        if day is None:
+            return None
+        fire = datetime.datetime.combine(from_day(day), fire.time())
+    return fire.timestamp()
+
+
+class ReminderScheduler:
+    """Min-heap waktu reminder berikutnya untuk setiap habit
+
+    Entri lama di heap tidak dihapus langsung; entri dianggap basi jika
+    waktunya tidak sama dengan yang tercatat di `_entries` dan dilewati saat
+    di-pop. Setiap reminder yang terlewat (misalnya setelah sleep) hanya
+    dipicu sekali, lalu dijadwalkan ulang ke hari jadwal berikutnya.
+    Habit yang jadwalnya sudah berakhir tidak masuk heap.
+    """
+
+    # Mundurnya jam lebih dari ini dianggap perubahan jam sistem
+    JUMP_TOLERANCE = 120
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._heap = []
+        self._entries = {}  # habit_id -> (fire_at, name, minutes, recurrence)
+        self._last_now = clock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def rebuild(self, habits):
+        """Membangun ulang heap dari iterable Habit"""
+        now = self.clock()
+        self._last_now = now
+        self._entries = {}
+        for habit in habits:
+            fire_at = next_fire_time(habit.remind_minutes, now, habit.recurrence)
+            if fire_at is not None:
+                self._entries[habit.id] = (fire_at, habit.name, habit.remind_minutes, habit.recurrence)
+        self._reheap()
+
+    def update(self, habit):
+        """Menambah atau memperbarui jadwal satu Habit"""
+        fire_at = next_fire_time(habit.remind_minutes, self.clock(), habit.recurrence)
+        if fire_at is None:
+            self.remove(habit.id)
+            return
+        self._entries[habit.id] = (fire_at, habit.name, habit.remind_minutes, habit.recurrence)
+        heapq.heappush(self._heap, (fire_at, habit.id))
+        self._compact()
+
+    def remove(self, habit_id):
+        """Menghapus jadwal satu habit"""
+        self._entries.pop(habit_id, None)
+        self._compact()
+
+    def _compact(self):
+        # Bangun ulang heap jika entri basi sudah mendominasi
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._reheap()
+
+    def _reheap(self):
+        self._heap = [(entry[0], habit_id) for habit_id, entry in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    def _is_current(self, fire_at, habit_id):
+        entry = self._entries.get(habit_id)
+        return entry is not None and entry[0] == fire_at
+
+    def next_fire(self):
+        """Timestamp reminder terdekat, atau None jika tidak ada habit"""
+        while self._heap and not self._is_current(*self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def seconds_until_next(self):
+        """Detik sampai reminder terdekat (minimal 0), atau None"""
+        fire_at = self.next_fire()
+        if fire_at is None:
+            return None
+        return max(0.0, fire_at - self.clock())
+
+    def pop_due(self):
+        """Mengambil daftar (habit_id, name, fire_at) yang sudah jatuh tempo
+
+        fire_at adalah waktu terjadwalnya, untuk mengukur keterlambatan notifikasi.
+        """
+        now = self.clock()
+        if now < self._last_now - self.JUMP_TOLERANCE:
+            # Jam sistem mundur: hitung ulang semua jadwal dari sekarang
+            entries = {}
+            for habit_id, (_, name, minutes, recurrence) in self._entries.items():
+                fire_at = next_fire_time(minutes, now, recurrence)
+                if fire_at is not None:
+                    entries[habit_id] = (fire_at, name, minutes, recurrence)
+            self._entries = entries
+            self._reheap()
+        self._last_now = now
+
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            fire_at, habit_id = heapq.heappop(self._heap)
+            if not self._is_current(fire_at, habit_id):
+                continue
+            _, name, minutes, recurrence = self._entries[habit_id]
+            due.append((habit_id, name, fire_at))
+            fire_at = next_fire_time(minutes, now, recurrence)
+            if fire_at is None:
+                del self._entries[habit_id]
+                continue
+            self._entries[habit_id] = (fire_at, name, minutes, recurrence)
+            heapq.heappush(self._heap, (fire_at, habit_id))
+        return due
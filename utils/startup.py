@@ -0,0 +1,41 @@
+import sys
+import time
+
+
+class StartupProfiler:
+    """Mencatat waktu setiap fase startup sejak profiler dibuat
+
+    Fase yang sama hanya dicatat sekali (kemunculan pertama), sehingga
+    mark() aman dipanggil dari callback yang bisa terpanggil berulang.
+    """
+
+    def __init__(self, enabled=False, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self.start = clock()
+        self.phases = []   # (nama fase, detik sejak start)
+        self._seen = set()
+
+    def mark(self, phase):
+        if phase in self._seen:
+            return
+        self._seen.add(phase)
+        self.phases.append((phase, self.clock() - self.start))
+
+    def elapsed(self, phase):
+        for name, seconds in self.phases:
+            if name == phase:
+                return seconds
+        return None
+
+    def report(self):
+        """Tabel teks: durasi tiap fase dan waktu kumulatifnya (ms)"""
+        lines = [f"{'fase':<20} {'durasi':>10} {'total':>10}"]
+        previous = 0.0
+        for name, seconds in self.phases:
+            lines.append(f"{name:<20} {(seconds - previous) * 1000:>8.1f}ms {seconds * 1000:>8.1f}ms")
+            previous = seconds
+        return "\n".join(lines)
+
+    def print_report(self, stream=None):
+        print(self.report(), file=stream or sys.stderr, flush=True)
@@ -0,0 +1,128 @@
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+log = logging.getLogger("habtrack.slow")
+
+# HABTRACK_TRACE=<file.jsonl> (atau "-" untuk stderr) mengaktifkan tracing
+TRACE_ENV = "HABTRACK_TRACE"
+# Ambang (ms) sebuah event dianggap lambat dan ikut dicatat ke log peringatan
+SLOW_ENV = "HABTRACK_SLOW_MS"
+DEFAULT_SLOW_MS = 100.0
+
+# Jumlah sampel terakhir per operasi yang dipakai untuk persentil
+MAX_SAMPLES = 1000
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, pct):
+    """Persentil nearest-rank dari list yang sudah terurut"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+def _operation_name(sql):
+    # Whitespace diringkas agar statement yang sama selalu satu operasi
+    return " ".join(sql.split())[:80]
+
+
+class Tracer:
+    """Pencatat durasi query, span UI dan latensi event loop
+
+    Setiap event ditulis sebagai satu baris JSON. Sampel terakhir per
+    operasi disimpan di memori untuk panel debug (p50/p95/p99). Saat
+    tidak aktif, semua method hanya memeriksa `enabled`.
+    """
+
+    def __init__(self, stream=None, slow_ms=DEFAULT_SLOW_MS, enabled=None):
+        self.stream = stream
+        self.slow_ms = slow_ms
+        self.enabled = stream is not None if enabled is None else enabled
+        self._samples = {}   # (kind, name) -> deque durasi (ms)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        target = environ.get(TRACE_ENV)
+        slow_ms = float(environ.get(SLOW_ENV) or DEFAULT_SLOW_MS)
+        if not target:
+            return cls(slow_ms=slow_ms)
+        stream = sys.stderr if target == "-" else open(target, "a", encoding="utf-8", buffering=1)
+        return cls(stream, slow_ms)
+
+    def record(self, kind, name, seconds, **fields):
+        """Mencatat satu event berdurasi `seconds`"""
+        if not self.enabled:
+            return
+        ms = seconds * 1000
+        event = {"ts": time.time(), "kind": kind, "name": name, "ms": round(ms, 3),
+                 "thread": threading.current_thread().name}
+        event.update(fields)
+        if ms >= self.slow_ms:
+            event["slow"] = True
+            log.warning("%s lambat (%.1f ms): %s", kind, ms, name)
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            samples = self._samples.get((kind, name))
+            if samples is None:
+                samples = self._samples[(kind, name)] = deque(maxlen=MAX_SAMPLES)
+            samples.append(ms)
+            if self.stream is not None:
+                self.stream.write(line + "\n")
+
+    def query(self, sql, seconds, rows):
+        self.record("query", _operation_name(sql), seconds, rows=rows)
+
+    @contextmanager
+    def span(self, name, kind="span"):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(kind, name, time.perf_counter() - start)
+
+    def summary(self):
+        """List dict per operasi: kind, name, count, p50, p95, p99 (ms)"""
+        with self._lock:
+            items = [(key, sorted(samples)) for key, samples in self._samples.items()]
+        rows = []
+        for (kind, name), values in items:
+            row = {"kind": kind, "name": name, "count": len(values)}
+            for pct in PERCENTILES:
+                row[f"p{pct}"] = percentile(values, pct)
+            rows.append(row)
+        rows.sort(key=lambda row: row["p95"], reverse=True)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+
+# Tracer bersama, dikonfigurasi dari environment saat modul diimpor
+tracer = Tracer.from_env()
+
+def traced(name=None):
+    """Dekorator yang mencatat durasi fungsi sebagai span"""
+    def decorate(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate